@@ -1,61 +1,144 @@
 """
 KillKong Gradio Demo for Hugging Face Spaces
+
+백엔드(backend/app.py)와 같은 추론 엔진을 공유합니다: 모델/RAG는 StagedStartup으로 백그라운드 로드,
+생성은 InferencePool 대기열을 거쳐 토큰 단위로 스트리밍, 예시 문장 응답은 시작 시 미리 생성합니다.
 """
-import gradio as gr
+import asyncio
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
 
-# 경로 추가
-sys.path.append(str(Path(__file__).parent))
+# 백엔드 모듈은 backend/ 기준으로 import (from config import config)
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
 
-try:
-    from backend.models import FriendsFixerAI
-    from backend.config import config
-    
-    # AI 초기화
+import gradio as gr
+
+import app as backend
+from config import config
+from rag.matcher import PhraseMatcher
+from serving import QueueFullError, iterate_in_worker
+
+EXAMPLES = [
+    ["I want to buy a hand phone"],
+    ["Let's play pocket ball tonight"],
+    ["I went eye shopping yesterday"],
+    ["There were many black consumers at the store"],
+    ["His coloring is good to hear"],
+]
+
+# 모델 로드 실패 시 데모 응답
+DEMO_RESPONSES = {
+    "hand phone": "'hand phone' is Konglish—people just say 'cell phone'.\nAnyway, what kind are you looking for?",
+    "pocket ball": "'pocket ball' is Konglish—people just say 'pool' or 'billiards'.\nBy the way, do you play often?",
+    "black consumer": "'black consumer' is Konglish—people just say 'problematic customer'.\nOn that note, that sounds frustrating!",
+}
+DEMO_FALLBACK = "I can help you make that sound more natural! Give me a sentence with Konglish."
+# 데모 구문 전체를 한 번의 선형 탐색으로 찾는 Aho–Corasick 매처 (복수형 등 굴절도 일치)
+_demo_phrases = list(DEMO_RESPONSES)
+_demo_matcher = PhraseMatcher(_demo_phrases)
+
+# 예시 문장 응답 ((캐시 키, RAG 버전) → 결과), 모델 로드 직후 채우며 만료 없음
+warm_cache: Dict[Tuple[Hashable, Optional[int]], Dict[str, Any]] = {}
+
+def demo_response(text: str) -> Tuple[str, str]:
+    """더미 응답 (메시지에서 처음 등장하는 데모 구문 기준)"""
+    hits = _demo_matcher.find(text)
+    if not hits:
+        return DEMO_FALLBACK, ""
+    row = min(hits, key=lambda h: h[1])[0]
+    return DEMO_RESPONSES[_demo_phrases[row]], "⏱️ Processing time: 0.01s (Demo mode)"
+
+def warm_key(text: str) -> Tuple[Hashable, Optional[int]]:
+    # RAG가 핫 리로드되면 예열된 응답은 쓰지 않음
+    snapshot = backend.rag_registry.current
+    return backend.response_cache.make_key(text, False), snapshot.version if snapshot else None
+
+def hints_text(text: str) -> str:
+    retriever = backend.get_retriever()
+    hints = retriever.retrieve(text) if retriever else []
+    if not hints:
+        return ""
+    lines = "".join(f"- {h['konglish']} → {h['natural']} (similarity: {h['sim']:.2f})\n" for h in hints[:3])
+    return "\n\n📚 **Hints Used:**\n" + lines
+
+def _generate_once(message: str, show_hints: bool):
+    """스트리밍 미지원 모델용: 전체 응답을 한 번에 전달"""
+    yield backend.ai_service.generate_response(message=message, show_hints=show_hints)
+
+def warm_examples():
+    """모델 단계가 끝나면 예시 응답을 추론 풀에서 하나씩 생성 (방문자 요청과 같은 동시성 제한)"""
+    if not backend.startup.wait("model"):
+        return
+
+    async def run():
+        for (text,) in EXAMPLES:
+            try:
+                result = await backend.inference_pool.run(
+                    backend.ai_service.generate_response, message=text, show_hints=False
+                )
+            except Exception as e:
+                print(f"⚠️  Example warm-up failed ({text}): {e}")
+                continue
+            warm_cache[warm_key(text)] = result
+            if backend.ai_service.model is not None:
+                # /api/v1/chat과 같은 키이므로 API 응답 캐시도 함께 채움
+                backend.response_cache.put(backend.response_cache.make_key(text, False), result)
+        print(f"🔥 Warmed {len(warm_cache)} example responses")
+
+    asyncio.run(run())
+
+def start_engine():
+    """백엔드 단계별 초기화(RAG → 모델)와 예시 예열 시작 (즉시 반환)"""
     print("🚀 Initializing KillKong AI...")
-    ai = FriendsFixerAI()
-    ai.initialize()
-    
-    def correct_english(text, show_hints=False):
-        """콩글리시 교정"""
-        if not text.strip():
-            return "Please enter some text!", ""
-        
-        try:
-            result = ai.generate_response(text, show_hints=show_hints)
-            response = result['response']
-            
-            if show_hints and result.get('hints'):
-                hints_text = "\n\n📚 **Hints Used:**\n"
-                for h in result['hints'][:3]:
-                    hints_text += f"- {h['konglish']} → {h['natural']} (similarity: {h['sim']:.2f})\n"
-                response += hints_text
-            
-            processing_time = f"\n\n⏱️ Processing time: {result['processing_time']:.2f}s"
-            return response, processing_time
-            
-        except Exception as e:
-            return f"Error: {str(e)}", ""
-
-except Exception as e:
-    print(f"❌ Failed to load model: {e}")
-    print("⚠️ Running in demo mode")
-    
-    def correct_english(text, show_hints=False):
-        """더미 응답"""
-        examples = {
-            "hand phone": "'hand phone' is Konglish—people just say 'cell phone'.\nAnyway, what kind are you looking for?",
-            "pocket ball": "'pocket ball' is Konglish—people just say 'pool' or 'billiards'.\nBy the way, do you play often?",
-            "black consumer": "'black consumer' is Konglish—people just say 'problematic customer'.\nOn that note, that sounds frustrating!",
-        }
-        
-        text_lower = text.lower()
-        for key, response in examples.items():
-            if key in text_lower:
-                return response, "⏱️ Processing time: 0.01s (Demo mode)"
-        
-        return "I can help you make that sound more natural! Give me a sentence with Konglish.", ""
+    backend.startup.start()
+    if config.GRADIO_WARM_EXAMPLES:
+        threading.Thread(target=warm_examples, name="gradio-warm", daemon=True).start()
+
+async def correct_english(text, show_hints=False):
+    """콩글리시 교정 (부분 응답을 텍스트박스에 스트리밍)"""
+    if not text.strip():
+        yield "Please enter some text!", ""
+        return
+
+    if not backend.model_ready():
+        if backend.startup.status()["model"]["status"] != "failed":
+            yield "", "⏳ Loading the model, please wait..."
+        if not await asyncio.to_thread(backend.startup.wait, "model"):
+            yield demo_response(text)
+            return
+
+    start = time.perf_counter()
+    # 사이드카 모드의 검색/버전 확인은 RPC이므로 이벤트 루프 밖에서 실행
+    hints = await asyncio.to_thread(hints_text, text) if show_hints else ""
+    cached = warm_cache.get(await asyncio.to_thread(warm_key, text))
+    if cached is not None:
+        yield cached["response"] + hints, f"⚡ Cached example ({time.perf_counter() - start:.2f}s)"
+        return
+
+    stream_fn = backend.measured_stream(getattr(backend.ai_service, "stream_response", None) or _generate_once)
+    try:
+        chunks = iterate_in_worker(backend.inference_pool.submit, stream_fn, text, False)
+    except QueueFullError as e:
+        yield "", f"🚦 Server busy, please retry in {e.retry_after}s"
+        return
+
+    parts = []
+    try:
+        async for chunk in chunks:
+            if isinstance(chunk, dict):
+                chunk = chunk.get("response", "")
+            if chunk:
+                parts.append(chunk)
+                yield "".join(parts), "✍️ Generating..."
+    except Exception as e:
+        yield f"Error: {str(e)}", ""
+        return
+    finally:
+        await chunks.aclose()
+    yield "".join(parts) + hints, f"⏱️ Processing time: {time.perf_counter() - start:.2f}s"
 
 # Gradio 인터페이스
 with gr.Blocks(theme=gr.themes.Soft(), title="🦍 KillKong") as demo:
@@ -86,15 +169,9 @@ with gr.Blocks(theme=gr.themes.Soft(), title="🦍 KillKong") as demo:
             output_text = gr.Textbox(label="Corrected & Natural", lines=8)
             time_text = gr.Textbox(label="Info", lines=1)
     
-    # 예시
+    # 예시 (응답은 시작 시 미리 생성된 캐시에서 반환)
     gr.Examples(
-        examples=[
-            ["I want to buy a hand phone"],
-            ["Let's play pocket ball tonight"],
-            ["I went eye shopping yesterday"],
-            ["There were many black consumers at the store"],
-            ["His coloring is good to hear"],
-        ],
+        examples=EXAMPLES,
         inputs=input_text
     )
     
@@ -116,5 +193,9 @@ with gr.Blocks(theme=gr.themes.Soft(), title="🦍 KillKong") as demo:
     [GitHub](https://github.com/cofldus/killkong_konglish-corrector) | [Report](https://github.com/cofldus/killkong_konglish-corrector/blob/main/docs/A4_KILLKONG_%EC%B5%9C%EC%A2%85%EB%B3%B4%EA%B3%A0%EC%84%9C.pdf)
     """)
 
+# 동시 방문자는 Gradio 대기열에서 순서를 기다리고, 대기열이 가득 차면 바로 거절
+demo.queue(default_concurrency_limit=config.GRADIO_CONCURRENCY_LIMIT, max_size=config.GRADIO_MAX_QUEUE)
+
 if __name__ == "__main__":
+    start_engine()
     demo.launch(server_name="0.0.0.0", server_port=7860)
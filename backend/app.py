@@ -1,7 +1,12 @@
 # backend/app.py
 import sys
 import os
+import asyncio
+import hmac
 import logging
+import inspect
+import time
+from functools import partial, wraps
 from datetime import datetime
 from pathlib import Path
 
@@ -9,14 +14,23 @@ from pathlib import Path
 if sys.platform == "win32":
     os.environ["PYTHONIOENCODING"] = "utf-8"
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 
 from config import config
-from models import FriendsFixerAI
+from rag import (
+    RAGDatabase, RAGRetriever, RAGRegistry, SidecarClient, SidecarRegistry, create_retriever,
+    parse_address, shutdown_shard_pool
+)
+from utils.metrics import metrics, start_trace, end_trace
+from serving import (
+    ResponseCache, InferencePool, QueueFullError, MicroBatcher, PrefixKVCache, StagedStartup,
+    CandidateGenerator, SessionStore, CompressionMiddleware, encoded_response, etag_matches,
+    sse_event, iterate_in_worker, load_cpu_model
+)
 
 # 로깅 설정
 logging.basicConfig(
@@ -42,108 +56,690 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 협상된 br/gzip 응답 압축 (SSE 제외)
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MIN_SIZE,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY
+    )
+
 # Pydantic 모델
 class RagHint(BaseModel):
+    id: Optional[str] = None  # 안정적인 패턴 ID (전체 why 텍스트는 /api/v1/patterns)
     konglish: str
     natural: str
-    why: str = ""
+    why: Optional[str] = ""  # compact_hints 요청이면 생략
     sim: float
+    span: Optional[List[int]] = None  # 정확 일치 시 메시지 내 [시작, 끝] 오프셋
 
 class ChatRequest(BaseModel):
     message: str
     show_hints: bool = False
+    debug: bool = False  # 단계별 처리 시간 포함 (METRICS_DEBUG 필요)
+    session_id: Optional[str] = Field(default=None, max_length=128)  # 지정하면 서버가 대화 기록을 유지
+    compact_hints: bool = False  # 힌트의 why와 null 필드를 생략 (패턴 ID로 /api/v1/patterns 참조)
 
 class ChatResponse(BaseModel):
     response: str
     hints: Optional[List[RagHint]] = None
     processing_time: float
     model_used: str = "qwen2.5-1.5b-friendsfixer"
+    cached: bool = False
+    timings: Optional[Dict[str, float]] = None
+    session_id: Optional[str] = None
+
+class HintsRequest(BaseModel):
+    message: str
+    top_k: Optional[int] = None
+    compact_hints: bool = False
+
+class HintsResponse(BaseModel):
+    hints: List[RagHint]
+    processing_time: float
+    rag_version: Optional[int] = None
 
 class HealthResponse(BaseModel):
     status: str
     ai_ready: bool
     files: Dict[str, Any]
 
-# AI 서비스 인스턴스
-ai_service = FriendsFixerAI()
+# AI 서비스 인스턴스 (모델 단계에서 생성, torch/transformers는 그때 import)
+ai_service = None
+metrics.enabled = config.METRICS_ENABLED
+
+# 응답 캐시 (정규화된 메시지 + show_hints + 생성 설정 기준)
+response_cache = ResponseCache(
+    max_entries=config.RESPONSE_CACHE_SIZE,
+    ttl=config.RESPONSE_CACHE_TTL,
+    mode=config.RESPONSE_CACHE_MODE,
+    variants=config.RERANK_N,
+    fingerprint=config.generation_fingerprint()
+)
+
+# 추론 워커 풀 (이벤트 루프 블로킹 방지 + 대기열 제한)
+inference_pool = InferencePool(
+    max_concurrency=config.INFERENCE_MAX_CONCURRENCY,
+    max_queue=config.INFERENCE_MAX_QUEUE,
+    retry_after=config.INFERENCE_RETRY_AFTER
+)
+
+def count_tokens(text: str) -> int:
+    """생성된 텍스트의 토큰 수 (토크나이저가 없으면 공백 단위)"""
+    tokenizer = getattr(ai_service, "tokenizer", None)
+    if tokenizer is None:
+        return len(text.split())
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+def _record_generation(text: str, seconds: float):
+    """생성 토큰 수/속도 기록 (모델 없이 반환한 더미 응답은 제외)"""
+    if not metrics.active() or getattr(ai_service, "model", None) is None:
+        return
+    try:
+        metrics.record_generation(count_tokens(text), seconds)
+    except Exception as e:
+        # 지표 기록 실패로 요청이 실패하지 않도록 함
+        logger.warning(f"⚠️  Generation metrics skipped: {e}")
+
+def measured(fn):
+    """generate_response를 워커 스레드 안에서 시간 측정 (대기열 대기 제외)"""
+    @wraps(fn)
+    def run(*args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        _record_generation(result["response"], time.perf_counter() - start)
+        return result
+    return run
+
+def measured_stream(fn):
+    """스트리밍 제너레이터 버전: 마지막 조각까지 받은 뒤 전체 응답 기준으로 기록"""
+    @wraps(fn)
+    def run(*args, **kwargs):
+        start = time.perf_counter()
+        parts = []
+        chunks = fn(*args, **kwargs)
+        try:
+            for chunk in chunks:
+                parts.append(chunk.get("response", "") if isinstance(chunk, dict) else chunk)
+                yield chunk
+        finally:
+            # 도중에 닫히면(클라이언트 연결 종료) 모델 스트림도 닫아 생성을 멈춤
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        _record_generation("".join(parts), time.perf_counter() - start)
+    return run
+
+def _generate_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """배치 요청을 한 번의 generate로 처리 (후보 분리/리랭킹은 모델 쪽에서 요청별 수행)"""
+    start = time.perf_counter()
+    results = ai_service.generate_batch(
+        [item["message"] for item in items],
+        [item["show_hints"] for item in items]
+    )
+    # 배치 안의 요청은 같은 generate 시간을 공유
+    elapsed = time.perf_counter() - start
+    for result in results:
+        _record_generation(result["response"], elapsed)
+    return results
+
+# 동시 요청 마이크로 배치 (모델 단계에서 generate_batch를 제공할 때만 생성)
+batcher = None
+
+# 멀티턴 세션 (대화 기록 + 문장별 힌트 캐시)
+session_store = SessionStore(
+    config.SESSION_DB_PATH,
+    max_sessions=config.SESSION_MAX_ACTIVE,
+    max_turns=config.SESSION_MAX_TURNS,
+    max_tokens=config.SESSION_MAX_TOKENS,
+    max_hint_entries=config.SESSION_HINT_CACHE,
+    flush_interval=config.SESSION_FLUSH_INTERVAL,
+    ttl_days=config.SESSION_TTL_DAYS
+) if config.SESSION_ENABLED else None
+
+# generate_response/stream_response가 받는 키워드 인자 (모델 로드 후 채움)
+model_params: set = set()
+
+def make_retriever(rag_db) -> RAGRetriever:
+    """RAG_BACKEND 설정에 맞는 검색기 생성"""
+    return create_retriever(
+        rag_db,
+        backend=config.RAG_BACKEND,
+        top_k=config.RAG_TOP_K,
+        min_sim=config.RAG_MIN_SIM,
+        exact_match=config.RAG_EXACT_MATCH,
+        embed_model=config.RAG_EMBED_MODEL,
+        embed_dtype=config.RAG_EMBED_DTYPE,
+        nprobe=config.RAG_ANN_NPROBE,
+        dense_weight=config.RAG_HYBRID_WEIGHT,
+        fuzzy_weight=config.RAG_FUZZY_WEIGHT,
+        fuzzy_min=config.RAG_FUZZY_MIN,
+        shards=config.RAG_SHARDS,
+        shard_workers=config.RAG_SHARD_WORKERS
+    )
+
+def _attach_rag(snapshot):
+    """RAG 스냅샷을 모델 서비스에 연결 (참조 교체만 하므로 진행 중인 요청은 이전 버전 사용)"""
+    if ai_service is None:
+        return
+    ai_service.rag_db = snapshot.db
+    if hasattr(ai_service, "retriever"):
+        ai_service.retriever = snapshot.retriever
+
+def _on_rag_swap(snapshot):
+    """새 RAG 버전을 서비스에 반영"""
+    _attach_rag(snapshot)
+    # 힌트가 바뀌었을 수 있으므로 응답 캐시 비움
+    response_cache.clear()
+
+# 핫 리로드 가능한 RAG DB (사이드카 모드에서는 노드 공유 사이드카의 현재 버전)
+if config.RAG_SIDECAR:
+    rag_registry = SidecarRegistry(
+        SidecarClient(
+            parse_address(config.RAG_SIDECAR),
+            config.RAG_SIDECAR_AUTHKEY.encode("utf-8"),
+            timeout=config.RAG_SIDECAR_TIMEOUT
+        ),
+        top_k=config.RAG_TOP_K,
+        min_sim=config.RAG_MIN_SIM,
+        on_swap=_on_rag_swap
+    )
+else:
+    rag_registry = RAGRegistry(config.RAG_DB_PATH, make_retriever, on_swap=_on_rag_swap)
+
+def get_retriever() -> Optional[RAGRetriever]:
+    """현재 버전의 힌트 검색기"""
+    snapshot = rag_registry.current
+    return snapshot.retriever if snapshot else None
+
+async def current_snapshot():
+    """async 핸들러용 현재 RAG 버전 (사이드카 모드의 버전 확인 RPC가 이벤트 루프를 막지 않도록 스레드에서)"""
+    return await asyncio.to_thread(lambda: rag_registry.current)
+
+def compact(hints: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """why 텍스트를 뺀 힌트 (클라이언트는 id로 캐시된 패턴 표를 참조)"""
+    if hints is None:
+        return None
+    return [{k: v for k, v in h.items() if k != "why"} for h in hints]
+
+def compact_response(response):
+    """응답 모델의 힌트에서 why 제거 (exclude_none 인코딩과 함께 사용)"""
+    for hint in response.hints or []:
+        hint.why = None
+
+def _generate_once(message: str, show_hints: bool, **kwargs):
+    """스트리밍 미지원 모델용: 전체 응답을 한 번에 전달"""
+    yield ai_service.generate_response(message=message, show_hints=show_hints, **kwargs)
+
+def session_kwargs(request: ChatRequest) -> Dict[str, Any]:
+    """세션 요청이면 모델이 받는 인자만 골라 대화 기록(history)과 캐시된 힌트(hints)를 전달
+    
+    SQLite 읽기와 힌트 검색(사이드카 모드에서는 RPC)을 하므로 async 핸들러에서는 asyncio.to_thread로 호출합니다.
+    """
+    if session_store is None or not request.session_id:
+        return {}
+    kwargs = {}
+    if "history" in model_params:
+        kwargs["history"] = session_store.history(request.session_id)
+    snapshot = rag_registry.current
+    if "hints" in model_params and request.show_hints and snapshot is not None:
+        # 캐시된 힌트는 같은 RAG 버전(CSV digest)일 때만 재사용
+        kwargs["hints"] = session_store.hints(
+            request.session_id, request.message, snapshot.retriever.retrieve_many, config.RAG_TOP_K,
+            version=snapshot.digest or f"v{snapshot.version}"
+        )
+    return kwargs
+
+def load_rag_stage():
+    """1단계: RAG DB (memory-map 인덱스, sklearn/pandas 없이 로드) → /api/v1/hints 사용 가능"""
+    if config.RAG_SIDECAR:
+        rag_registry.connect(config.RAG_SIDECAR_CONNECT_TIMEOUT)
+        return
+    db = RAGDatabase(config.RAG_DB_PATH)
+    db.load()
+    rag_registry.adopt(db)
+    if config.RAG_WATCH:
+        rag_registry.watch(config.RAG_WATCH_INTERVAL)
+
+def load_model_stage():
+    """2단계: 모델 로드 (torch/transformers import 포함) → /api/v1/chat 사용 가능"""
+    global ai_service, batcher
+    from models import FriendsFixerAI
+    
+    service = FriendsFixerAI()
+    if config.INFERENCE_BACKEND == "cpu":
+        # export된 병합+int8 모델을 미리 넣어 두면 initialize()는 모델 로드를 건너뜀
+        service.model, service.tokenizer = load_cpu_model(
+            config.CPU_MODEL_DIR, quant=config.CPU_QUANT, threads=config.CPU_THREADS
+        )
+    service.initialize()
+    ai_service = service
+    
+    # 1단계에서 로드한 RAG 버전을 공유 (실패했다면 모델이 로드한 DB를 등록)
+    if rag_registry.current is not None:
+        _attach_rag(rag_registry.current)
+    elif service.rag_db is not None:
+        rag_registry.adopt(service.rag_db)
+    
+    # 선택적 가속기: 실패하면 로그만 남기고 모델의 기본 generate 경로 사용
+    for setup in (setup_prefix_cache, setup_candidate_generator):
+        try:
+            setup()
+        except Exception as e:
+            logger.error(f"⚠️  {setup.__name__} failed, falling back to plain generate: {e}")
+    model_params.update(inspect.signature(service.generate_response).parameters)
+    tokenizer = getattr(service, "tokenizer", None)
+    if session_store is not None and tokenizer is not None:
+        # 세션 토큰 상한을 실제 토크나이저 기준으로 계산
+        session_store.count_tokens = lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    if config.BATCH_MAX_SIZE > 1 and hasattr(service, "generate_batch"):
+        batcher = MicroBatcher(
+            _generate_batch,
+            inference_pool,
+            window_ms=config.BATCH_WINDOW_MS,
+            max_batch_size=config.BATCH_MAX_SIZE
+        )
+
+startup = StagedStartup([("rag", load_rag_stage), ("model", load_model_stage)])
+
+def model_ready() -> bool:
+    return startup.ready("model") and ai_service is not None
+
+def require_model():
+    """모델 로드 전이면 503 + Retry-After"""
+    if not model_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Model is still loading" if not startup.failed() else "Model failed to load",
+            headers={"Retry-After": str(config.INFERENCE_RETRY_AFTER)}
+        )
+
+def setup_prefix_cache():
+    """고정 시스템 프롬프트 prefix KV를 미리 계산 (모델이 system_prefix()를 제공할 때만)
+    
+    모델은 ai_service.prefix_cache가 있으면 prefix_cache.generate(prefix, suffix, ...)로 생성합니다.
+    """
+    tokenizer = getattr(ai_service, "tokenizer", None)
+    if (not config.PREFIX_CACHE_ENABLED or getattr(ai_service, "model", None) is None or tokenizer is None
+            or not hasattr(ai_service, "system_prefix")):
+        return
+    prefix_cache = PrefixKVCache(
+        ai_service.model,
+        tokenizer,
+        max_entries=config.PREFIX_CACHE_MAX_ENTRIES,
+        max_tokens=config.PREFIX_CACHE_MAX_TOKENS,
+        fingerprint=config.generation_fingerprint
+    )
+    entry = prefix_cache.prefill(ai_service.system_prefix())
+    # prefill이 끝난 뒤에만 연결 (실패 시 모델은 prefix 캐시 없이 생성)
+    ai_service.prefix_cache = prefix_cache
+    if entry is not None:
+        logger.info(f"🧠 System prompt prefix cached: {entry['tokens']} tokens ({entry['prefill_seconds'] * 1000:.0f}ms)")
+
+def setup_candidate_generator():
+    """RERANK_N 후보 생성기 (공유 prefill + 조기 종료 + adaptive 생략)
+    
+    모델은 ai_service.candidate_generator가 있으면 candidate_generator.generate(prompt, hints, prefix, ...)로 후보를 만듭니다.
+    """
+    tokenizer = getattr(ai_service, "tokenizer", None)
+    if getattr(ai_service, "model", None) is None or tokenizer is None:
+        return
+    ai_service.candidate_generator = CandidateGenerator(
+        ai_service.model,
+        tokenizer,
+        n=config.RERANK_N,
+        adaptive=config.RERANK_ADAPTIVE,
+        sim_threshold=config.K_NOTE_SIM_TH,
+        connectors=config.K_NOTE_CONNECTORS,
+        early_stop=config.EARLY_STOP,
+        prefix_cache=getattr(ai_service, "prefix_cache", None)
+    )
 
 @app.on_event("startup")
 async def startup_event():
-    """앱 시작시 AI 모델 초기화"""
+    """단계별 초기화를 백그라운드에서 시작 (/livez는 즉시, /readyz는 단계 완료 후 응답)"""
     logger.info("🎯 KillKong API starting...")
-    ai_service.initialize()
+    if session_store is not None:
+        session_store.open()
+    startup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    rag_registry.stop()
+    shutdown_shard_pool()
+    inference_pool.shutdown()
+    if session_store is not None:
+        session_store.close()
 
 # API 엔드포인트
 @app.get("/", response_class=JSONResponse)
 async def root():
+    snapshot = await current_snapshot()
     return {
         "message": "KillKong API - Production Version",
         "status": "running",
         "version": "3.0.0",
-        "initialized": ai_service.is_initialized,
-        "model_loaded": ai_service.model is not None,
-        "rag_loaded": ai_service.rag_db is not None
+        "initialized": model_ready() and ai_service.is_initialized,
+        "model_loaded": model_ready() and ai_service.model is not None,
+        "rag_loaded": snapshot is not None
     }
 
+@app.get("/livez")
+async def livez():
+    """프로세스 생존 여부 (초기화 진행과 무관하게 즉시 200)"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz(stage: Optional[str] = None):
+    """트래픽 수신 가능 여부 (stage=rag이면 힌트 전용 준비 상태), 준비 전이면 503"""
+    stages = startup.status()
+    if stage is not None and stage not in stages:
+        raise HTTPException(status_code=404, detail=f"Unknown stage: {stage}")
+    ready = startup.ready(stage)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "stages": stages}
+    )
+
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
-    return HealthResponse(
-        status="healthy",
-        ai_ready=ai_service.is_initialized,
+async def health_check(http_request: Request):
+    snapshot = await current_snapshot()
+    if startup.ready():
+        status = "healthy"
+    elif startup.failed():
+        status = "degraded"
+    else:
+        status = "starting"
+    return encoded_response(http_request, HealthResponse(
+        status=status,
+        ai_ready=model_ready() and ai_service.is_initialized,
         files={
             "model_exists": config.MODEL_DIR.exists(),
             "database_exists": config.RAG_DB_PATH.exists(),
             "model_path": str(config.MODEL_DIR),
             "db_path": str(config.RAG_DB_PATH),
-            "model_loaded": ai_service.model is not None,
-            "rag_loaded": ai_service.rag_db is not None
+            "model_loaded": model_ready() and ai_service.model is not None,
+            "rag_loaded": snapshot is not None,
+            "stages": startup.status()
         }
+    ))
+
+@app.post("/api/v1/hints", response_model=HintsResponse)
+async def hints(request: HintsRequest, http_request: Request):
+    """RAG 힌트만 검색 (모델 로드 전에도 RAG 단계가 끝나면 사용 가능)"""
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message is empty")
+    snapshot = await current_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="RAG database is still loading",
+            headers={"Retry-After": "1"}
+        )
+    
+    start = time.perf_counter()
+    found = await asyncio.to_thread(snapshot.retriever.retrieve, request.message, top_k=request.top_k)
+    response = HintsResponse(
+        hints=found,
+        processing_time=round(time.perf_counter() - start, 4),
+        rag_version=snapshot.version
     )
+    if request.compact_hints:
+        compact_response(response)
+    return encoded_response(http_request, response, exclude_none=request.compact_hints)
 
 @app.post("/api/v1/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="Message is empty")
+    require_model()
     
     logger.info(f"💬 Chat request: {request.message[:50]}...")
     
+    trace_token = start_trace() if request.debug and config.METRICS_DEBUG else None
     try:
-        result = ai_service.generate_response(
-            message=request.message,
-            show_hints=request.show_hints
-        )
+        with metrics.stage("chat_total"):
+            response = await _chat(request)
+    finally:
+        timings = end_trace(trace_token) if trace_token is not None else None
+    response.timings = timings
+    if request.compact_hints:
+        compact_response(response)
+    return encoded_response(http_request, response, exclude_none=request.compact_hints)
+
+async def _chat(request: ChatRequest) -> ChatResponse:
+    start = time.perf_counter()
+    extra = await asyncio.to_thread(session_kwargs, request)
+    session_id = request.session_id if session_store is not None else None
+    # 이전 대화가 있으면 같은 메시지라도 응답이 달라지므로 응답 캐시를 쓰지 않음
+    use_cache = config.RESPONSE_CACHE_ENABLED and not extra.get("history")
+    cache_key = response_cache.make_key(request.message, request.show_hints)
+    if use_cache:
+        with metrics.stage("cache_lookup"):
+            cached = response_cache.get(cache_key)
+        if cached is not None:
+            metrics.inc("response_cache_hits_total")
+            cached["processing_time"] = round(time.perf_counter() - start, 4)
+            logger.info("⚡ Response served from cache")
+            if session_id:
+                await asyncio.to_thread(session_store.append, session_id, request.message, cached["response"])
+            return ChatResponse(**cached, cached=True, session_id=session_id)
+        metrics.inc("response_cache_misses_total")
+    
+    try:
+        if batcher is not None and not extra:
+            result = await batcher.submit(message=request.message, show_hints=request.show_hints)
+        else:
+            result = await inference_pool.run(
+                measured(ai_service.generate_response),
+                message=request.message,
+                show_hints=request.show_hints,
+                **extra
+            )
+        
+        # 모델이 로드된 경우의 응답만 캐시
+        if use_cache and ai_service.model is not None:
+            response_cache.put(cache_key, result)
+        if session_id:
+            await asyncio.to_thread(session_store.append, session_id, request.message, result["response"])
         
         logger.info(f"✅ Response generated ({result['processing_time']}s) - {result['model_used']}")
         
-        return ChatResponse(**result)
+        return ChatResponse(**result, session_id=session_id)
         
+    except QueueFullError as e:
+        metrics.inc("rejected_requests_total")
+        logger.warning("🚦 Inference queue full, rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"❌ Chat processing failed: {e}")
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+@app.post("/api/v1/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """SSE 스트리밍: hints → token* → done"""
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message is empty")
+    require_model()
+    
+    logger.info(f"📡 Stream request: {request.message[:50]}...")
+    
+    start = time.perf_counter()
+    stream_fn = measured_stream(getattr(ai_service, "stream_response", None) or _generate_once)
+    extra = await asyncio.to_thread(session_kwargs, request)
+    if extra:
+        stream_fn = partial(stream_fn, **extra)
+    try:
+        # 대기열 초과는 스트림을 열기 전에 503으로 응답
+        chunks = iterate_in_worker(inference_pool.submit, stream_fn, request.message, request.show_hints)
+    except QueueFullError as e:
+        logger.warning("🚦 Inference queue full, rejecting stream")
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    async def events():
+        hints = extra.get("hints")
+        if hints is None and request.show_hints:
+            snapshot = await current_snapshot()
+            if snapshot is not None:
+                hints = await asyncio.to_thread(snapshot.retriever.retrieve, request.message)
+        yield sse_event("hints", compact(hints) if request.compact_hints else hints)
+        
+        model_used = ChatResponse.model_fields["model_used"].default
+        parts = []
+        try:
+            async for chunk in chunks:
+                if isinstance(chunk, dict):
+                    model_used = chunk.get("model_used", model_used)
+                    chunk = chunk.get("response", "")
+                if chunk:
+                    parts.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+        except Exception as e:
+            logger.error(f"❌ Stream processing failed: {e}")
+            yield sse_event("error", {"detail": f"Server error: {str(e)}"})
+            return
+        finally:
+            # 연결이 끊겨 events()가 닫히면 워커의 생성도 중단 (추론 슬롯 반환)
+            await chunks.aclose()
+        
+        processing_time = round(time.perf_counter() - start, 4)
+        if session_store is not None and request.session_id:
+            await asyncio.to_thread(session_store.append, request.session_id, request.message, "".join(parts))
+        logger.info(f"✅ Stream finished ({processing_time}s) - {model_used}")
+        yield sse_event("done", {"processing_time": processing_time, "model_used": model_used})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/v1/admin/rag/reload", status_code=202)
+async def reload_rag(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """RAG DB 백그라운드 리로드 (완료 후 원자적 교체)
+    
+    전체 재학습을 누구나 반복해서 시작할 수 없도록 ADMIN_TOKEN이 설정된 경우에만 제공합니다 (미설정 시 404).
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((x_admin_token or "").encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    started = await asyncio.to_thread(rag_registry.reload_async, force=force)
+    logger.info(f"🔄 RAG reload {'started' if started else 'already in progress'} (force={force})")
+    return {"started": started, **await asyncio.to_thread(rag_registry.stats)}
+
+def patterns_etag(snapshot) -> str:
+    """CSV 내용 digest 기반 (같은 DB를 쓰는 모든 인스턴스에서 동일)"""
+    return f'"{snapshot.digest[:16]}"' if snapshot.digest else f'"v{snapshot.version}"'
+
+@app.get("/api/v1/patterns")
+async def patterns(http_request: Request):
+    """전체 패턴 표 (id → konglish/natural/why), ETag로 재검증해 변경이 없으면 304"""
+    snapshot = await current_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="RAG database is still loading",
+            headers={"Retry-After": "1"}
+        )
+    
+    headers = {"ETag": patterns_etag(snapshot), "Cache-Control": f"public, max-age={config.PATTERNS_MAX_AGE}"}
+    if etag_matches(http_request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    # 사이드카 모드에서는 처음 접근할 때 패턴 표를 RPC로 가져옴
+    store = await asyncio.to_thread(lambda: snapshot.db.patterns)
+    # 행 단위 객체 대신 컬럼 배열 (키 반복이 없어 JSON/msgpack 모두 작음)
+    return encoded_response(http_request, {
+        "etag": headers["ETag"].strip('"'),
+        "count": len(store),
+        "id": store.ids,
+        "konglish": store.bad,
+        "natural": store.good,
+        "why": store.ctx
+    }, headers=headers)
+
+@app.get("/api/v1/sessions/{session_id}")
+async def get_session(session_id: str):
+    """세션의 최근 대화 기록 (토큰 상한 적용 후)"""
+    if session_store is None:
+        raise HTTPException(status_code=404, detail="Sessions are disabled")
+    snapshot = await asyncio.to_thread(session_store.snapshot, session_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return snapshot
+
+@app.delete("/api/v1/sessions/{session_id}")
+async def delete_session(session_id: str):
+    if session_store is None:
+        raise HTTPException(status_code=404, detail="Sessions are disabled")
+    return {"deleted": await asyncio.to_thread(session_store.delete, session_id)}
+
 @app.get("/api/v1/stats")
 async def get_stats():
+    prefix_cache = getattr(ai_service, "prefix_cache", None)
+    candidate_generator = getattr(ai_service, "candidate_generator", None)
+    snapshot = await current_snapshot()
+    rag_stats = await asyncio.to_thread(rag_registry.stats)
     return {
-        "model_initialized": ai_service.is_initialized,
+        "model_initialized": model_ready() and ai_service.is_initialized,
         "device": config.DEVICE,
-        "model_loaded": ai_service.model is not None,
-        "rag_database_size": len(ai_service.rag_db.db) if ai_service.rag_db and ai_service.rag_db.db is not None else 0,
+        "model_loaded": model_ready() and ai_service.model is not None,
+        "rag_database_size": len(snapshot.db) if snapshot else 0,
+        "startup": startup.status(),
+        "rag": rag_stats,
         "model_config": {
             "base_model": config.BASE_MODEL,
+            "backend": config.INFERENCE_BACKEND,
             "max_new_tokens": config.MAX_NEW_TOKENS,
             "temperature": config.TEMPERATURE,
             "top_p": config.TOP_P,
-            "rerank_n": config.RERANK_N
+            "rerank_n": config.RERANK_N,
+            "rerank_adaptive": config.RERANK_ADAPTIVE,
+            "early_stop": config.EARLY_STOP
         },
         "rag_config": {
             "top_k": config.RAG_TOP_K,
             "min_sim": config.RAG_MIN_SIM,
             "stage": config.RAG_STAGE,
+            "backend": config.RAG_BACKEND,
+            "shards": config.RAG_SHARDS,
+            "sidecar": config.RAG_SIDECAR or None,
             "k_note_threshold": config.K_NOTE_SIM_TH
         },
+        "inference_pool": inference_pool.stats(),
+        "batching": batcher.stats() if batcher else None,
+        "response_cache": response_cache.stats() if config.RESPONSE_CACHE_ENABLED else None,
+        "prefix_cache": prefix_cache.stats() if prefix_cache else None,
+        "sessions": session_store.stats() if session_store else None,
+        "candidates": candidate_generator.stats() if candidate_generator else None,
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus 스크레이프용 지표"""
+    gauges = {}
+    pool_stats = inference_pool.stats()
+    gauges["inference_in_flight"] = pool_stats["in_flight"]
+    gauges["inference_queue_depth"] = pool_stats["queue_depth"]
+    if config.RESPONSE_CACHE_ENABLED:
+        cache_stats = response_cache.stats()
+        gauges["response_cache_entries"] = cache_stats["entries"]
+        gauges["response_cache_hit_rate"] = cache_stats["hit_rate"]
+        gauges["response_cache_bytes"] = cache_stats["approx_bytes"]
+    return metrics.render(gauges)
+
 if __name__ == "__main__":
     import uvicorn
     
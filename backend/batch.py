@@ -0,0 +1,222 @@
+# backend/batch.py
+"""
+오프라인 일괄 교정 CLI
+
+    python -m backend.batch essays.jsonl -o corrected.jsonl
+    python -m backend.batch essays.csv -o hints.jsonl --retrieval-only --workers 8
+
+입력(JSONL/CSV)을 청크 단위로 스트리밍하며 문장 분리 → 중복 제거 →
+프로세스 풀 RAG 검색 → 배치 생성 순으로 처리하고, 청크마다 결과를 JSONL에 추가합니다.
+출력 파일 자체가 체크포인트이므로 중단 후 같은 명령을 다시 실행하면 끝난 레코드는 건너뜁니다.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import config
+from utils.text_processing import split_sentences
+
+# 워커 프로세스별 검색기 (initializer에서 한 번만 로드, 인덱스는 memory-map 공유)
+_worker_retriever = None
+
+def read_records(path: Path, text_field: str, id_field: str) -> Iterator[Tuple[str, str]]:
+    """(레코드 ID, 텍스트) 스트리밍 (ID 필드가 없으면 줄 번호)"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for n, row in enumerate(rows):
+            text = row.get(text_field)
+            if text is None:
+                continue
+            rid = row.get(id_field)
+            yield (str(rid) if rid not in (None, "") else f"#{n}"), str(text)
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_checkpoint(path: Path, id_key: str = "id") -> Set[str]:
+    """이미 기록된 레코드 ID (마지막 줄이 잘려 있으면 잘라냄)"""
+    if not path.exists():
+        return set()
+    done = set()
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)[id_key])
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(line)
+    if valid_bytes != path.stat().st_size:
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+        print(f"✂️  Truncated partial record at end of {path}")
+    return done
+
+def _init_worker():
+    global _worker_retriever
+    from rag import RAGDatabase, create_retriever
+
+    db = RAGDatabase(config.RAG_DB_PATH)
+    db.load()
+    _worker_retriever = create_retriever(
+        db,
+        backend=config.RAG_BACKEND,
+        top_k=config.RAG_TOP_K,
+        min_sim=config.RAG_MIN_SIM,
+        exact_match=config.RAG_EXACT_MATCH,
+        embed_model=config.RAG_EMBED_MODEL,
+        embed_dtype=config.RAG_EMBED_DTYPE,
+        nprobe=config.RAG_ANN_NPROBE,
+        dense_weight=config.RAG_HYBRID_WEIGHT,
+        fuzzy_weight=config.RAG_FUZZY_WEIGHT,
+        fuzzy_min=config.RAG_FUZZY_MIN
+    )
+
+def _retrieve_batch(sentences: List[str]) -> List[List[Dict[str, Any]]]:
+    return _worker_retriever.retrieve_many(sentences)
+
+class SentenceCache:
+    """청크 간 문장 결과 LRU (에세이 간 반복 문장 재처리 방지)"""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def get(self, sentence: str) -> Optional[Dict[str, Any]]:
+        value = self._data.get(sentence)
+        if value is not None:
+            self._data.move_to_end(sentence)
+        return value
+
+    def put(self, sentence: str, value: Dict[str, Any]):
+        self._data[sentence] = value
+        self._data.move_to_end(sentence)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+class BatchCorrector:
+    """청크 단위 문장 검색/생성 파이프라인"""
+
+    def __init__(self, workers: int, retrieval_batch: int, gen_batch: int, retrieval_only: bool):
+        self.retrieval_batch = retrieval_batch
+        self.gen_batch = gen_batch
+        self.retrieval_only = retrieval_only
+        self.cache = SentenceCache()
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.ai = None
+        self.stats = {"records": 0, "sentences": 0, "unique_sentences": 0, "generated": 0}
+
+        if not retrieval_only:
+            from models import FriendsFixerAI
+
+            self.ai = FriendsFixerAI()
+            self.ai.initialize()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def process(self, records: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        split = [(rid, split_sentences(text)) for rid, text in records]
+
+        # 청크 내/이전 청크와 중복되지 않는 문장만 처리
+        todo = list(dict.fromkeys(
+            s for _, sents in split for s in sents if self.cache.get(s) is None
+        ))
+        self.stats["records"] += len(records)
+        self.stats["sentences"] += sum(len(sents) for _, sents in split)
+        self.stats["unique_sentences"] += len(todo)
+
+        if todo:
+            batches = [todo[i:i + self.retrieval_batch] for i in range(0, len(todo), self.retrieval_batch)]
+            hints = [h for batch in self.pool.map(_retrieve_batch, batches) for h in batch]
+            results = [{"hints": h} for h in hints]
+            if not self.retrieval_only:
+                self._generate(todo, results)
+            for sentence, result in zip(todo, results):
+                self.cache.put(sentence, result)
+
+        return [
+            {"id": rid, "sentences": [{"text": s, **self.cache.get(s)} for s in sents]}
+            for rid, sents in split
+        ]
+
+    def _generate(self, sentences: List[str], results: List[Dict[str, Any]]):
+        """LLM 교정 (generate_batch를 제공하면 gen_batch개씩 한 번에 생성)"""
+        for lo in range(0, len(sentences), self.gen_batch):
+            batch = sentences[lo:lo + self.gen_batch]
+            if hasattr(self.ai, "generate_batch") and len(batch) > 1:
+                outputs = self.ai.generate_batch(batch, [False] * len(batch))
+            else:
+                outputs = [self.ai.generate_response(message=s, show_hints=False) for s in batch]
+            for result, out in zip(results[lo:lo + len(batch)], outputs):
+                result["response"] = out["response"]
+            self.stats["generated"] += len(batch)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KillKong offline batch correction")
+    parser.add_argument("input", type=Path, help="입력 JSONL 또는 CSV")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="출력 JSONL (체크포인트 겸용)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--retrieval-only", action="store_true", help="LLM 없이 RAG 힌트만 기록")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="검색 프로세스 수")
+    parser.add_argument("--chunk-size", type=int, default=256, help="체크포인트 단위 레코드 수")
+    parser.add_argument("--retrieval-batch", type=int, default=64, help="워커 호출당 문장 수")
+    parser.add_argument("--gen-batch", type=int, default=max(1, config.BATCH_MAX_SIZE), help="생성 배치 크기")
+    parser.add_argument("--restart", action="store_true", help="기존 출력을 지우고 처음부터 실행")
+    args = parser.parse_args(argv)
+
+    if args.restart and args.output.exists():
+        args.output.unlink()
+    done = load_checkpoint(args.output)
+    if done:
+        print(f"⏩ Resuming: {len(done)} records already in {args.output}")
+
+    records = (r for r in read_records(args.input, args.text_field, args.id_field) if r[0] not in done)
+    corrector = BatchCorrector(args.workers, args.retrieval_batch, args.gen_batch, args.retrieval_only)
+    start = time.perf_counter()
+    try:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "a", encoding="utf-8") as out:
+            for chunk in chunked(records, args.chunk_size):
+                lines = [json.dumps(r, ensure_ascii=False) + "\n" for r in corrector.process(chunk)]
+                out.write("".join(lines))
+                # 청크 단위로 디스크에 확정 (중단 시 이 지점부터 재개)
+                out.flush()
+                os.fsync(out.fileno())
+
+                s = corrector.stats
+                elapsed = time.perf_counter() - start
+                print(f"📝 {s['records']} records, {s['sentences']} sentences "
+                      f"({s['unique_sentences']} unique) in {elapsed:.1f}s")
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted — rerun the same command to resume")
+        return 130
+    finally:
+        corrector.close()
+
+    print(f"✨ Batch complete: {corrector.stats}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
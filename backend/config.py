@@ -1,5 +1,6 @@
 # backend/config.py
 import os
+import hashlib
 from pathlib import Path
 
 # 프로젝트 루트
@@ -19,19 +20,46 @@ class Config:
     TOP_K = 40
     REPETITION_PENALTY = 1.05
     RERANK_N = 3
+    RERANK_ADAPTIVE = True  # 첫 후보가 sim >= K_NOTE_SIM_TH 힌트의 natural 표현(콩글리시에 없는 단어)을 K_NOTE_SIM_TH 이상 언급하면 나머지 후보 생략
+    EARLY_STOP = True  # 교정 줄 + K-note 연결어 줄이 끝나면 후보별로 생성 종료
     
     # Device
     USE_4BIT = True
     COMPUTE_DTYPE_BF16 = True
     DEVICE = "cuda"  # torch에서 자동 감지
     
+    # Inference backend ("gpu": 4-bit bitsandbytes + LoRA, "cpu": scripts/export_cpu_model.py 아티팩트)
+    INFERENCE_BACKEND = os.getenv("KILLKONG_INFERENCE_BACKEND", "gpu")
+    CPU_MODEL_DIR = BASE_DIR / "backend" / "models" / "qwen2p5-1_5b-friendsfixer-cpu"
+    CPU_QUANT = "int8"  # "int8" | "none"
+    CPU_THREADS = None  # None이면 물리 코어 수
+    
     # RAG
     RAG_DB_PATH = BASE_DIR / "data" / "RAGdb_final.csv"
     RAG_TOP_K = 4
     RAG_MIN_SIM = 0.22
+    RAG_EXACT_MATCH = True  # 정확 일치 구문(두 단어 이상)은 TF-IDF 이전에 sim=1.0으로 반환
     RAG_STAGE = "both"  # "pre" | "post" | "both"
     POST_MIN_SIM = 0.35
     BLOCK_BAD_TOKENS = True
+    RAG_BACKEND = "tfidf"  # "tfidf" | "dense" | "hybrid" (dense/hybrid는 sentence-transformers 필요)
+    RAG_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    RAG_EMBED_DTYPE = "int8"  # "int8" | "float16"
+    RAG_ANN_NPROBE = 8  # IVF 탐색 리스트 수
+    RAG_HYBRID_WEIGHT = 0.5  # hybrid 점수 중 dense 비중
+    RAG_FUZZY_WEIGHT = 0.8  # 문자 trigram(오타/붙여쓰기) 점수 가중치, 0이면 비활성화
+    RAG_FUZZY_MIN = 0.6  # 패턴 trigram 중 쿼리에 포함되어야 하는 최소 비율
+    RAG_WATCH = False  # CSV 변경 감시 후 자동 핫 리로드
+    RAG_WATCH_INTERVAL = 5.0  # 초
+    RAG_SHARDS = 0  # TF-IDF 행렬 행 샤드 수 (2 이상이면 프로세스 풀 병렬 검색, tfidf 백엔드 전용)
+    RAG_SHARD_WORKERS = None  # 샤드 검색 프로세스 수 (None이면 샤드 수, 0이면 현재 프로세스에서 순차 검색)
+    # 노드 공유 RAG 사이드카 주소 ("host:port" 또는 Unix 소켓 경로), 설정 시 API 워커는 인덱스를 로드하지 않음
+    RAG_SIDECAR = os.getenv("KILLKONG_RAG_SIDECAR", "")
+    RAG_SIDECAR_SOCKET = BASE_DIR / "data" / "rag-sidecar.sock"  # run_rag_sidecar.py 기본 주소 (0600 Unix 소켓)
+    # 사이드카 인증 키 (필수, 기본값 없음): 연결은 pickle을 주고받으므로 키를 아는 사용자는 사이드카에서 코드를 실행할 수 있음
+    RAG_SIDECAR_AUTHKEY = os.getenv("KILLKONG_RAG_SIDECAR_KEY", "")
+    RAG_SIDECAR_TIMEOUT = 5.0  # 호출당 응답 대기 (초)
+    RAG_SIDECAR_CONNECT_TIMEOUT = 60.0  # 시작 시 사이드카 준비 대기 (초)
     
     # K-note
     K_NOTE_SIM_TH = 0.28
@@ -41,10 +69,81 @@ class Config:
     # Random seed
     SEED = 42
     
+    # Inference worker pool
+    INFERENCE_MAX_CONCURRENCY = 1  # 동시 생성 수 (GPU 1장 기준)
+    INFERENCE_MAX_QUEUE = 16  # 초과 시 503 + Retry-After
+    INFERENCE_RETRY_AFTER = 5  # 초
+    
+    # Gradio demo (app_gradio.py는 위 추론 워커 풀과 모델을 API와 공유)
+    GRADIO_CONCURRENCY_LIMIT = 4  # 동시에 실행하는 Gradio 이벤트 수 (생성 자체는 INFERENCE_MAX_CONCURRENCY로 제한)
+    GRADIO_MAX_QUEUE = 64  # Gradio 대기열 상한 (초과 시 방문자에게 바로 "busy" 표시)
+    GRADIO_WARM_EXAMPLES = True  # 모델 로드 직후 gr.Examples 응답을 미리 생성
+    
+    # Micro-batching (FriendsFixerAI.generate_batch 지원 시 사용)
+    BATCH_WINDOW_MS = 10  # 요청 수집 대기 시간
+    BATCH_MAX_SIZE = 4  # 1이면 비활성화
+    
+    # Prompt prefix KV cache (고정 시스템 프롬프트는 한 번만 prefill)
+    PREFIX_CACHE_ENABLED = True
+    PREFIX_CACHE_MAX_ENTRIES = 2  # 동시에 보관할 prefix 버전 수
+    PREFIX_CACHE_MAX_TOKENS = 2048  # 이보다 긴 prefix는 캐시하지 않음
+    
+    # Response encoding (Accept-Encoding: br/gzip, Accept: application/msgpack)
+    COMPRESSION_ENABLED = True
+    COMPRESSION_MIN_SIZE = 512  # bytes, 이보다 작은 응답은 압축하지 않음
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    PATTERNS_MAX_AGE = 300  # /api/v1/patterns Cache-Control max-age (이후 ETag로 재검증)
+    
+    # Multi-turn sessions (ChatRequest.session_id)
+    SESSION_ENABLED = True
+    SESSION_DB_PATH = BASE_DIR / "data" / "sessions.db"
+    SESSION_MAX_ACTIVE = 10000  # 메모리에 둘 세션 수 (LRU, 나머지는 SQLite에서 다시 읽음)
+    SESSION_MAX_TURNS = 8  # 세션당 보관할 최근 턴 수
+    SESSION_MAX_TOKENS = 1024  # 세션당 대화 기록 토큰 상한 (초과 시 오래된 턴부터 제거)
+    SESSION_HINT_CACHE = 64  # 세션당 힌트를 캐시할 문장 수
+    SESSION_FLUSH_INTERVAL = 1.0  # 초 (변경된 세션을 모아 한 번에 기록)
+    SESSION_TTL_DAYS = 7  # 시작 시 이보다 오래된 세션 삭제
+    
+    # Response cache
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 3600  # 초
+    RESPONSE_CACHE_MODE = "sample"  # "sample": 서로 다른 응답 RERANK_N개를 모은 뒤 무작위 반환 | "deterministic": 첫 응답 고정
+    
+    # Admin (미설정 시 관리 엔드포인트 비활성화(404), 설정 시 X-Admin-Token 헤더 필요)
+    ADMIN_TOKEN = os.environ.get("KILLKONG_ADMIN_TOKEN", "")
+    
+    # Metrics
+    METRICS_ENABLED = True  # /metrics 단계별 히스토그램
+    METRICS_DEBUG = True  # ChatRequest.debug=true 요청에 단계별 시간 포함 허용
+    
+    @classmethod
+    def generation_fingerprint(cls) -> str:
+        """응답에 영향을 주는 설정의 해시 (설정 변경 시 캐시 무효화)"""
+        keys = [
+            "BASE_MODEL", "MODEL_DIR", "MAX_NEW_TOKENS", "TEMPERATURE", "TOP_P", "TOP_K",
+            "REPETITION_PENALTY", "RERANK_N", "RERANK_ADAPTIVE", "EARLY_STOP", "RAG_DB_PATH", "RAG_TOP_K", "RAG_MIN_SIM",
+            "RAG_STAGE", "POST_MIN_SIM", "BLOCK_BAD_TOKENS", "K_NOTE_SIM_TH",
+            "K_NOTE_CONNECTORS", "K_NOTE_ENFORCE", "SEED", "INFERENCE_BACKEND", "CPU_QUANT"
+        ]
+        raw = "|".join(f"{k}={getattr(cls, k)!r}" for k in keys)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+    
     @classmethod
     def validate(cls):
         """설정 검증"""
-        if not cls.MODEL_DIR.exists():
+        if cls.INFERENCE_BACKEND == "cpu":
+            # CPU 노드: bitsandbytes 4-bit 대신 int8 export 사용
+            cls.DEVICE = "cpu"
+            cls.USE_4BIT = False
+            cls.COMPUTE_DTYPE_BF16 = False
+            if not cls.CPU_MODEL_DIR.exists():
+                print(f"⚠️  CPU model not found: {cls.CPU_MODEL_DIR} (run scripts/export_cpu_model.py)")
+        elif cls.INFERENCE_BACKEND != "gpu":
+            print(f"⚠️  Unknown INFERENCE_BACKEND '{cls.INFERENCE_BACKEND}', using gpu")
+            cls.INFERENCE_BACKEND = "gpu"
+        elif not cls.MODEL_DIR.exists():
             print(f"⚠️  Model directory not found: {cls.MODEL_DIR}")
         if not cls.RAG_DB_PATH.exists():
             print(f"⚠️  RAG database not found: {cls.RAG_DB_PATH}")
@@ -1,5 +1,10 @@
 # backend/rag/__init__.py
 from .database import RAGDatabase
-from .retriever import RAGRetriever
+from .retriever import RetrievalContext, RAGRetriever, DenseRetriever, HybridRetriever, create_retriever
+from .registry import RAGRegistry
+from .shards import ShardedRetriever, ShardedSearcher, shutdown_shard_pool
+from .sidecar import SidecarClient, SidecarError, SidecarRegistry, SidecarServer, parse_address
 
-__all__ = ["RAGDatabase", "RAGRetriever"]
\ No newline at end of file
+__all__ = ["RAGDatabase", "RetrievalContext", "RAGRetriever", "DenseRetriever", "HybridRetriever", "create_retriever", "RAGRegistry",
+           "ShardedRetriever", "ShardedSearcher", "shutdown_shard_pool",
+           "SidecarClient", "SidecarError", "SidecarRegistry", "SidecarServer", "parse_address"]
\ No newline at end of file
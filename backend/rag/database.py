@@ -1,18 +1,33 @@
 # backend/rag/database.py
-import pandas as pd
-import unicodedata
-import re
+import os
+import sys
+import json
+import hashlib
+import shutil
+import tempfile
+import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Tuple, Optional, Sequence, List, Dict, Any, TYPE_CHECKING
+from scipy.sparse import csr_matrix, vstack
+from utils.text_processing import normalize_many
+from .matcher import PhraseMatcher
+from .fuzzy import CharNgramIndex
+from .vectorizer import IndexVectorizer
 
-def normalize_text(s: str) -> str:
-    """텍스트 정규화"""
-    s = unicodedata.normalize("NFKC", str(s))
-    return re.sub(r"\s+", " ", s).strip()
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
-def read_csv_safely(path: str) -> pd.DataFrame:
+# 인덱스 아티팩트 포맷 버전 (벡터라이저 설정이 바뀌면 올릴 것)
+INDEX_FORMAT_VERSION = 3
+
+# 핫 리로드 시 증분 추가를 허용하는 최대 신규 행 비율 (초과 시 IDF 재계산을 위해 전체 재학습)
+INCREMENTAL_MAX_FRACTION = 0.1
+
+def read_csv_safely(path: str) -> "pd.DataFrame":
     """안전한 CSV 읽기"""
+    import pandas as pd
+    
     encodings = ["utf-8", "utf-8-sig", "cp949", "euc-kr", "latin1", "windows-1252", "mac_roman"]
     last_err = None
     for enc in encodings:
@@ -22,7 +37,34 @@ def read_csv_safely(path: str) -> pd.DataFrame:
             last_err = e
     raise RuntimeError(f"Failed to read CSV. Last error:\n{last_err}")
 
-def infer_cols(df: pd.DataFrame) -> Tuple[str, str, Optional[str]]:
+def file_digest(path: Path) -> str:
+    """파일 내용 SHA-256 해시"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def make_vectorizer() -> "TfidfVectorizer":
+    """RAG 인덱싱용 TF-IDF 벡터라이저 (학습할 때만 sklearn import)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    return TfidfVectorizer(
+        ngram_range=(1, 3),
+        analyzer="word",
+        token_pattern=r"(?u)\b\w[\w'-]*\b",
+        lowercase=True,
+        min_df=1,
+        max_df=0.95
+    )
+
+def index_texts(bad: Sequence[str], ctx: Optional[Sequence[str]]) -> List[str]:
+    """TF-IDF 인덱싱 대상 텍스트 (BAD || CTX)"""
+    if ctx is None:
+        return [str(b) for b in bad]
+    return [f"{b} || {c}" for b, c in zip(bad, ctx)]
+
+def infer_cols(df: "pd.DataFrame") -> Tuple[str, str, Optional[str]]:
     """컬럼 자동 감지"""
     cols = [c.lower() for c in df.columns]
     bad_cands = {"konglish", "wrong", "bad", "input", "term", "word", "pattern", "phrase", "error", "typo", "original"}
@@ -50,20 +92,167 @@ def infer_cols(df: pd.DataFrame) -> Tuple[str, str, Optional[str]]:
     
     return bad, good, ctx
 
+def pattern_id(bad: str, good: str, ctx: str) -> str:
+    """패턴 행의 안정적인 ID (행 순서/CSV 재배치와 무관, 내용이 바뀌면 달라짐)"""
+    return hashlib.blake2b(f"{bad}\x1f{good}\x1f{ctx}".encode("utf-8"), digest_size=6).hexdigest()
+
+class PatternStore:
+    """패턴 컬럼 저장소 (쿼리 시점에는 pandas를 사용하지 않음)"""
+    
+    __slots__ = ("bad", "good", "ctx", "key_ids", "_ids")
+    
+    def __init__(self, bad: Sequence[str], good: Sequence[str], ctx: Optional[Sequence[str]] = None):
+        # 같은 BAD 문자열은 하나의 객체/키를 공유
+        self.bad = tuple(sys.intern(b) for b in bad)
+        self.good = tuple(good)
+        self.ctx = tuple(ctx) if ctx is not None else ("",) * len(self.bad)
+        
+        first_row: Dict[str, int] = {}
+        self.key_ids = np.fromiter(
+            (first_row.setdefault(b, i) for i, b in enumerate(self.bad)),
+            dtype=np.int64,
+            count=len(self.bad)
+        )
+        self._ids: Optional[Tuple[str, ...]] = None
+    
+    def __len__(self) -> int:
+        return len(self.bad)
+    
+    @property
+    def ids(self) -> Tuple[str, ...]:
+        """행별 pattern_id (처음 사용할 때 계산)"""
+        if self._ids is None:
+            self._ids = tuple(pattern_id(b, g, c) for b, g, c in zip(self.bad, self.good, self.ctx))
+        return self._ids
+    
+    def hint(self, i: int, sim: float) -> Dict[str, Any]:
+        """행 i를 힌트 dict로 변환"""
+        return {
+            "id": self.ids[i],
+            "konglish": self.bad[i],
+            "natural": self.good[i],
+            "why": self.ctx[i],
+            "sim": round(sim, 4)
+        }
+
 class RAGDatabase:
     """RAG 데이터베이스 관리"""
     
-    def __init__(self, csv_path: Path):
-        self.csv_path = csv_path
-        self.db = None
+    def __init__(self, csv_path: Path, index_dir: Optional[Path] = None, use_index: bool = True):
+        self.csv_path = Path(csv_path)
+        # 컴파일된 인덱스는 CSV 옆 <이름>.index/<해시>/ 에 저장
+        self.index_root = Path(index_dir) if index_dir else self.csv_path.with_suffix(".index")
+        self.use_index = use_index
+        self.digest = None
+        self.patterns = None
+        self.matcher = None
+        self.fuzzy = None
+        self._frame = None
         self.vectorizer = None
         self.tfidf_mat = None
+        self.index_path = None  # tfidf_mat과 같은 내용의 디스크 인덱스 (샤드 워커가 memory-map)
+        self.pruned_terms = frozenset()  # max_df로 제외된 단어 (증분 업데이트 판단용)
         self.bad_col = None
         self.good_col = None
         self.ctx_col = None
         
+    def __len__(self) -> int:
+        return len(self.patterns) if self.patterns is not None else 0
+    
+    @property
+    def db(self) -> Optional["pd.DataFrame"]:
+        """패턴 DataFrame (하위 호환용, 접근 시에만 pandas로 생성)"""
+        if self.patterns is None:
+            return None
+        if self._frame is None:
+            import pandas as pd
+            data = {self.bad_col: self.patterns.bad, self.good_col: self.patterns.good}
+            if self.ctx_col:
+                data[self.ctx_col] = self.patterns.ctx
+            self._frame = pd.DataFrame(data)
+        return self._frame
+    
     def load(self):
-        """데이터베이스 로드 및 인덱싱"""
+        """데이터베이스 로드 및 인덱싱 (컴파일된 인덱스가 있으면 memory-map)"""
+        if not self.use_index:
+            self._build_from_csv()
+            return
+        
+        self.digest = file_digest(self.csv_path)
+        index_dir = self.index_root / self.digest[:16]
+        
+        if not self._index_is_valid(index_dir):
+            self._build_from_csv()
+            try:
+                self.save_index(index_dir)
+            except OSError as e:
+                print(f"⚠️  Failed to write RAG index ({e}), using in-memory index")
+                return
+        
+        self._load_index(index_dir)
+        print(f"🔍 RAG index memory-mapped from {index_dir}: {self.tfidf_mat.shape[0]} entries")
+    
+    def build_index(self) -> Path:
+        """CSV를 읽어 인덱스 아티팩트 생성 (이미 최신이면 재사용)"""
+        self.digest = file_digest(self.csv_path)
+        index_dir = self.index_root / self.digest[:16]
+        if not self._index_is_valid(index_dir):
+            self._build_from_csv()
+            self.save_index(index_dir)
+        self._prune_stale_indexes(keep=index_dir)
+        return index_dir
+    
+    def load_incremental(self, base: "RAGDatabase") -> str:
+        """이전 버전(base)을 기반으로 로드 (핫 리로드용)
+        
+        기존 행이 그대로 앞부분에 있고, 새 행이 전체의 INCREMENTAL_MAX_FRACTION 이하이며
+        새 행의 단어가 모두 기존 어휘에 있으면 기존 벡터라이저로 새 행만 변환해 덧붙이고
+        ("incremental", 처음 보는 2~3-gram은 무시), 아니면 전체 재학습("full").
+        IDF는 기존 값을 유지하며, 디스크 인덱스는 전체 빌드일 때만 기록합니다.
+        """
+        if base is None or base.vectorizer is None or base.patterns is None:
+            self.load()
+            return "full"
+        
+        self.digest = file_digest(self.csv_path)
+        bad, good, ctx = self._read_rows()
+        n_old = len(base.patterns)
+        old = base.patterns
+        same_prefix = (
+            len(bad) >= n_old
+            and (self.bad_col, self.good_col, self.ctx_col) == (base.bad_col, base.good_col, base.ctx_col)
+            and tuple(bad[:n_old]) == old.bad
+            and tuple(good[:n_old]) == old.good
+            and (ctx is None or tuple(ctx[:n_old]) == old.ctx)
+        )
+        
+        if same_prefix and len(bad) - n_old <= INCREMENTAL_MAX_FRACTION * n_old:
+            new_texts = index_texts(bad[n_old:], ctx[n_old:] if ctx is not None else None)
+            preprocess = base.vectorizer.build_preprocessor()
+            tokenize = base.vectorizer.build_tokenizer()
+            vocab = base.vectorizer.vocabulary_
+            known = lambda tok: tok in vocab or tok in base.pruned_terms
+            if all(known(tok) for text in new_texts for tok in tokenize(preprocess(text))):
+                mats = [base.tfidf_mat]
+                if new_texts:
+                    mats.append(base.vectorizer.transform(new_texts))
+                self.vectorizer = base.vectorizer
+                self.pruned_terms = base.pruned_terms
+                self.tfidf_mat = vstack(mats, format="csr")
+                self._set_patterns(bad, good, ctx)
+                print(f"🔁 RAG database updated incrementally: +{len(new_texts)} entries")
+                return "incremental"
+        
+        self._fit(bad, good, ctx)
+        if self.use_index:
+            try:
+                self.save_index(self.index_root / self.digest[:16])
+            except OSError as e:
+                print(f"⚠️  Failed to write RAG index ({e}), using in-memory index")
+        return "full"
+    
+    def _read_rows(self) -> Tuple[List[str], List[str], Optional[List[str]]]:
+        """CSV 디코딩 및 정규화 (pandas는 로드 시점에만 사용)"""
         df = read_csv_safely(str(self.csv_path))
         print(f"📋 RAG database columns: {list(df.columns)}")
         
@@ -77,25 +266,130 @@ class RAGDatabase:
         if self.ctx_col:
             cols_to_keep.append(self.ctx_col)
         
-        self.db = _df[cols_to_keep].dropna().drop_duplicates().reset_index(drop=True)
-        self.db[self.bad_col] = self.db[self.bad_col].map(normalize_text)
-        self.db[self.good_col] = self.db[self.good_col].map(normalize_text)
-        if self.ctx_col:
-            self.db[self.ctx_col] = self.db[self.ctx_col].map(normalize_text)
+        db = _df[cols_to_keep].dropna().drop_duplicates().reset_index(drop=True)
+        bad = normalize_many(db[self.bad_col])
+        good = normalize_many(db[self.good_col])
+        ctx = normalize_many(db[self.ctx_col]) if self.ctx_col else None
+        return bad, good, ctx
+    
+    def _build_from_csv(self):
+        """CSV 디코딩, 정규화 및 TF-IDF 학습"""
+        self._fit(*self._read_rows())
+    
+    def _fit(self, bad: List[str], good: List[str], ctx: Optional[List[str]]):
+        """TF-IDF 인덱싱"""
+        texts = index_texts(bad, ctx)
+        self.vectorizer = make_vectorizer()
+        self.tfidf_mat = self.vectorizer.fit_transform(texts)
+        preprocess = self.vectorizer.build_preprocessor()
+        tokenize = self.vectorizer.build_tokenizer()
+        vocab = self.vectorizer.vocabulary_
+        self.pruned_terms = frozenset(
+            tok for text in texts for tok in tokenize(preprocess(text)) if tok not in vocab
+        )
+        self._set_patterns(bad, good, ctx)
         
-        # TF-IDF 인덱싱
-        index_text = self.db[self.bad_col].astype(str)
+        print(f"🔍 RAG database loaded and indexed: {self.tfidf_mat.shape[0]} entries")
+    
+    def _set_patterns(self, bad: Sequence[str], good: Sequence[str], ctx: Optional[Sequence[str]],
+                      fuzzy: Optional[CharNgramIndex] = None):
+        self.patterns = PatternStore(bad, good, ctx)
+        # 한 단어 패턴(schedule, health 등)은 평범한 영어 단어라 정확 일치 대신 TF-IDF 점수로 판단
+        self.matcher = PhraseMatcher(self.patterns.bad, min_tokens=2)
+        self.fuzzy = fuzzy or CharNgramIndex(self.patterns.bad)
+        self._frame = None
+    
+    def _index_is_valid(self, index_dir: Path) -> bool:
+        """인덱스 아티팩트가 현재 CSV/포맷과 일치하는지 확인"""
+        try:
+            meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return meta.get("version") == INDEX_FORMAT_VERSION and meta.get("csv_sha256") == self.digest
+    
+    def save_index(self, index_dir: Path):
+        """인덱스 아티팩트 저장 (임시 디렉토리에 쓴 뒤 원자적으로 rename)"""
+        mat = self.tfidf_mat.tocsr()
+        vocab = [None] * len(self.vectorizer.vocabulary_)
+        for term, j in self.vectorizer.vocabulary_.items():
+            vocab[j] = term
+        
+        rows = {"bad": list(self.patterns.bad), "good": list(self.patterns.good)}
         if self.ctx_col:
-            index_text = index_text + " || " + self.db[self.ctx_col].astype(str)
-        
-        self.vectorizer = TfidfVectorizer(
-            ngram_range=(1, 3),
-            analyzer="word",
-            token_pattern=r"(?u)\b\w[\w'-]*\b",
-            lowercase=True,
-            min_df=1,
-            max_df=0.95
+            rows["ctx"] = list(self.patterns.ctx)
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "csv_sha256": self.digest,
+            "columns": {"bad": self.bad_col, "good": self.good_col, "ctx": self.ctx_col},
+            "shape": list(mat.shape),
+            "pruned_terms": sorted(self.pruned_terms),
+        }
+        
+        index_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{index_dir.name}-", dir=index_dir.parent))
+        try:
+            np.save(tmp_dir / "data.npy", mat.data)
+            np.save(tmp_dir / "indices.npy", mat.indices)
+            np.save(tmp_dir / "indptr.npy", mat.indptr)
+            np.save(tmp_dir / "idf.npy", self.vectorizer.idf_)
+            (tmp_dir / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+            np.save(tmp_dir / "fuzzy_offsets.npy", self.fuzzy.offsets)
+            np.save(tmp_dir / "fuzzy_postings.npy", self.fuzzy.postings)
+            np.save(tmp_dir / "fuzzy_counts.npy", self.fuzzy.gram_counts)
+            (tmp_dir / "fuzzy_vocab.json").write_text(
+                json.dumps(self.fuzzy.vocab_list(), ensure_ascii=False), encoding="utf-8"
+            )
+            (tmp_dir / "rows.json").write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+            # meta.json은 마지막에 기록 (존재 여부가 완성 표시)
+            (tmp_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            if index_dir.exists() and not self._index_is_valid(index_dir):
+                # 같은 CSV의 이전 포맷 인덱스는 교체
+                shutil.rmtree(index_dir, ignore_errors=True)
+            os.replace(tmp_dir, index_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # 다른 워커가 먼저 같은 인덱스를 완성한 경우
+            if not self._index_is_valid(index_dir):
+                raise
+        self.index_path = index_dir
+        print(f"💾 RAG index written to {index_dir}")
+    
+    def _load_index(self, index_dir: Path):
+        """인덱스 아티팩트 memory-map 로드 (워커 간 페이지 캐시 공유)"""
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        cols = meta["columns"]
+        self.bad_col, self.good_col, self.ctx_col = cols["bad"], cols["good"], cols["ctx"]
+        self.pruned_terms = frozenset(meta.get("pruned_terms", ()))
+        
+        rows = json.loads((index_dir / "rows.json").read_text(encoding="utf-8"))
+        fuzzy = CharNgramIndex.from_arrays(
+            json.loads((index_dir / "fuzzy_vocab.json").read_text(encoding="utf-8")),
+            np.load(index_dir / "fuzzy_offsets.npy", mmap_mode="r"),
+            np.load(index_dir / "fuzzy_postings.npy", mmap_mode="r"),
+            np.load(index_dir / "fuzzy_counts.npy", mmap_mode="r"),
+            rows["bad"]
+        )
+        self._set_patterns(rows["bad"], rows["good"], rows.get("ctx"), fuzzy)
+        
+        vocab = json.loads((index_dir / "vocab.json").read_text(encoding="utf-8"))
+        self.vectorizer = IndexVectorizer(
+            {term: j for j, term in enumerate(vocab)},
+            np.load(index_dir / "idf.npy", mmap_mode="r")
         )
-        self.tfidf_mat = self.vectorizer.fit_transform(index_text.values.tolist())
         
-        print(f"🔍 RAG database loaded and indexed: {self.tfidf_mat.shape[0]} entries")
\ No newline at end of file
+        self.tfidf_mat = csr_matrix(
+            (
+                np.load(index_dir / "data.npy", mmap_mode="r"),
+                np.load(index_dir / "indices.npy", mmap_mode="r"),
+                np.load(index_dir / "indptr.npy", mmap_mode="r"),
+            ),
+            shape=tuple(meta["shape"]),
+            copy=False
+        )
+        self.index_path = index_dir
+    
+    def _prune_stale_indexes(self, keep: Path):
+        """이전 CSV 버전의 인덱스 정리 (같은 해시의 부가 인덱스는 유지)"""
+        for d in self.index_root.iterdir():
+            if d.is_dir() and not d.name.startswith((keep.name, ".")):
+                shutil.rmtree(d, ignore_errors=True)
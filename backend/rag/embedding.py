@@ -0,0 +1,177 @@
+# backend/rag/embedding.py
+import json
+import os
+import re
+import shutil
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# 이 행 수 미만이면 IVF 없이 전체 스캔 (양자화 행렬 곱이 더 빠름)
+IVF_MIN_ROWS = 4096
+
+Encoder = Callable[[Sequence[str]], np.ndarray]
+
+def load_encoder(model_name: str, device: str = "cpu") -> Encoder:
+    """sentence-transformers 임베딩 모델 로드 (선택 의존성)"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "RAG_BACKEND='dense'/'hybrid' requires sentence-transformers: pip install sentence-transformers"
+        ) from e
+
+    model = SentenceTransformer(model_name, device=device)
+
+    def encode(texts: Sequence[str]) -> np.ndarray:
+        return model.encode(list(texts), batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+
+    encode.model_name = model_name
+    return encode
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+def _quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """행 단위 양자화 (int8: 대칭 스케일, float16: 스케일 1)"""
+    if dtype == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown embedding dtype: {dtype}")
+
+def _spherical_kmeans(x: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """코사인 기준 k-means (IVF 코스 양자화기)"""
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        for c in range(k):
+            members = x[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                centroids[c] = x[rng.integers(len(x))]
+        centroids = _normalize_rows(centroids)
+    assign = np.argmax(x @ centroids.T, axis=1)
+    return centroids, assign
+
+class EmbeddingIndex:
+    """양자화된(int8/float16) 임베딩 행렬 + IVF 근사 최근접 이웃 인덱스
+
+    행렬은 .npy로 저장하여 memory-map으로 워커 간 공유합니다.
+    행 수가 IVF_MIN_ROWS 미만이면 전체 스캔, 이상이면 nprobe개 리스트만 탐색합니다.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray, centroids: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None, list_ids: Optional[np.ndarray] = None,
+                 nprobe: int = 8):
+        self.codes = codes
+        self.scales = scales
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.centroids is not None and len(self.centroids) > 0
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, dtype: str = "int8", nlist: Optional[int] = None,
+              nprobe: int = 8, seed: int = 0) -> "EmbeddingIndex":
+        vectors = _normalize_rows(vectors)
+        codes, scales = _quantize(vectors, dtype)
+        if nlist is None:
+            nlist = int(np.sqrt(len(vectors))) if len(vectors) >= IVF_MIN_ROWS else 0
+        if not nlist:
+            return cls(codes, scales, nprobe=nprobe)
+
+        centroids, assign = _spherical_kmeans(vectors, nlist, seed=seed)
+        list_ids = np.argsort(assign, kind="stable").astype(np.int64)
+        list_offsets = np.searchsorted(assign[list_ids], np.arange(nlist + 1)).astype(np.int64)
+        return cls(codes, scales, centroids.astype(np.float32), list_offsets, list_ids, nprobe)
+
+    def save(self, index_dir: Path):
+        """원자적으로 저장 (임시 디렉토리 → rename)"""
+        index_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{index_dir.name}-", dir=index_dir.parent))
+        try:
+            np.save(tmp_dir / "codes.npy", self.codes)
+            np.save(tmp_dir / "scales.npy", self.scales)
+            if self.is_ivf:
+                np.save(tmp_dir / "centroids.npy", self.centroids)
+                np.save(tmp_dir / "list_offsets.npy", self.list_offsets)
+                np.save(tmp_dir / "list_ids.npy", self.list_ids)
+            (tmp_dir / "meta.json").write_text(json.dumps({"rows": len(self), "ivf": self.is_ivf}), encoding="utf-8")
+            os.replace(tmp_dir, index_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not (index_dir / "meta.json").exists():
+                raise
+
+    @classmethod
+    def load(cls, index_dir: Path, nprobe: int = 8) -> "EmbeddingIndex":
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        mm = lambda name: np.load(index_dir / name, mmap_mode="r")
+        if meta["ivf"]:
+            return cls(mm("codes.npy"), mm("scales.npy"), mm("centroids.npy"),
+                       mm("list_offsets.npy"), mm("list_ids.npy"), nprobe)
+        return cls(mm("codes.npy"), mm("scales.npy"), nprobe=nprobe)
+
+    def score_rows(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """쿼리 벡터 q와 지정 행들의 코사인 유사도 (역양자화)"""
+        return (self.codes[rows].astype(np.float32) @ q) * self.scales[rows]
+
+    def search(self, queries: np.ndarray, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """쿼리별 상위 n_cand개 (행 번호, 유사도)"""
+        queries = _normalize_rows(queries)
+        if not self.is_ivf:
+            sims = (self.codes.astype(np.float32) @ queries.T) * self.scales[:, None]
+            return [self._top(np.arange(len(self)), sims[:, n], n_cand) for n in range(len(queries))]
+
+        results = []
+        nprobe = min(self.nprobe, len(self.centroids))
+        for q in queries:
+            probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+            rows = np.concatenate([self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+            results.append(self._top(rows, self.score_rows(q, rows), n_cand))
+        return results
+
+    @staticmethod
+    def _top(rows: np.ndarray, scores: np.ndarray, n_cand: int) -> Tuple[np.ndarray, np.ndarray]:
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+            return rows[part], scores[part]
+        return rows, scores
+
+def embedding_index_for(database, encoder: Encoder, dtype: str = "int8", nprobe: int = 8) -> EmbeddingIndex:
+    """RAGDatabase의 BAD 컬럼 임베딩 인덱스 (CSV 해시별 캐시가 있으면 memory-map)"""
+    model_name = getattr(encoder, "model_name", "custom")
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    index_dir = None
+    if database.digest:
+        index_dir = database.index_root / f"{database.digest[:16]}.embed-{slug}-{dtype}"
+        if (index_dir / "meta.json").exists():
+            index = EmbeddingIndex.load(index_dir, nprobe)
+            if len(index) == len(database):
+                return index
+
+    index = EmbeddingIndex.build(encoder(database.patterns.bad), dtype=dtype, nprobe=nprobe)
+    if index_dir is not None:
+        try:
+            index.save(index_dir)
+            index = EmbeddingIndex.load(index_dir, nprobe)
+        except OSError as e:
+            print(f"⚠️  Failed to write embedding index ({e}), using in-memory index")
+    print(f"🧭 Embedding index ready: {len(index)} entries ({dtype}, {'IVF' if index.is_ivf else 'flat'})")
+    return index
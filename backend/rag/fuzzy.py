@@ -0,0 +1,163 @@
+# backend/rag/fuzzy.py
+import re
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from utils.text_processing import tok_list
+from .matcher import inflection_base
+
+# 문자 n-gram 길이와 쿼리에서 이어 붙일 최대 인접 단어 수 (TF-IDF 1~3-gram과 동일)
+GRAM_SIZE = 3
+MAX_WINDOW = 3
+# 이보다 n-gram이 적은 짧은 패턴(예: "sns")은 우연 일치가 많아 퍼지 색인에서 제외
+MIN_GRAMS = 3
+# 단어 경계에 맞춘 쿼리 구간과 패턴의 최소 편집 유사도 (1 - 거리 / 긴 쪽 길이, 오타 1~2개 허용)
+MIN_EDIT_SIM = 0.75
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+def compact(text: str) -> str:
+    """공백/하이픈/구두점 제거 (hand-phone, hand phone → handphone)"""
+    return _NON_WORD.sub("", text.lower())
+
+def char_grams(text: str, n: int = GRAM_SIZE) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def word_keys(text: str) -> List[str]:
+    """비교용 단어 목록 (구두점 제거 + 복수형/소유격 어미 제거)"""
+    return [k for k in (inflection_base(compact(t)) for t in tok_list(text)) if k]
+
+def windows(toks: List[str], window: int = MAX_WINDOW):
+    """인접 1~window개 단어를 붙인 문자열 (단어 경계에서 시작/끝)"""
+    for i in range(len(toks)):
+        for j in range(i + 1, min(i + window, len(toks)) + 1):
+            yield "".join(toks[i:j])
+
+def query_grams(query: str, n: int = GRAM_SIZE, window: int = MAX_WINDOW) -> set:
+    """인접 1~window개 단어를 붙인 문자열들의 문자 n-gram 합집합"""
+    grams = set()
+    for w in windows([compact(t) for t in tok_list(query)], window):
+        grams |= char_grams(w, n)
+    return grams
+
+def edit_similarity(a: str, b: str) -> float:
+    """1 - (인접 글자 뒤바꿈을 1회로 세는 편집 거리) / 긴 쪽 길이"""
+    if a == b:
+        return 1.0
+    n, m = len(a), len(b)
+    if not n or not m:
+        return 0.0
+    prev2, prev = None, list(range(m + 1))
+    for i in range(1, n + 1):
+        cur = [i] + [0] * m
+        for j in range(1, m + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return 1.0 - prev[m] / max(n, m)
+
+def is_typo_match(query_keys: List[str], phrase: str, min_sim: float = MIN_EDIT_SIM) -> bool:
+    """trigram 후보가 실제 오타/붙여쓰기 변형인지 확인
+
+    - 패턴 단어가 쿼리에 그대로 있으면 제외 (정확 일치/TF-IDF가 처리)
+    - 붙여 쓴 구간이 패턴과 같으면 인정 (handphone, hand-phone)
+    - 패턴 단어가 더 긴 쿼리 단어의 일부면 제외 (health → healthy, apart → apartment)
+    - 그 외에는 단어 경계에 맞춘 구간 중 하나가 min_sim 이상 비슷해야 함 (eye shoping)
+    """
+    p_keys = word_keys(phrase)
+    if not p_keys:
+        return False
+    k = len(p_keys)
+    if any(query_keys[i:i + k] == p_keys for i in range(len(query_keys) - k + 1)):
+        return False
+    target = "".join(p_keys)
+    spans = list(windows(query_keys))
+    if target in spans:
+        return True
+    if any(t != q and t in q for t in p_keys if len(t) >= GRAM_SIZE for q in query_keys):
+        return False
+    # 길이 차이만으로 min_sim을 넘을 수 없는 구간은 건너뜀
+    return any(
+        edit_similarity(w, target) >= min_sim
+        for w in spans if abs(len(w) - len(target)) <= (1 - min_sim) * max(len(w), len(target))
+    )
+
+class CharNgramIndex:
+    """BAD 컬럼의 문자 trigram 역색인 (오타/붙여쓰기 허용 검색)
+
+    점수는 패턴 n-gram 중 쿼리에 포함된 비율(containment)입니다.
+    후보는 쿼리 n-gram의 포스팅 리스트를 모아 행별 공통 개수를 세는 방식으로만 만들며
+    전체 행렬을 훑지 않습니다. phrases가 있으면 후보마다 is_typo_match로 확인해
+    정상 영어 단어 속에 짧은 패턴이 들어 있는 경우(apartment ⊃ apart)를 걸러냅니다.
+    """
+
+    __slots__ = ("vocab", "offsets", "postings", "gram_counts", "phrases")
+
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = phrases
+        vocab: Dict[str, int] = {}
+        gram_ids, rows = [], []
+        gram_counts = np.zeros(len(phrases), dtype=np.float32)
+        for row, phrase in enumerate(phrases):
+            grams = char_grams(compact(phrase))
+            if len(grams) < MIN_GRAMS:
+                continue
+            gram_counts[row] = len(grams)
+            for g in grams:
+                gram_ids.append(vocab.setdefault(g, len(vocab)))
+                rows.append(row)
+
+        gram_ids = np.asarray(gram_ids, dtype=np.int64)
+        order = np.argsort(gram_ids, kind="stable")
+        self.vocab = vocab
+        self.postings = np.asarray(rows, dtype=np.int32)[order]
+        self.offsets = np.searchsorted(gram_ids[order], np.arange(len(vocab) + 1)).astype(np.int64)
+        self.gram_counts = gram_counts
+
+    @classmethod
+    def from_arrays(cls, vocab: Sequence[str], offsets: np.ndarray, postings: np.ndarray,
+                    gram_counts: np.ndarray, phrases: Sequence[str] = None) -> "CharNgramIndex":
+        """저장된 인덱스 아티팩트에서 복원 (재색인 없이 memory-map 배열 사용)"""
+        index = cls.__new__(cls)
+        index.phrases = phrases
+        index.vocab = {g: i for i, g in enumerate(vocab)}
+        index.offsets = offsets
+        index.postings = postings
+        index.gram_counts = gram_counts
+        return index
+
+    def vocab_list(self) -> List[str]:
+        vocab = [None] * len(self.vocab)
+        for g, i in self.vocab.items():
+            vocab[i] = g
+        return vocab
+
+    def __len__(self) -> int:
+        return len(self.gram_counts)
+
+    def search(self, query: str, n_cand: int, min_score: float = 0.6) -> Tuple[np.ndarray, np.ndarray]:
+        """(후보 행 번호, containment 점수) — min_score 이상, 상위 n_cand개"""
+        ids = [self.vocab[g] for g in query_grams(query) if g in self.vocab]
+        if not ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        offsets = self.offsets
+        hits = np.concatenate([self.postings[offsets[i]:offsets[i + 1]] for i in ids])
+        counts = np.bincount(hits, minlength=len(self))
+        # 점수 하한을 넘으려면 최소 이만큼은 겹쳐야 함
+        rows = np.flatnonzero(counts >= MIN_GRAMS * min_score)
+        scores = counts[rows] / self.gram_counts[rows]
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep].astype(np.float32)
+        if self.phrases is not None and len(rows):
+            query_keys = word_keys(query)
+            keep = np.array([is_typo_match(query_keys, self.phrases[r]) for r in rows], dtype=bool)
+            rows, scores = rows[keep], scores[keep]
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+            rows, scores = rows[part], scores[part]
+        return rows, scores
+
+    def search_many(self, queries: List[str], n_cand: int, min_score: float = 0.6) -> List[Tuple[np.ndarray, np.ndarray]]:
+        return [self.search(q, n_cand, min_score) for q in queries]
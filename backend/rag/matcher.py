@@ -0,0 +1,74 @@
+# backend/rag/matcher.py
+from collections import deque
+from typing import List, Sequence, Tuple
+from utils.text_processing import tok_list, tok_spans
+
+def inflection_base(tok: str) -> str:
+    """복수형/소유격 어미 제거 (consumers → consumer, bus's → bus)"""
+    if tok.endswith("'s"):
+        return tok[:-2]
+    if len(tok) > 4 and tok.endswith("ies"):
+        return tok[:-3] + "y"
+    if len(tok) > 4 and tok.endswith(("ches", "shes", "xes", "sses")):
+        return tok[:-2]
+    if len(tok) > 3 and tok.endswith("s") and not tok.endswith(("ss", "us", "is")):
+        return tok[:-1]
+    return tok
+
+class PhraseMatcher:
+    """토큰 단위 Aho–Corasick 매처 (콩글리시 구문 정확 일치 탐색)
+
+    min_tokens보다 짧은 구문은 색인하지 않습니다.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, phrases: Sequence[str], min_tokens: int = 1):
+        goto = [{}]
+        out = [[]]
+        for row, phrase in enumerate(phrases):
+            toks = [inflection_base(t) for t in tok_list(phrase)]
+            if not toks or len(toks) < min_tokens:
+                continue
+            node = 0
+            for t in toks:
+                nxt = goto[node].get(t)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][t] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append((row, len(toks)))
+
+        # 실패 링크 (BFS)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for t, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and t not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(t, 0) if node else 0
+                out[child] = out[child] + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """(행 번호, 시작 오프셋, 끝 오프셋) 목록 반환 (한 번의 선형 탐색)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        spans = tok_spans(text)
+        hits = []
+        node = 0
+        for k, (tok, _, end) in enumerate(spans):
+            t = inflection_base(tok)
+            while node and t not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(t, 0)
+            for row, n in out[node]:
+                hits.append((row, spans[k - n + 1][1], end))
+        return hits
@@ -0,0 +1,154 @@
+# backend/rag/registry.py
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from .database import RAGDatabase, file_digest
+from .retriever import RAGRetriever
+
+class RAGSnapshot:
+    """한 버전의 RAGDatabase/RAGRetriever 쌍 (생성 후 변경하지 않음)"""
+
+    __slots__ = ("db", "retriever", "version", "digest", "mode", "loaded_at", "build_seconds")
+
+    def __init__(self, db: RAGDatabase, retriever: RAGRetriever, version: int, mode: str, build_seconds: float):
+        self.db = db
+        self.retriever = retriever
+        self.version = version
+        self.digest = db.digest
+        self.mode = mode
+        self.loaded_at = datetime.now().isoformat()
+        self.build_seconds = build_seconds
+        if db.patterns is not None:
+            # 패턴 ID는 요청 경로가 아니라 스냅샷 생성(시작/리로드 스레드) 시 계산
+            db.patterns.ids
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "digest": self.digest[:16] if self.digest else None,
+            "mode": self.mode,
+            "rows": len(self.db),
+            "loaded_at": self.loaded_at,
+            "build_seconds": round(self.build_seconds, 4)
+        }
+
+class RAGRegistry:
+    """핫 리로드 가능한 RAG DB 관리자
+
+    새 버전은 백그라운드에서 완전히 빌드한 뒤 current 참조 하나만 바꿔치기하므로,
+    진행 중인 요청은 이전 스냅샷을 그대로 사용하고 절반만 빌드된 인덱스를 보지 않습니다.
+    """
+
+    def __init__(self, csv_path: Path, retriever_factory: Callable[[RAGDatabase], RAGRetriever],
+                 on_swap: Optional[Callable[[RAGSnapshot], None]] = None):
+        self.csv_path = Path(csv_path)
+        self.retriever_factory = retriever_factory
+        self.on_swap = on_swap
+        self.current: Optional[RAGSnapshot] = None
+        self.history = deque(maxlen=10)
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def adopt(self, db: RAGDatabase):
+        """이미 로드된 DB를 첫 버전으로 등록"""
+        if db.digest is None and self.csv_path.exists():
+            db.digest = file_digest(self.csv_path)
+        self._swap(RAGSnapshot(db, self.retriever_factory(db), 1, "initial", 0.0), notify=False)
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """CSV가 바뀌었으면 새 버전을 빌드하고 교체 (호출 스레드에서 실행)"""
+        with self._reload_lock:
+            base = self.current
+            digest = file_digest(self.csv_path)
+            if not force and base is not None and base.digest == digest:
+                return {"status": "unchanged", **base.info()}
+
+            start = time.perf_counter()
+            try:
+                db = RAGDatabase(self.csv_path)
+                mode = db.load_incremental(None if force or base is None else base.db)
+                snapshot = RAGSnapshot(
+                    db,
+                    self.retriever_factory(db),
+                    (base.version if base else 0) + 1,
+                    mode,
+                    time.perf_counter() - start
+                )
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ RAG reload failed: {e}")
+                raise
+
+            self.last_error = None
+            self._swap(snapshot)
+            print(f"🔄 RAG database swapped to v{snapshot.version} ({mode}, {len(db)} entries)")
+            return {"status": "swapped", **snapshot.info()}
+
+    def reload_async(self, force: bool = False) -> bool:
+        """백그라운드 리로드 시작 (이미 진행 중이면 False)"""
+        if self._reload_thread is not None and self._reload_thread.is_alive():
+            return False
+
+        def run():
+            try:
+                self.reload(force=force)
+            except Exception:
+                pass  # last_error에 기록됨
+
+        self._reload_thread = threading.Thread(target=run, name="rag-reload", daemon=True)
+        self._reload_thread.start()
+        return True
+
+    def watch(self, interval: float = 5.0):
+        """CSV 변경 감시 스레드 시작 (mtime/크기 변화 시 리로드)"""
+        if self._watch_thread is not None:
+            return
+
+        def stat_key():
+            try:
+                st = self.csv_path.stat()
+                return st.st_mtime_ns, st.st_size
+            except OSError:
+                return None
+
+        last = stat_key()
+
+        def loop():
+            nonlocal last
+            while not self._stop.wait(interval):
+                key = stat_key()
+                if key is not None and key != last:
+                    last = key
+                    try:
+                        self.reload()
+                    except Exception:
+                        pass  # 다음 변경 시 재시도
+
+        self._watch_thread = threading.Thread(target=loop, name="rag-watch", daemon=True)
+        self._watch_thread.start()
+        print(f"👀 Watching {self.csv_path} for changes (every {interval}s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _swap(self, snapshot: RAGSnapshot, notify: bool = True):
+        # 참조 하나만 바꾸는 원자적 교체
+        self.current = snapshot
+        self.history.append({**snapshot.info(), "swapped_at": datetime.now().isoformat()})
+        if notify and self.on_swap:
+            self.on_swap(snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "current": self.current.info() if self.current else None,
+            "reloading": self._reload_thread is not None and self._reload_thread.is_alive(),
+            "watching": self._watch_thread is not None,
+            "last_error": self.last_error,
+            "swaps": list(self.history)
+        }
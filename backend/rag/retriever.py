@@ -1,56 +1,302 @@
 # backend/rag/retriever.py
 import numpy as np
-from typing import List, Dict
-from sklearn.metrics.pairwise import cosine_similarity
-from .database import RAGDatabase, normalize_text
+from typing import Any, List, Dict, Tuple, Optional
+from utils.metrics import metrics
+from utils.text_processing import normalize_many
+from .database import RAGDatabase
+from .embedding import EmbeddingIndex, embedding_index_for, load_encoder
+
+class RetrievalContext:
+    """pre 단계 검색 결과 (post 단계 재사용용)
+    
+    q_vec은 백엔드별 쿼리 표현(TF-IDF: 1×V sparse 행), rows/scores는 힌트를 고른 후보 행과 점수입니다.
+    정확 일치로 끝난 쿼리는 q_vec이 None이고 rows는 일치한 행입니다.
+    """
+    
+    __slots__ = ("query", "q_vec", "rows", "scores", "hints")
+    
+    def __init__(self, query: str, q_vec: Any, rows: np.ndarray, scores: np.ndarray, hints: List[Dict[str, str]]):
+        self.query = query
+        self.q_vec = q_vec
+        self.rows = rows
+        self.scores = scores
+        self.hints = hints
 
 class RAGRetriever:
-    """RAG 검색 엔진"""
+    """RAG 검색 엔진 (TF-IDF 백엔드)
     
-    def __init__(self, database: RAGDatabase, top_k: int = 4, min_sim: float = 0.22):
+    하위 클래스는 _encode()/_score()/_score_rows()만 바꿔 다른 유사도 백엔드를 제공합니다.
+    정확 일치 선단계, 후보 선택, 중복 제거, 힌트 생성은 공통입니다.
+    """
+    
+    backend = "tfidf"
+    
+    def __init__(self, database: RAGDatabase, top_k: int = 4, min_sim: float = 0.22, exact_match: bool = True,
+                 fuzzy_weight: float = 0.0, fuzzy_min: float = 0.6):
         self.db = database
         self.top_k = top_k
         self.min_sim = min_sim
+        self.exact_match = exact_match
+        # 문자 n-gram 점수 가중치 (0이면 퍼지 검색 비활성화)
+        self.fuzzy_weight = fuzzy_weight
+        self.fuzzy_min = fuzzy_min
     
     def retrieve(self, query: str, top_k: int = None, min_sim: float = None) -> List[Dict[str, str]]:
         """유사 문장 검색"""
-        if self.db.vectorizer is None or self.db.tfidf_mat is None:
+        return self.retrieve_many([query], top_k=top_k, min_sim=min_sim)[0]
+    
+    def retrieve_many(self, queries: List[str], top_k: int = None, min_sim: float = None) -> List[List[Dict[str, str]]]:
+        """여러 문장 일괄 검색 (백엔드별 한 번의 배치 연산)"""
+        return [c.hints for c in self.retrieve_contexts(queries, top_k=top_k, min_sim=min_sim)]
+    
+    def retrieve_context(self, query: str, top_k: int = None, min_sim: float = None) -> RetrievalContext:
+        """retrieve()와 같은 힌트 + post 단계에서 재사용할 쿼리 벡터/후보 행"""
+        return self.retrieve_contexts([query], top_k=top_k, min_sim=min_sim)[0]
+    
+    def retrieve_contexts(self, queries: List[str], top_k: int = None, min_sim: float = None) -> List[RetrievalContext]:
+        """retrieve_many()의 컨텍스트 버전 (검색 실패/미준비 시 빈 컨텍스트)"""
+        if not self._ready():
+            return [self._empty(q) for q in queries]
+        if not queries:
             return []
         
         top_k = top_k or self.top_k
         min_sim = min_sim or self.min_sim
         
+        with metrics.stage("rag_retrieve"):
+            return self._retrieve_many(queries, top_k, min_sim)
+    
+    def validate(self, context: RetrievalContext, responses: List[str], min_sim: float = None) -> List[List[Dict[str, str]]]:
+        """생성된 응답들을 pre 단계 후보 행에 대해서만 재채점 (전체 코퍼스 재검색 없음)
+        
+        RERANK_N개 응답은 한 번의 (응답 × 후보 행) 배치 곱으로 채점하며, 응답별로 min_sim 이상인 힌트를 반환합니다.
+        """
+        min_sim = min_sim or self.min_sim
+        if context is None or not len(context.rows) or not responses:
+            return [[] for _ in responses]
         try:
-            q_vec = self.db.vectorizer.transform([normalize_text(query)])
-            sims = cosine_similarity(q_vec, self.db.tfidf_mat)[0]
-            idxs = np.argsort(-sims)[:top_k * 3]
-            
-            pairs, seen_bad = [], set()
-            for i in idxs:
-                sim = float(sims[i])
-                if sim < min_sim:
-                    continue
-                
-                bad = self.db.db.iloc[i][self.db.bad_col]
-                if bad in seen_bad:
-                    continue
-                    
-                seen_bad.add(bad)
-                good = self.db.db.iloc[i][self.db.good_col]
-                ctx = self.db.db.iloc[i][self.db.ctx_col] if self.db.ctx_col else ""
-                
-                pairs.append({
-                    "konglish": bad,
-                    "natural": good,
-                    "why": ctx,
-                    "sim": round(sim, 4)
-                })
-                
-                if len(pairs) >= top_k:
-                    break
+            with metrics.stage("rag_post"):
+                sims = self._score_rows(self._encode(normalize_many(responses)), context.rows)
+            metrics.inc("rag_post_validations_total", len(responses))
+            return [self._collect(context.rows, row, self.top_k, min_sim) for row in sims]
+        except Exception as e:
+            print(f"❌ RAG post validation failed: {e}")
+            return [[] for _ in responses]
+    
+    def _empty(self, query: str) -> RetrievalContext:
+        return RetrievalContext(query, None, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), [])
+    
+    def _retrieve_many(self, queries: List[str], top_k: int, min_sim: float) -> List[RetrievalContext]:
+        try:
+            # 1단계: 정확 일치 구문 (sim=1.0, span 포함)
+            results = [
+                self._exact_context(q, top_k) if self.exact_match and self.db.matcher else self._empty(q)
+                for q in queries
+            ]
+            pending = [n for n, ctx in enumerate(results) if not ctx.hints]
+            metrics.inc("rag_queries_total", len(queries))
+            metrics.inc("rag_exact_match_total", len(queries) - len(pending))
+            if not pending:
+                return results
             
-            return pairs
+            # 2단계: 정확 일치가 없는 쿼리만 유사도 검색
+            texts = normalize_many([queries[n] for n in pending])
+            q_vecs = self._encode(texts)
+            scored = self._score(q_vecs, top_k * 3)
+            if self.fuzzy_weight and self.db.fuzzy is not None:
+                # 3단계: 오타/붙여쓰기(handphone, hand-phone) 보완용 문자 n-gram 점수 병합
+                with metrics.stage("rag_fuzzy"):
+                    fuzzy = self.db.fuzzy.search_many(texts, top_k * 3, self.fuzzy_min)
+                scored = [self._merge(s, f) for s, f in zip(scored, fuzzy)]
+            for j, (n, (rows, scores)) in enumerate(zip(pending, scored)):
+                rows, scores = self._candidates(rows, scores, top_k * 3)
+                results[n] = RetrievalContext(
+                    queries[n], self._query_row(q_vecs, j), rows, scores,
+                    self._collect(rows, scores, top_k, min_sim)
+                )
+            return results
             
         except Exception as e:
             print(f"❌ RAG retrieval failed: {e}")
-            return []
\ No newline at end of file
+            return [self._empty(q) for q in queries]
+    
+    def _ready(self) -> bool:
+        return self.db.vectorizer is not None and self.db.tfidf_mat is not None and self.db.patterns is not None
+    
+    def _encode(self, texts: List[str]) -> Any:
+        """쿼리 표현 — TF-IDF: L2 정규화된 sparse 행렬"""
+        return self.db.vectorizer.transform(texts)
+    
+    def _query_row(self, q_vecs: Any, j: int) -> Any:
+        return q_vecs[j]
+    
+    def _score(self, q_mat: Any, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """쿼리별 (후보 행 번호, 유사도) — TF-IDF: 한 번의 sparse×sparse 곱"""
+        # TF-IDF 행은 L2 정규화되어 있으므로 내적 = 코사인 유사도
+        sims = (q_mat @ self.db.tfidf_mat.T).tocsr()
+        return [
+            (sims.indices[lo:hi], sims.data[lo:hi])
+            for lo, hi in zip(sims.indptr[:-1], sims.indptr[1:])
+        ]
+    
+    def _score_rows(self, q_mat: Any, rows: np.ndarray) -> np.ndarray:
+        """(쿼리 수 × len(rows)) 유사도 — 지정 행만 곱함"""
+        return (q_mat @ self.db.tfidf_mat[rows].T).toarray()
+    
+    def _candidates(self, rows: np.ndarray, scores: np.ndarray, n_cand: int) -> Tuple[np.ndarray, np.ndarray]:
+        """점수 상위 n_cand개 후보 (순서 무관)"""
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+            rows, scores = rows[part], scores[part]
+        return np.asarray(rows), np.asarray(scores)
+    
+    def _merge(self, scored: Tuple[np.ndarray, np.ndarray], fuzzy: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """백엔드 점수와 퍼지 점수(× fuzzy_weight)를 행별 최댓값으로 병합"""
+        f_rows, f_scores = fuzzy
+        if not len(f_rows):
+            return scored
+        s_rows, s_scores = scored
+        rows = np.union1d(s_rows, f_rows)
+        merged = np.zeros(len(rows), dtype=np.float32)
+        merged[np.searchsorted(rows, s_rows)] = s_scores
+        f_pos = np.searchsorted(rows, f_rows)
+        merged[f_pos] = np.maximum(merged[f_pos], self.fuzzy_weight * f_scores)
+        return rows, merged
+    
+    def _exact_context(self, query: str, top_k: int) -> RetrievalContext:
+        """정확 일치 콩글리시 구문을 메시지 등장 순서대로 힌트로 변환"""
+        patterns = self.db.patterns
+        hits = sorted(self.db.matcher.find(query), key=lambda h: (h[1], h[1] - h[2]))
+        
+        pairs, rows, seen_bad = [], [], set()
+        for i, start, end in hits:
+            key = patterns.key_ids[i]
+            if key in seen_bad:
+                continue
+            seen_bad.add(key)
+            hint = patterns.hint(i, 1.0)
+            hint["span"] = [start, end]
+            pairs.append(hint)
+            rows.append(i)
+            if len(pairs) >= top_k:
+                break
+        return RetrievalContext(
+            query, None, np.asarray(rows, dtype=np.int64), np.ones(len(rows), dtype=np.float32), pairs
+        )
+    
+    def _collect(self, rows: np.ndarray, scores: np.ndarray, top_k: int, min_sim: float) -> List[Dict[str, str]]:
+        """한 쿼리의 유사도 행에서 상위 후보를 골라 힌트로 변환"""
+        n_cand = min(top_k * 3, len(scores))
+        if n_cand == 0:
+            return []
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+        else:
+            part = np.arange(len(scores))
+        order = part[np.argsort(-scores[part])]
+        
+        patterns = self.db.patterns
+        pairs, seen_bad = [], set()
+        for j in order:
+            sim = float(scores[j])
+            if sim < min_sim:
+                break
+            
+            i = rows[j]
+            key = patterns.key_ids[i]
+            if key in seen_bad:
+                continue
+                
+            seen_bad.add(key)
+            pairs.append(patterns.hint(i, sim))
+            
+            if len(pairs) >= top_k:
+                break
+        
+        return pairs
+
+
+class DenseRetriever(RAGRetriever):
+    """임베딩 + 근사 최근접 이웃 백엔드 (BAD 컬럼 임베딩)"""
+    
+    backend = "dense"
+    
+    def __init__(self, database: RAGDatabase, encoder, index: EmbeddingIndex,
+                 top_k: int = 4, min_sim: float = 0.22, exact_match: bool = True,
+                 fuzzy_weight: float = 0.0, fuzzy_min: float = 0.6):
+        super().__init__(database, top_k, min_sim, exact_match, fuzzy_weight, fuzzy_min)
+        self.encoder = encoder
+        self.index = index
+    
+    def _ready(self) -> bool:
+        return self.db.patterns is not None and self.index is not None
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        q_vecs = np.asarray(self.encoder(texts), dtype=np.float32)
+        return q_vecs / np.maximum(np.linalg.norm(q_vecs, axis=1, keepdims=True), 1e-12)
+    
+    def _score(self, q_vecs: np.ndarray, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        return self.index.search(q_vecs, n_cand)
+    
+    def _score_rows(self, q_vecs: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return np.stack([self.index.score_rows(q, rows) for q in q_vecs])
+
+class HybridRetriever(DenseRetriever):
+    """TF-IDF + 임베딩 점수 융합 (dense_weight * dense + (1 - dense_weight) * tfidf)"""
+    
+    backend = "hybrid"
+    
+    def __init__(self, database: RAGDatabase, encoder, index: EmbeddingIndex, dense_weight: float = 0.5,
+                 top_k: int = 4, min_sim: float = 0.22, exact_match: bool = True,
+                 fuzzy_weight: float = 0.0, fuzzy_min: float = 0.6):
+        super().__init__(database, encoder, index, top_k, min_sim, exact_match, fuzzy_weight, fuzzy_min)
+        self.dense_weight = dense_weight
+    
+    def _ready(self) -> bool:
+        return RAGRetriever._ready(self) and self.index is not None
+    
+    def _encode(self, texts: List[str]) -> Tuple[Any, np.ndarray]:
+        return RAGRetriever._encode(self, texts), DenseRetriever._encode(self, texts)
+    
+    def _query_row(self, q_vecs: Tuple[Any, np.ndarray], j: int) -> Tuple[Any, np.ndarray]:
+        return q_vecs[0][j], q_vecs[1][j]
+    
+    def _score(self, q_vecs: Tuple[Any, np.ndarray], n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        q_mat, q_dense = q_vecs
+        sparse = RAGRetriever._score(self, q_mat, n_cand)
+        dense = self.index.search(q_dense, n_cand)
+        
+        w = self.dense_weight
+        fused = []
+        for q, (t_rows, t_scores), (d_rows, _) in zip(q_dense, sparse, dense):
+            # 두 백엔드 후보의 합집합을 양쪽 점수로 정확히 재채점
+            rows = np.union1d(t_rows, d_rows)
+            tfidf = np.zeros(len(rows), dtype=np.float32)
+            tfidf[np.searchsorted(rows, t_rows)] = t_scores
+            fused.append((rows, w * self.index.score_rows(q, rows) + (1 - w) * tfidf))
+        return fused
+    
+    def _score_rows(self, q_vecs: Tuple[Any, np.ndarray], rows: np.ndarray) -> np.ndarray:
+        w = self.dense_weight
+        return w * DenseRetriever._score_rows(self, q_vecs[1], rows) + (1 - w) * RAGRetriever._score_rows(self, q_vecs[0], rows)
+
+def create_retriever(database: RAGDatabase, backend: str = "tfidf", top_k: int = 4, min_sim: float = 0.22,
+                     exact_match: bool = True, encoder=None, embed_model: Optional[str] = None,
+                     embed_dtype: str = "int8", nprobe: int = 8, dense_weight: float = 0.5,
+                     fuzzy_weight: float = 0.0, fuzzy_min: float = 0.6, shards: int = 0,
+                     shard_workers: Optional[int] = None) -> RAGRetriever:
+    """설정(RAG_BACKEND, RAG_SHARDS)에 맞는 검색기 생성"""
+    fuzzy = dict(fuzzy_weight=fuzzy_weight, fuzzy_min=fuzzy_min)
+    if backend == "tfidf" and shards > 1:
+        from .shards import ShardedRetriever
+        return ShardedRetriever(database, shards, shard_workers, top_k, min_sim, exact_match, **fuzzy)
+    if backend == "tfidf":
+        return RAGRetriever(database, top_k, min_sim, exact_match, **fuzzy)
+    if backend not in ("dense", "hybrid"):
+        raise ValueError(f"Unknown RAG backend: {backend}")
+    
+    encoder = encoder or load_encoder(embed_model)
+    index = embedding_index_for(database, encoder, dtype=embed_dtype, nprobe=nprobe)
+    if backend == "dense":
+        return DenseRetriever(database, encoder, index, top_k, min_sim, exact_match, **fuzzy)
+    return HybridRetriever(database, encoder, index, dense_weight, top_k, min_sim, exact_match, **fuzzy)
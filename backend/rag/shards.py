@@ -0,0 +1,217 @@
+# backend/rag/shards.py
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from utils.metrics import metrics
+from .database import RAGDatabase
+from .retriever import RAGRetriever
+
+CSR_ARRAYS = ("data", "indices", "indptr")
+
+# 워커 프로세스가 열어 둔 행렬 (핫 리로드 직후 이전 버전 요청이 남아 있을 수 있어 2개까지 유지)
+_WORKER_CACHE_SIZE = 2
+_worker_mats: "OrderedDict[str, Tuple[csr_matrix, List[SharedMemory]]]" = OrderedDict()
+
+class SharedCSR:
+    """프로세스 간 복사 없이 공유하는 CSR 행렬 핸들 (피클하면 경로/이름만 전달)
+
+    디스크 인덱스(.npy)가 있으면 각 프로세스가 같은 파일을 memory-map하고(노드당 페이지 캐시 1벌),
+    메모리에만 있는 행렬(증분 리로드 결과 등)은 SharedMemory 블록에 한 번 복사합니다.
+    """
+
+    def __init__(self, mat: csr_matrix, index_dir: Optional[Path] = None):
+        self.key = uuid.uuid4().hex
+        self.shape = tuple(mat.shape)
+        self.arrays: Dict[str, tuple] = {}
+        self._owned: List[SharedMemory] = []
+        for name in CSR_ARRAYS:
+            if index_dir is not None:
+                self.arrays[name] = ("file", str(Path(index_dir) / f"{name}.npy"))
+                continue
+            arr = np.ascontiguousarray(getattr(mat, name))
+            shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[:] = arr
+            self._owned.append(shm)
+            self.arrays[name] = ("shm", shm.name, arr.dtype.str, arr.shape)
+
+    def __getstate__(self):
+        return {"key": self.key, "shape": self.shape, "arrays": self.arrays, "_owned": []}
+
+    def open(self) -> Tuple[csr_matrix, List[SharedMemory]]:
+        """(워커 쪽) 행렬 열기 — 반환된 SharedMemory는 행렬을 쓰는 동안 유지해야 함"""
+        arrays, attached = {}, []
+        for name, spec in self.arrays.items():
+            if spec[0] == "file":
+                arrays[name] = np.load(spec[1], mmap_mode="r")
+            else:
+                # spawn 워커는 부모의 resource_tracker를 공유하므로 해제(unlink)는 부모가 담당
+                shm = SharedMemory(name=spec[1])
+                attached.append(shm)
+                arrays[name] = np.ndarray(spec[3], np.dtype(spec[2]), buffer=shm.buf)
+        mat = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=self.shape, copy=False)
+        return mat, attached
+
+    def close(self):
+        for shm in self._owned:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._owned = []
+
+    def __del__(self):
+        self.close()
+
+def shard_bounds(indptr: np.ndarray, n_shards: int) -> List[Tuple[int, int]]:
+    """비영 원소 수가 고르게 나뉘도록 행 범위 분할"""
+    n_rows = len(indptr) - 1
+    cuts = np.searchsorted(indptr, np.linspace(0, indptr[-1], n_shards + 1), side="left")
+    cuts[0], cuts[-1] = 0, n_rows
+    cuts = np.unique(np.clip(cuts, 0, n_rows))
+    return [(int(lo), int(hi)) for lo, hi in zip(cuts[:-1], cuts[1:]) if hi > lo]
+
+def _worker_matrix(matrix: SharedCSR) -> csr_matrix:
+    entry = _worker_mats.get(matrix.key)
+    if entry is None:
+        entry = _worker_mats[matrix.key] = matrix.open()
+        while len(_worker_mats) > _WORKER_CACHE_SIZE:
+            _, (_, attached) = _worker_mats.popitem(last=False)
+            for shm in attached:
+                shm.close()
+    else:
+        _worker_mats.move_to_end(matrix.key)
+    return entry[0]
+
+def search_shard(mat: csr_matrix, lo: int, hi: int, q_mat: csr_matrix, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """행 범위 [lo, hi)에서 쿼리별 상위 n_cand개 (전역 행 번호, 유사도)"""
+    start, end = mat.indptr[lo], mat.indptr[hi]
+    shard = csr_matrix(
+        (mat.data[start:end], mat.indices[start:end], np.asarray(mat.indptr[lo:hi + 1]) - start),
+        shape=(hi - lo, mat.shape[1]),
+        copy=False
+    )
+    # 샤드 × 쿼리 방향으로 곱하면 큰 행렬을 전치/변환하지 않음
+    sims = (shard @ q_mat.T).tocsc()
+    results = []
+    for j in range(q_mat.shape[0]):
+        a, b = sims.indptr[j], sims.indptr[j + 1]
+        rows, scores = sims.indices[a:b], sims.data[a:b]
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+            rows, scores = rows[part], scores[part]
+        results.append((rows.astype(np.int64) + lo, scores))
+    return results
+
+def _search_task(matrix: SharedCSR, lo: int, hi: int, q_mat: csr_matrix, n_cand: int):
+    return search_shard(_worker_matrix(matrix), lo, hi, q_mat, n_cand)
+
+def merge_topk(parts: List[List[Tuple[np.ndarray, np.ndarray]]], n_queries: int, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """샤드별 상위 후보를 쿼리별 전역 상위 n_cand개로 병합"""
+    merged = []
+    for j in range(n_queries):
+        rows = np.concatenate([p[j][0] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        scores = np.concatenate([p[j][1] for p in parts]) if parts else np.empty(0)
+        if n_cand < len(scores):
+            part = np.argpartition(-scores, n_cand - 1)[:n_cand]
+            rows, scores = rows[part], scores[part]
+        merged.append((rows, scores))
+    return merged
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def shared_pool(workers: int) -> ProcessPoolExecutor:
+    """샤드 검색 프로세스 풀 (RAG 버전이 바뀌어도 같은 풀을 재사용)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # 스레드가 있는 서버 프로세스에서 fork하지 않도록 spawn 사용
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+def shutdown_shard_pool():
+    """샤드 검색 프로세스 종료 (서버 종료 시)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+class ShardedSearcher:
+    """TF-IDF 행렬을 행 샤드로 나눠 프로세스 풀에서 병렬 검색
+
+    샤드는 같은 전역 행렬(전역 IDF로 학습)의 행 범위라 점수는 단일 행렬 검색과 같고,
+    샤드별 상위 n_cand개를 모아 다시 상위 n_cand개를 고르므로 결과도 같습니다.
+    pool이 없으면 호출 프로세스에서 샤드를 차례로 검색합니다.
+    """
+
+    def __init__(self, mat: csr_matrix, n_shards: int, pool: Optional[ProcessPoolExecutor] = None,
+                 index_dir: Optional[Path] = None):
+        self.mat = mat
+        self.bounds = shard_bounds(np.asarray(mat.indptr), max(1, n_shards))
+        self.pool = pool
+        # 워커에는 행렬 대신 이 핸들만 전달
+        self.matrix = SharedCSR(mat, index_dir) if pool is not None else None
+
+    def search(self, q_mat: csr_matrix, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if self.pool is None:
+            parts = [search_shard(self.mat, lo, hi, q_mat, n_cand) for lo, hi in self.bounds]
+        else:
+            futures = [self.pool.submit(_search_task, self.matrix, lo, hi, q_mat, n_cand) for lo, hi in self.bounds]
+            parts = [f.result() for f in futures]
+        return merge_topk(parts, q_mat.shape[0], n_cand)
+
+    def warmup(self):
+        """워커 프로세스 기동 + 행렬 열기 (첫 요청 지연 방지)"""
+        self.search(csr_matrix((1, self.mat.shape[1])), 1)
+
+    def close(self):
+        if self.matrix is not None:
+            self.matrix.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shards": len(self.bounds),
+            "workers": self.pool._max_workers if self.pool is not None else 0,
+            "rows": self.mat.shape[0],
+            "sharing": self.matrix.arrays["data"][0] if self.matrix is not None else None
+        }
+
+class ShardedRetriever(RAGRetriever):
+    """샤드 병렬 TF-IDF 검색기 (정확 일치/퍼지/후보 선택/힌트 생성은 RAGRetriever와 동일)
+
+    workers=0이면 풀 없이 현재 프로세스에서 검색 (라이브러리/테스트용), None이면 샤드 수만큼.
+    """
+
+    backend = "sharded"
+
+    def __init__(self, database: RAGDatabase, n_shards: int, workers: Optional[int] = None,
+                 top_k: int = 4, min_sim: float = 0.22, exact_match: bool = True,
+                 fuzzy_weight: float = 0.0, fuzzy_min: float = 0.6):
+        super().__init__(database, top_k, min_sim, exact_match, fuzzy_weight, fuzzy_min)
+        workers = n_shards if workers is None else workers
+        self.searcher: Optional[ShardedSearcher] = None
+        if database.tfidf_mat is not None:
+            pool = shared_pool(workers) if workers > 0 else None
+            self.searcher = ShardedSearcher(database.tfidf_mat, n_shards, pool, database.index_path)
+            if pool is not None:
+                self.searcher.warmup()
+
+    def _score(self, q_mat: Any, n_cand: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        with metrics.stage("rag_shard_search"):
+            return self.searcher.search(q_mat, n_cand)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.searcher.stats() if self.searcher is not None else {}
@@ -0,0 +1,376 @@
+# backend/rag/sidecar.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from .database import PatternStore
+from .registry import RAGRegistry, RAGSnapshot
+from .retriever import RetrievalContext
+
+Address = Union[str, Tuple[str, int]]
+
+class SidecarError(RuntimeError):
+    """사이드카 연결 실패 또는 원격 호출 오류"""
+
+def require_authkey(authkey: bytes) -> bytes:
+    """빈 인증 키 거부 (multiprocessing.connection은 받은 메시지를 unpickle하므로 키 없이 열면 안 됨)"""
+    if not authkey:
+        raise SidecarError("RAG sidecar authkey is empty (set KILLKONG_RAG_SIDECAR_KEY)")
+    return authkey
+
+def parse_address(address: str) -> Address:
+    """"host:port" → TCP, 그 외("/run/killkong-rag.sock" 등) → Unix 소켓 경로"""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+class SidecarServer:
+    """노드당 하나의 RAG 인덱스를 여러 API 워커가 공유하도록 서빙 (multiprocessing.connection RPC)
+
+    요청: (method, args) → 응답: ("ok", result) | ("error", message). 연결마다 스레드 하나.
+    메시지는 pickle이므로 인증 키가 필수이며, Unix 소켓은 소유자만 접근할 수 있도록(0600) 만듭니다.
+    버전 지정 호출(validate 등)이 리로드 직후에도 같은 행 번호를 쓰도록 최근 스냅샷 2개를 유지합니다.
+    """
+
+    def __init__(self, registry: RAGRegistry, address: Address, authkey: bytes):
+        self.registry = registry
+        self.address = address
+        self.authkey = require_authkey(authkey)
+        self._recent: "OrderedDict[int, RAGSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._stats = {"connections": 0, "calls": 0, "errors": 0}
+        self._methods: Dict[str, Callable[..., Any]] = {
+            "ping": lambda: "pong",
+            "info": self.info,
+            "retrieve_many": self.retrieve_many,
+            "retrieve_contexts": self.retrieve_contexts,
+            "validate": self.validate,
+            "patterns": self.patterns,
+            "reload": self.reload,
+            "stats": self.stats,
+        }
+
+    def _snapshot(self, version: Optional[int] = None) -> RAGSnapshot:
+        current = self.registry.current
+        if current is None:
+            raise SidecarError("RAG database is not loaded")
+        with self._lock:
+            if current.version not in self._recent:
+                self._recent[current.version] = current
+                while len(self._recent) > 2:
+                    self._recent.popitem(last=False)
+            return self._recent.get(version, current)
+
+    def info(self) -> Dict[str, Any]:
+        snapshot = self._snapshot()
+        return {**snapshot.info(), "sha256": snapshot.digest}
+
+    def retrieve_many(self, version: Optional[int], queries: List[str], top_k: int = None,
+                      min_sim: float = None) -> List[List[Dict[str, str]]]:
+        return self._snapshot(version).retriever.retrieve_many(queries, top_k, min_sim)
+
+    def retrieve_contexts(self, version: Optional[int], queries: List[str], top_k: int = None,
+                          min_sim: float = None) -> List[RetrievalContext]:
+        return self._snapshot(version).retriever.retrieve_contexts(queries, top_k, min_sim)
+
+    def validate(self, version: Optional[int], context: RetrievalContext, responses: List[str],
+                 min_sim: float = None) -> List[List[Dict[str, str]]]:
+        return self._snapshot(version).retriever.validate(context, responses, min_sim)
+
+    def patterns(self, version: Optional[int]) -> Tuple[tuple, tuple, Optional[tuple]]:
+        store = self._snapshot(version).db.patterns
+        return store.bad, store.good, store.ctx
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        started = self.registry.reload_async(force=force)
+        return {"started": started, **self.registry.stats()}
+
+    def stats(self) -> Dict[str, Any]:
+        retriever = self._snapshot().retriever
+        with self._lock:
+            server = dict(self._stats)
+        return {
+            **self.registry.stats(),
+            "backend": retriever.backend,
+            "shards": retriever.stats() if hasattr(retriever, "stats") else None,
+            "sidecar": server
+        }
+
+    def _listen(self) -> Listener:
+        if not isinstance(self.address, str):
+            return Listener(self.address, authkey=self.authkey)
+        # 소켓 파일이 만들어지는 순간부터 소유자 전용 (bind 후 chmod 사이의 틈 없음)
+        old_umask = os.umask(0o177)
+        try:
+            listener = Listener(self.address, authkey=self.authkey)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.address, 0o600)
+        return listener
+
+    def serve_forever(self):
+        self._listener = self._listen()
+        print(f"🛰️  RAG sidecar listening on {self.address}")
+        while True:
+            listener = self._listener
+            if listener is None:
+                return  # close()
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                print("⚠️  RAG sidecar rejected a client with a wrong authkey")
+                continue
+            except OSError:
+                if self._listener is None:
+                    return  # close()
+                continue
+            with self._lock:
+                self._stats["connections"] += 1
+            threading.Thread(target=self._serve, args=(conn,), name="rag-sidecar-conn", daemon=True).start()
+
+    def _serve(self, conn: Connection):
+        with conn:
+            while True:
+                try:
+                    method, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    handler = self._methods.get(method)
+                    if handler is None:
+                        raise SidecarError(f"Unknown method: {method}")
+                    reply = ("ok", handler(*args))
+                except Exception as e:
+                    with self._lock:
+                        self._stats["errors"] += 1
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                with self._lock:
+                    self._stats["calls"] += 1
+                try:
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+class SidecarClient:
+    """사이드카 RPC 클라이언트 (스레드별 연결, 끊기면 한 번 재연결)"""
+
+    def __init__(self, address: Address, authkey: bytes, timeout: float = 5.0):
+        self.address = address
+        self.authkey = require_authkey(authkey)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = Client(self.address, authkey=self.authkey)
+            except (OSError, EOFError, AuthenticationError) as e:
+                raise SidecarError(f"RAG sidecar unavailable at {self.address}: {e}") from e
+            self._local.conn = conn
+        return conn
+
+    def _drop(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def call(self, method: str, *args) -> Any:
+        for attempt in (0, 1):
+            conn = self._connect()
+            try:
+                conn.send((method, args))
+                if not conn.poll(self.timeout):
+                    # 늦게 도착한 응답이 다음 호출과 섞이지 않도록 연결을 버림
+                    self._drop()
+                    raise SidecarError(f"RAG sidecar timed out after {self.timeout}s ({method})")
+                status, result = conn.recv()
+            except (EOFError, OSError) as e:
+                self._drop()
+                if attempt:
+                    raise SidecarError(f"RAG sidecar connection lost: {e}") from e
+                continue
+            if status != "ok":
+                raise SidecarError(result)
+            return result
+
+    def wait(self, timeout: float) -> bool:
+        """사이드카가 인덱스를 로드해 응답할 때까지 대기"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.call("info")
+                return True
+            except SidecarError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.5)
+
+class RemoteRetriever:
+    """사이드카의 한 RAG 버전에 대한 RAGRetriever 호환 검색기"""
+
+    backend = "sidecar"
+
+    def __init__(self, client: SidecarClient, version: int, top_k: int = 4, min_sim: float = 0.22):
+        self.client = client
+        self.version = version
+        self.top_k = top_k
+        self.min_sim = min_sim
+
+    def retrieve(self, query: str, top_k: int = None, min_sim: float = None) -> List[Dict[str, str]]:
+        return self.retrieve_many([query], top_k, min_sim)[0]
+
+    def retrieve_many(self, queries: List[str], top_k: int = None, min_sim: float = None) -> List[List[Dict[str, str]]]:
+        return self.client.call("retrieve_many", self.version, list(queries), top_k or self.top_k, min_sim)
+
+    def retrieve_context(self, query: str, top_k: int = None, min_sim: float = None) -> RetrievalContext:
+        return self.retrieve_contexts([query], top_k, min_sim)[0]
+
+    def retrieve_contexts(self, queries: List[str], top_k: int = None, min_sim: float = None) -> List[RetrievalContext]:
+        return self.client.call("retrieve_contexts", self.version, list(queries), top_k or self.top_k, min_sim)
+
+    def validate(self, context: RetrievalContext, responses: List[str], min_sim: float = None) -> List[List[Dict[str, str]]]:
+        return self.client.call("validate", self.version, context, list(responses), min_sim)
+
+class RemoteDatabase:
+    """사이드카 DB 정보 (패턴 표는 처음 접근할 때만 가져옴)"""
+
+    def __init__(self, client: SidecarClient, version: int, digest: Optional[str], rows: int):
+        self.client = client
+        self.version = version
+        self.digest = digest
+        self.rows = rows
+        self._patterns: Optional[PatternStore] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def patterns(self) -> PatternStore:
+        with self._lock:
+            if self._patterns is None:
+                self._patterns = PatternStore(*self.client.call("patterns", self.version))
+            return self._patterns
+
+class RemoteSnapshot:
+    """RAGSnapshot과 같은 필드를 가진 사이드카 버전 정보"""
+
+    __slots__ = ("db", "retriever", "version", "digest", "mode", "loaded_at", "build_seconds")
+
+    def __init__(self, client: SidecarClient, info: Dict[str, Any], top_k: int, min_sim: float):
+        self.version = info["version"]
+        self.digest = info["sha256"]
+        self.mode = info["mode"]
+        self.loaded_at = info["loaded_at"]
+        self.build_seconds = info["build_seconds"]
+        self.db = RemoteDatabase(client, self.version, self.digest, info["rows"])
+        self.retriever = RemoteRetriever(client, self.version, top_k, min_sim)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "digest": self.digest[:16] if self.digest else None,
+            "mode": self.mode,
+            "rows": len(self.db),
+            "loaded_at": self.loaded_at,
+            "build_seconds": self.build_seconds
+        }
+
+class SidecarRegistry:
+    """RAGRegistry 대신 쓰는 사이드카 연결 (API 워커는 인덱스를 직접 로드하지 않음)
+
+    current 접근 시 refresh_interval마다 사이드카 버전을 확인하고, 바뀌었으면 on_swap을 호출합니다.
+    확인은 호출 전에 다음 시각을 예약하므로 동시에 한 번만 일어나며, 실패하면 간격을
+    max_backoff까지 두 배씩 늘립니다 (사이드카가 멈춰도 접근마다 timeout만큼 막히지 않음).
+    리로드/CSV 감시는 사이드카가 담당합니다.
+    """
+
+    def __init__(self, client: SidecarClient, top_k: int = 4, min_sim: float = 0.22,
+                 on_swap: Optional[Callable[[RemoteSnapshot], None]] = None, refresh_interval: float = 1.0,
+                 max_backoff: float = 30.0):
+        self.client = client
+        self.top_k = top_k
+        self.min_sim = min_sim
+        self.on_swap = on_swap
+        self.refresh_interval = refresh_interval
+        self.max_backoff = max_backoff
+        self.last_error: Optional[str] = None
+        self._current: Optional[RemoteSnapshot] = None
+        self._next_check = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[RemoteSnapshot]:
+        now = time.monotonic()
+        with self._lock:
+            due = now >= self._next_check
+            if due:
+                # 확인 중에 들어온 다른 접근은 기다리지 않고 마지막 버전을 사용
+                self._next_check = now + self.refresh_interval
+        if due:
+            try:
+                self.refresh()
+            except SidecarError as e:
+                # 연결 문제는 마지막으로 확인한 버전으로 계속 응답하고 재확인 간격을 늘림
+                with self._lock:
+                    self.last_error = str(e)
+                    self._failures += 1
+                    delay = min(self.refresh_interval * 2 ** self._failures, self.max_backoff)
+                    self._next_check = time.monotonic() + delay
+        return self._current
+
+    def refresh(self) -> RemoteSnapshot:
+        info = self.client.call("info")
+        with self._lock:
+            self._next_check = time.monotonic() + self.refresh_interval
+            self._failures = 0
+            self.last_error = None
+            previous = self._current
+            if previous is not None and previous.version == info["version"]:
+                return previous
+            self._current = RemoteSnapshot(self.client, info, self.top_k, self.min_sim)
+        if previous is not None and self.on_swap:
+            self.on_swap(self._current)
+        return self._current
+
+    def connect(self, timeout: float = 30.0) -> RemoteSnapshot:
+        if not self.client.wait(timeout):
+            raise SidecarError(f"RAG sidecar not ready at {self.client.address} after {timeout}s")
+        snapshot = self.refresh()
+        print(f"🛰️  Using RAG sidecar at {self.client.address}: v{snapshot.version}, {len(snapshot.db)} entries")
+        return snapshot
+
+    def adopt(self, db):
+        """사이드카 모드에서는 로컬 DB를 등록하지 않음"""
+
+    def watch(self, interval: float = 5.0):
+        """CSV 감시는 사이드카가 담당"""
+
+    def stop(self):
+        pass
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        return self.client.call("reload", force)
+
+    def reload_async(self, force: bool = False) -> bool:
+        return self.reload(force)["started"]
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            remote = self.client.call("stats")
+        except SidecarError as e:
+            return {"sidecar_address": str(self.client.address), "last_error": str(e)}
+        return {**remote, "sidecar_address": str(self.client.address), "last_error": self.last_error or remote["last_error"]}
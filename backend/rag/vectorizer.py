@@ -0,0 +1,57 @@
+# backend/rag/vectorizer.py
+import re
+import numpy as np
+from typing import Callable, Dict, Iterable, List
+from scipy.sparse import csr_matrix
+
+# make_vectorizer()와 같은 설정 (sklearn 없이 인덱스 아티팩트만으로 쿼리 변환)
+TOKEN_PATTERN = r"(?u)\b\w[\w'-]*\b"
+NGRAM_RANGE = (1, 3)
+
+class IndexVectorizer:
+    """저장된 어휘/IDF로 동작하는 TF-IDF transform 전용 벡터라이저
+
+    sklearn TfidfVectorizer(word 1~3-gram, lowercase, l2 정규화)의 transform과 같은 결과를 내며,
+    memory-map 인덱스로 시작할 때 sklearn(import 1초 이상)을 불러오지 않기 위해 사용합니다.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray):
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self._token_re = re.compile(TOKEN_PATTERN)
+
+    def build_preprocessor(self) -> Callable[[str], str]:
+        return str.lower
+
+    def build_tokenizer(self) -> Callable[[str], List[str]]:
+        return self._token_re.findall
+
+    def _ngrams(self, tokens: List[str]) -> Iterable[str]:
+        lo, hi = NGRAM_RANGE
+        for n in range(lo, min(hi, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                yield " ".join(tokens[i:i + n])
+
+    def transform(self, texts: Iterable[str]) -> csr_matrix:
+        vocab = self.vocabulary_
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            row: Dict[int, int] = {}
+            for gram in self._ngrams(self._token_re.findall(text.lower())):
+                j = vocab.get(gram)
+                if j is not None:
+                    row[j] = row.get(j, 0) + 1
+            cols = sorted(row)
+            indices.extend(cols)
+            counts.extend(row[j] for j in cols)
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.asarray(counts, dtype=np.float64) * np.asarray(self.idf_)[indices]
+        mat = csr_matrix((data, indices, np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, len(self.idf_)))
+        # 행별 L2 정규화
+        lengths = np.diff(mat.indptr)
+        row_ids = np.repeat(np.arange(mat.shape[0]), lengths)
+        norms = np.sqrt(np.bincount(row_ids, weights=data ** 2, minlength=mat.shape[0]))
+        mat.data /= np.maximum(norms, 1e-12)[row_ids]
+        return mat
@@ -0,0 +1,19 @@
+# backend/serving/__init__.py
+from .cache import ResponseCache
+from .pool import InferencePool, QueueFullError
+from .batching import MicroBatcher, generate_batched
+from .streaming import sse_event, stream_generate, iterate_in_worker
+from .prefix_cache import PrefixKVCache
+from .startup import StagedStartup
+from .cpu_model import configure_cpu_threads, export_cpu_model, load_cpu_model
+from .candidates import CandidateGenerator, CorrectionStop
+from .sessions import SessionStore, merge_hints
+from .encoding import CompressionMiddleware, encoded_response, etag_matches, negotiate_encoding
+
+__all__ = [
+    "ResponseCache", "InferencePool", "QueueFullError", "MicroBatcher", "generate_batched",
+    "sse_event", "stream_generate", "iterate_in_worker", "PrefixKVCache",
+    "StagedStartup", "configure_cpu_threads", "export_cpu_model", "load_cpu_model",
+    "CandidateGenerator", "CorrectionStop", "SessionStore", "merge_hints",
+    "CompressionMiddleware", "encoded_response", "etag_matches", "negotiate_encoding"
+]
@@ -0,0 +1,109 @@
+# backend/serving/batching.py
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .pool import InferencePool
+
+def generate_batched(model, tokenizer, prompts: List[str], num_return_sequences: int = 1, **gen_kwargs) -> List[List[str]]:
+    """프롬프트들을 왼쪽 패딩하여 한 번의 generate로 생성한 뒤 요청별 후보 목록으로 분리
+    
+    반환값의 i번째 원소는 prompts[i]에 대한 num_return_sequences개의 후보 텍스트입니다.
+    모델 서비스의 generate_batch(messages, show_hints)는 요청별 프롬프트를 만들어 이 함수로 생성하고,
+    후보 목록마다 기존 rerank를 적용해 generate_response와 같은 결과 dict 목록을 반환합니다 (docs/MODEL.md).
+    """
+    import torch
+    
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    # decoder-only 모델은 생성 위치가 맞도록 왼쪽 패딩이 필요
+    padding_side = tokenizer.padding_side
+    tokenizer.padding_side = "left"
+    try:
+        enc = tokenizer(prompts, return_tensors="pt", padding=True).to(model.device)
+    finally:
+        tokenizer.padding_side = padding_side
+    
+    with torch.inference_mode():
+        out = model.generate(
+            **enc,
+            num_return_sequences=num_return_sequences,
+            pad_token_id=tokenizer.pad_token_id,
+            **gen_kwargs
+        )
+    
+    texts = tokenizer.batch_decode(out[:, enc["input_ids"].shape[1]:], skip_special_tokens=True)
+    n = num_return_sequences
+    return [texts[i * n:(i + 1) * n] for i in range(len(prompts))]
+
+class MicroBatcher:
+    """요청 수집형 마이크로 배치 스케줄러
+    
+    window_ms 동안(또는 max_batch_size개가 찰 때까지) 들어온 요청을 모아
+    batch_fn(items)을 추론 풀에서 한 번에 실행하고 결과를 요청별로 돌려줍니다.
+    """
+    
+    def __init__(self, batch_fn: Callable[[List[Dict[str, Any]]], List[Any]], pool: InferencePool,
+                 window_ms: float = 10.0, max_batch_size: int = 4):
+        self.batch_fn = batch_fn
+        self.pool = pool
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        # 풀 대기열 한도를 요청 단위로 환산
+        self.max_pending = self.max_batch_size * (pool.max_concurrency + pool.max_queue)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_batches = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_seen_batch = 0
+    
+    async def submit(self, **item) -> Any:
+        """요청을 다음 배치에 추가하고 결과를 기다림"""
+        if len(self._pending) + self._in_batches >= self.max_pending:
+            raise self.pool.reject()
+        
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._in_batches += len(batch)
+            asyncio.ensure_future(self._run(batch))
+    
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.pool.run(self.batch_fn, items)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+        finally:
+            self._in_batches -= len(batch)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window * 1000, 2),
+            "max_batch_size": self.max_batch_size,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "max_seen_batch": self.max_seen_batch
+        }
@@ -0,0 +1,117 @@
+# backend/serving/cache.py
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from utils.text_processing import normalize_text
+
+def _approx_size(value: Any) -> int:
+    """응답 dict의 대략적인 메모리 사용량 (bytes)"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+class _Entry:
+    __slots__ = ("variants", "puts", "expires_at", "size")
+    
+    def __init__(self, expires_at: float):
+        self.variants: List[Dict[str, Any]] = []
+        self.puts = 0  # 중복으로 버린 응답 포함
+        self.expires_at = expires_at
+        self.size = 0
+
+class ResponseCache:
+    """LRU + TTL 응답 캐시
+    
+    mode="deterministic": 첫 응답을 저장해 바로 반환
+    mode="sample": 서로 다른 응답(response 텍스트 기준)을 variants개까지 모은 뒤 그중 하나를 무작위 반환.
+    같은 응답만 나오는 입력이 계속 miss 되지 않도록 응답을 variants × 2번 받으면 모인 것만으로 반환합니다.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, mode: str = "deterministic",
+                 variants: int = 1, fingerprint: str = ""):
+        if mode not in ("deterministic", "sample"):
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.mode = mode
+        self.variants = max(1, variants) if mode == "sample" else 1
+        self.fingerprint = fingerprint
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(self, message: str, show_hints: bool, *extra: Hashable) -> Tuple:
+        """정규화된 메시지 + 옵션 + 생성 설정 기반 캐시 키"""
+        return (normalize_text(message).lower(), bool(show_hints), self.fingerprint) + extra
+    
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """캐시된 응답 반환 (만료/미충족 시 None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None or not self._ready(entry):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(random.choice(entry.variants))
+    
+    def put(self, key: Hashable, result: Dict[str, Any]):
+        """응답 저장 (sample 모드에서는 이미 모은 응답과 다를 때만 후보 풀에 추가)"""
+        size = _approx_size(result)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                entry = _Entry(time.monotonic() + self.ttl)
+                self._data[key] = entry
+            elif self._ready(entry):
+                return
+            entry.puts += 1
+            if any(v.get("response") == result.get("response") for v in entry.variants):
+                return
+            entry.variants.append(dict(result))
+            entry.size += size
+            self._bytes += size
+            self._data.move_to_end(key)
+            
+            while len(self._data) > self.max_entries:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+    
+    def _ready(self, entry: _Entry) -> bool:
+        return len(entry.variants) >= self.variants or entry.puts >= 2 * self.variants
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+    
+    def _drop(self, key: Hashable):
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+    
+    def stats(self) -> Dict[str, Any]:
+        """히트율 및 메모리 사용량"""
+        total = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "approx_bytes": self._bytes
+        }
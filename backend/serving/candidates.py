@@ -0,0 +1,176 @@
+# backend/serving/candidates.py
+import copy
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from utils.metrics import metrics
+from utils.text_processing import phrase_coverage
+
+# 완결된 문장 끝 (따옴표/괄호/이모지 뒤 허용)
+_SENTENCE_END = re.compile(r"[.!?…][\"')\]]*\s*(?:[^\w\s]\s*)?$")
+
+class CorrectionStop:
+    """교정 줄 + K-note 연결어 줄이 완성되면 해당 시퀀스만 종료하는 StoppingCriteria
+
+    응답 형식: "'hand phone' is Konglish—people just say 'cell phone'.\\nAnyway, ..."
+    require_connector=False이면 두 번째 줄이 완성되면 연결어 없이도 종료합니다.
+    """
+
+    def __init__(self, tokenizer, prompt_len: int, connectors: Sequence[str], require_connector: bool = True):
+        self.tokenizer = tokenizer
+        self.prompt_len = prompt_len
+        self.connectors = tuple(c.lower() for c in connectors)
+        self.require_connector = require_connector
+
+    def is_complete(self, text: str) -> bool:
+        lines = [l.strip() for l in text.strip().split("\n") if l.strip()]
+        if len(lines) < 2 or not _SENTENCE_END.search(lines[-1]):
+            return False
+        return not self.require_connector or lines[-1].lower().startswith(self.connectors)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        texts = self.tokenizer.batch_decode(input_ids[:, self.prompt_len:], skip_special_tokens=True)
+        return torch.tensor([self.is_complete(t) for t in texts], dtype=torch.bool, device=input_ids.device)
+
+class CandidateGenerator:
+    """RERANK_N 후보 생성기
+
+    - 프롬프트는 한 번만 prefill하고 KV 캐시를 후보 수만큼 복제해 병렬 시퀀스로 디코딩
+    - 교정 줄과 K-note 연결어 줄이 끝나면 후보별로 조기 종료 (CorrectionStop)
+    - adaptive: sim >= K_NOTE_SIM_TH인 힌트에 대해 첫 후보가 natural 표현 중 콩글리시 구문에 없는 단어를
+      K_NOTE_SIM_TH 이상 언급하면 나머지 후보 생략 (콩글리시를 되풀이한 후보는 수락하지 않음)
+    - 반환 전 같은 natural 커버리지로 가볍게 사전 정렬 (기존 rerank는 그대로 적용)
+    """
+
+    def __init__(self, model, tokenizer, n: int = 3, adaptive: bool = True, sim_threshold: float = 0.28,
+                 connectors: Sequence[str] = (), early_stop: bool = True, prefix_cache=None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.n = max(1, n)
+        self.adaptive = adaptive
+        self.sim_threshold = sim_threshold
+        self.connectors = list(connectors)
+        self.early_stop = early_stop
+        self.prefix_cache = prefix_cache
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "adaptive_accepts": 0,  # 첫 후보로 충분해 나머지 생략
+            "full_reranks": 0,  # n개 후보 모두 생성
+            "early_stopped": 0,  # 조기 종료된 후보 수
+            "candidates": 0,
+            "generated_tokens": 0,
+            "saved_tokens": 0  # max_new_tokens 대비 덜 생성한 토큰 수
+        }
+
+    def _count(self, **deltas):
+        with self._lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def _prefill(self, prompt: str, prefix: Optional[str]):
+        """프롬프트의 마지막 토큰 직전까지 KV 캐시 계산 (prefix 캐시가 있으면 그 뒤부터)"""
+        import torch
+
+        if prefix is not None and self.prefix_cache is not None:
+            inputs = self.prefix_cache.prepare_inputs(prefix, prompt)
+            ids, cache = inputs["input_ids"], inputs["past_key_values"]
+        else:
+            text = (prefix or "") + prompt
+            ids = self.tokenizer(text, return_tensors="pt").input_ids.to(self.model.device)
+            cache = None
+
+        cached = cache.get_seq_length() if cache is not None else 0
+        if ids.shape[1] - 1 > cached:
+            with torch.inference_mode():
+                out = self.model(input_ids=ids[:, cached:-1], past_key_values=cache, use_cache=True)
+            cache = out.past_key_values
+        return ids, cache
+
+    def _decode(self, ids, cache, k: int, hints_present: bool, gen_kwargs: Dict[str, Any]) -> List[str]:
+        """공유 prefill 캐시 복사본에서 k개 시퀀스 디코딩"""
+        import torch
+
+        if cache is not None:
+            cache = copy.deepcopy(cache)
+            if k > 1:
+                cache.batch_repeat_interleave(k)
+        input_ids = ids.repeat(k, 1)
+
+        kwargs = dict(gen_kwargs)
+        stop = None
+        if self.early_stop and hints_present:
+            # 힌트가 있을 때만 "교정 줄 + K-note" 형식이 보장됨
+            stop = CorrectionStop(self.tokenizer, input_ids.shape[1], self.connectors)
+            kwargs["stopping_criteria"] = list(kwargs.get("stopping_criteria") or []) + [stop]
+        if self.tokenizer.pad_token_id is None:
+            kwargs.setdefault("pad_token_id", self.tokenizer.eos_token_id)
+
+        with torch.inference_mode():
+            out = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=cache,
+                **kwargs
+            )
+        new_tokens = out[:, input_ids.shape[1]:]
+        texts = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+        max_new = kwargs.get("max_new_tokens")
+        pad = kwargs.get("pad_token_id", self.tokenizer.pad_token_id)
+        lengths = [int((row != pad).sum()) if pad is not None else row.shape[0] for row in new_tokens]
+        early = sum(1 for t in texts if stop is not None and stop.is_complete(t))
+        self._count(
+            candidates=k,
+            early_stopped=early,
+            generated_tokens=sum(lengths),
+            saved_tokens=sum(max(0, max_new - n) for n in lengths) if max_new else 0
+        )
+        metrics.inc("candidates_total", k)
+        metrics.inc("candidates_early_stop_total", early)
+        return texts
+
+    def generate(self, prompt: str, hints: Optional[List[Dict[str, Any]]] = None,
+                 prefix: Optional[str] = None, **gen_kwargs) -> List[str]:
+        """후보 텍스트 목록 (adaptive 조기 수락 시 1개, 아니면 n개를 커버리지 순으로)"""
+        start = time.perf_counter()
+        ids, cache = self._prefill(prompt, prefix)
+        hints = [h for h in hints or [] if h.get("natural")]
+        naturals = [h["natural"] for h in hints]
+        # K-note 대상(sim >= 임계값) 힌트만 조기 수락 판단에 사용
+        strong = [h for h in hints if h.get("sim", 0.0) >= self.sim_threshold]
+
+        def coverage(text: str, hints: List[Dict[str, Any]]) -> float:
+            # 콩글리시 구문에 없는 natural 단어만 셈 (hand phone → cell phone이면 "cell")
+            scores = phrase_coverage(text, [h["natural"] for h in hints], exclude=[h.get("konglish", "") for h in hints])
+            return float(scores.max()) if len(scores) else 0.0
+
+        if self.adaptive and self.n > 1 and strong:
+            first = self._decode(ids, cache, 1, True, gen_kwargs)
+            if coverage(first[0], strong) >= self.sim_threshold:
+                self._count(requests=1, adaptive_accepts=1)
+                metrics.inc("candidates_adaptive_accept_total")
+                metrics.observe("candidate_generation", time.perf_counter() - start)
+                return first
+            candidates = first + self._decode(ids, cache, self.n - 1, True, gen_kwargs)
+        else:
+            candidates = self._decode(ids, cache, self.n, bool(naturals), gen_kwargs)
+
+        self._count(requests=1, full_reranks=1 if self.n > 1 else 0)
+        if self.n > 1:
+            metrics.inc("candidates_full_rerank_total")
+        metrics.observe("candidate_generation", time.perf_counter() - start)
+        if naturals:
+            candidates.sort(key=lambda text: coverage(text, hints), reverse=True)
+        return candidates
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        n = s["requests"] or 1
+        s["adaptive_accept_rate"] = round(s["adaptive_accepts"] / n, 4)
+        s["early_stop_rate"] = round(s["early_stopped"] / (s["candidates"] or 1), 4)
+        return s
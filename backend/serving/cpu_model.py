@@ -0,0 +1,113 @@
+# backend/serving/cpu_model.py
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# 동적 int8 양자화된 전체 모듈 (torch.save), 병합된 원본 가중치는 save_pretrained로 함께 저장
+QUANTIZED_FILE = "model_int8.pt"
+META_FILE = "export_meta.json"
+
+def default_threads() -> int:
+    """물리 코어 수 추정 (하이퍼스레딩 코어는 GEMM 처리량을 거의 늘리지 않음)"""
+    try:
+        logical = len(os.sched_getaffinity(0))
+    except AttributeError:
+        logical = os.cpu_count() or 1
+    return max(1, logical // 2) if logical >= 4 else logical
+
+def configure_cpu_threads(threads: Optional[int] = None) -> int:
+    """torch intra-op 스레드 수 설정 (inter-op은 1: 요청 병렬화는 InferencePool이 담당)"""
+    import torch
+
+    threads = threads or default_threads()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # 이미 병렬 작업이 시작된 뒤에는 바꿀 수 없음
+    return threads
+
+def quantize_int8(model):
+    """nn.Linear 가중치를 int8로 동적 양자화 (활성값은 실행 시 양자화)"""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def _versions() -> Dict[str, str]:
+    import torch
+    import transformers
+
+    return {"torch": torch.__version__, "transformers": transformers.__version__}
+
+def export_cpu_model(base_model: str, adapter_dir: Optional[Path], out_dir: Path, quant: str = "int8") -> Path:
+    """LoRA 어댑터를 base 모델에 병합하고 CPU용 아티팩트 저장 (1회성)"""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    try:
+        # 학습 시 추가한 특수 토큰이 있으면 어댑터 쪽 토크나이저 사용
+        tokenizer = AutoTokenizer.from_pretrained(adapter_dir or base_model)
+    except (OSError, ValueError):
+        tokenizer = AutoTokenizer.from_pretrained(base_model)
+    model = AutoModelForCausalLM.from_pretrained(base_model, torch_dtype=torch.float32, low_cpu_mem_usage=True)
+    if adapter_dir is not None:
+        from peft import PeftModel
+
+        model = PeftModel.from_pretrained(model, str(adapter_dir)).merge_and_unload()
+    model.eval()
+
+    # 병합 가중치 (양자화 아티팩트와 버전이 맞지 않을 때의 대체 경로)
+    model.save_pretrained(out_dir, safe_serialization=True)
+    tokenizer.save_pretrained(out_dir)
+
+    if quant == "int8":
+        torch.save(quantize_int8(model), out_dir / QUANTIZED_FILE)
+    elif quant != "none":
+        raise ValueError(f"Unknown CPU quantization: {quant}")
+
+    meta = {
+        "base_model": base_model,
+        "adapter": str(adapter_dir) if adapter_dir else None,
+        "quant": quant,
+        "export_seconds": round(time.perf_counter() - start, 1),
+        **_versions()
+    }
+    (out_dir / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return out_dir
+
+def load_cpu_model(model_dir: Path, quant: str = "int8", threads: Optional[int] = None) -> Tuple[Any, Any]:
+    """export_cpu_model 아티팩트 로드 → (model, tokenizer)
+
+    int8 모듈은 같은 torch/transformers 버전에서 export한 경우에만 그대로 사용하고,
+    버전이 다르면 병합 가중치를 읽어 로드 시점에 다시 양자화합니다.
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    model_dir = Path(model_dir)
+    threads = configure_cpu_threads(threads)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    meta_path = model_dir / META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    quantized = model_dir / QUANTIZED_FILE
+    same_versions = all(meta.get(k) == v for k, v in _versions().items())
+
+    if quant == "int8" and quantized.exists() and same_versions:
+        # 직접 export한 아티팩트만 로드할 것 (pickle)
+        model = torch.load(quantized, weights_only=False)
+    else:
+        if quant == "int8" and quantized.exists():
+            print("⚠️  int8 artifact was exported with different torch/transformers versions, re-quantizing")
+        model = AutoModelForCausalLM.from_pretrained(model_dir, torch_dtype=torch.float32, low_cpu_mem_usage=True)
+        if quant == "int8":
+            model = quantize_int8(model)
+    model.eval()
+    print(f"🖥️  CPU model loaded from {model_dir} ({quant}, {threads} threads)")
+    return model, tokenizer
@@ -0,0 +1,129 @@
+# backend/serving/encoding.py
+import gzip
+import re
+from typing import Any, Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+# 선택 의존성: 없으면 각각 gzip/JSON만 협상
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+# If-None-Match의 entity-tag (약한 검증자 W/ 포함)
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding(q 값 포함)에서 지원하는 압축 방식 선택 (같은 q면 br 우선)"""
+    best, best_q = None, 0.0
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if name not in ("br", "gzip") or (name == "br" and brotli is None):
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if q > best_q or (q == best_q and name == "br"):
+            best, best_q = name, q
+    return best
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match(쉼표 목록, *, W/ 약한 검증자)가 etag와 일치하는지 (RFC 9110 약한 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = ENTITY_TAG.search(etag)
+    opaque = opaque.group(1) if opaque else etag
+    return any(tag == opaque for tag in ENTITY_TAG.findall(if_none_match))
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+class CompressionMiddleware:
+    """협상된 br/gzip 응답 압축 (ASGI)
+
+    SSE(text/event-stream)는 토큰 단위 전송이 지연되지 않도록 압축하지 않고,
+    minimum_size 미만 본문은 압축 이득보다 헤더/CPU 비용이 커서 그대로 보냅니다.
+    """
+
+    def __init__(self, app, minimum_size: int = 512, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Dict[str, Any] = {}
+        chunks = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start.update(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+def wants_msgpack(request: Request) -> bool:
+    """Accept 헤더 또는 ?format=msgpack으로 msgpack 요청 여부 (라이브러리가 없으면 JSON)"""
+    if msgpack is None:
+        return False
+    if request.query_params.get("format") == "msgpack":
+        return True
+    accept = request.headers.get("accept", "")
+    return any(t in accept for t in MSGPACK_TYPES)
+
+def encoded_response(request: Request, payload: Any, status_code: int = 200,
+                     headers: Optional[Dict[str, str]] = None, exclude_none: bool = False) -> Response:
+    """요청이 협상한 형식(JSON/msgpack)으로 응답 본문 인코딩"""
+    content = jsonable_encoder(payload, exclude_none=exclude_none)
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if wants_msgpack(request):
+        return Response(msgpack.packb(content, use_bin_type=True), status_code, headers, media_type=MSGPACK_TYPES[0])
+    return JSONResponse(content, status_code, headers)
@@ -0,0 +1,101 @@
+# backend/serving/pool.py
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from utils.metrics import metrics
+
+class QueueFullError(RuntimeError):
+    """추론 대기열이 가득 찬 경우"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+class InferencePool:
+    """추론 전용 워커 풀 (동시 생성 수 + 대기열 길이 제한)
+    
+    동기식 generate 호출을 이벤트 루프 밖의 전용 스레드에서 실행하여
+    /health, /api/v1/stats 등이 생성 중에도 바로 응답하도록 합니다.
+    """
+    
+    def __init__(self, max_concurrency: int = 1, max_queue: int = 16, retry_after: int = 5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0   # 대기 + 실행 중
+        self._running = 0
+        self._waits = deque(maxlen=512)
+        self.completed = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+    
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn을 워커 스레드에서 실행 (대기열 초과 시 QueueFullError)"""
+        return await self.submit(fn, *args, **kwargs)
+    
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> "asyncio.Future":
+        """fn을 대기열에 넣고 asyncio Future 반환 (대기열 초과 시 즉시 QueueFullError)"""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self.retry_after)
+            self._pending += 1
+        
+        enqueued = time.perf_counter()
+        ctx = contextvars.copy_context()
+        
+        def task():
+            waited = time.perf_counter() - enqueued
+            ctx.run(metrics.observe, "queue_wait", waited)
+            with self._lock:
+                self._running += 1
+                self._waits.append(waited)
+                self.max_wait = max(self.max_wait, waited)
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+        
+        def release(_):
+            # 완료/취소 모두에서 슬롯 반환 (클라이언트가 끊겨도 누수 없음)
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+        
+        future = self._executor.submit(task)
+        future.add_done_callback(release)
+        return asyncio.wrap_future(future)
+    
+    def reject(self) -> QueueFullError:
+        """상위 대기열(마이크로 배치 등)에서 거절한 요청을 집계하고 던질 예외 반환"""
+        with self._lock:
+            self.rejected += 1
+        return QueueFullError(self.retry_after)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """대기열 깊이 및 대기 시간"""
+        with self._lock:
+            waits = sorted(self._waits)
+            queued = self._pending - self._running
+            running = self._running
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": running,
+            "queue_depth": queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            "wait_p95_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+            "wait_max_ms": round(1000 * self.max_wait, 2)
+        }
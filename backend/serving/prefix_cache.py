@@ -0,0 +1,117 @@
+# backend/serving/prefix_cache.py
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+class PrefixKVCache:
+    """고정 시스템 프롬프트 prefix의 KV 캐시
+
+    prefix(페르소나, K-note 연결어 규칙, 출력 형식 규칙)는 요청마다 같으므로
+    한 번만 prefill하고, 각 생성(및 RERANK_N 후보)은 복사본에서 요청별 suffix만 prefill합니다.
+    prefix와 suffix는 따로 토큰화해 이어 붙이므로 prefix는 토큰 경계
+    (예: 채팅 템플릿의 system 턴 끝 "<|im_end|>\\n")에서 끝나야 합니다.
+    """
+
+    def __init__(self, model, tokenizer, max_entries: int = 2, max_tokens: int = 2048,
+                 fingerprint: Optional[Callable[[], str]] = None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_entries = max(1, max_entries)
+        self.max_tokens = max_tokens
+        self.fingerprint = fingerprint
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _key(self, prefix: str) -> str:
+        # 생성 설정(config) 지문이 바뀌면 키가 달라져 이전 캐시는 LRU로 밀려남
+        fp = self.fingerprint() if self.fingerprint else ""
+        return hashlib.sha1(f"{fp}\x00{prefix}".encode("utf-8")).hexdigest()
+
+    def prefill(self, prefix: str) -> Optional[Dict[str, Any]]:
+        """prefix KV를 계산(또는 캐시에서 조회), 너무 길면 None"""
+        import torch
+
+        key = self._key(prefix)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        ids = self.tokenizer(prefix, return_tensors="pt", add_special_tokens=False).input_ids.to(self.model.device)
+        if ids.shape[1] == 0 or ids.shape[1] > self.max_tokens:
+            return None
+
+        start = time.perf_counter()
+        with torch.inference_mode():
+            out = self.model(input_ids=ids, use_cache=True)
+        entry = {
+            "ids": ids,
+            "cache": out.past_key_values,
+            "tokens": ids.shape[1],
+            "prefill_seconds": time.perf_counter() - start
+        }
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def prepare_inputs(self, prefix: str, suffix: str, num_return_sequences: int = 1) -> Dict[str, Any]:
+        """model.generate용 input_ids/attention_mask/past_key_values (prefix가 너무 길면 캐시 없이)"""
+        import torch
+
+        tok = self.tokenizer
+        device = self.model.device
+        suffix_ids = tok(suffix, return_tensors="pt", add_special_tokens=False).input_ids.to(device)
+        entry = self.prefill(prefix)
+        if entry is None:
+            self.bypassed += 1
+            prefix_ids = tok(prefix, return_tensors="pt", add_special_tokens=False).input_ids.to(device)
+            input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+            cache = None
+        else:
+            input_ids = torch.cat([entry["ids"], suffix_ids], dim=1)
+            # generate가 캐시를 제자리에서 늘리므로 요청마다 복사본 사용
+            cache = copy.deepcopy(entry["cache"])
+            if num_return_sequences > 1:
+                cache.batch_repeat_interleave(num_return_sequences)
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids), "past_key_values": cache}
+
+    def generate(self, prefix: str, suffix: str, num_return_sequences: int = 1, **gen_kwargs) -> List[str]:
+        """prefix + suffix 생성 (prefix KV 재사용, num_return_sequences개 후보 반환)"""
+        import torch
+
+        tok = self.tokenizer
+        inputs = self.prepare_inputs(prefix, suffix, num_return_sequences)
+        if tok.pad_token_id is None:
+            gen_kwargs.setdefault("pad_token_id", tok.eos_token_id)
+        with torch.inference_mode():
+            out = self.model.generate(**inputs, num_return_sequences=num_return_sequences, **gen_kwargs)
+        return tok.batch_decode(out[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "entries": len(entries),
+            "max_entries": self.max_entries,
+            "prefix_tokens": [e["tokens"] for e in entries],
+            "prefill_ms": [round(e["prefill_seconds"] * 1000, 2) for e in entries],
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed
+        }
@@ -0,0 +1,321 @@
+# backend/serving/sessions.py
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from utils.text_processing import normalize_text, split_sentences
+
+def approx_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 토큰 수 추정 (영어 기준 약 4자/토큰)"""
+    return len(text) // 4 + 1
+
+class Session:
+    """대화 세션 (최근 턴 링 버퍼 + 문장별 힌트 캐시)"""
+
+    __slots__ = ("id", "turns", "tokens", "hints", "hints_version", "updated_at")
+
+    def __init__(self, session_id: str, max_turns: int):
+        self.id = session_id
+        # (user, assistant, tokens)
+        self.turns: "deque[Tuple[str, str, int]]" = deque(maxlen=max_turns)
+        self.tokens = 0
+        # 정규화된 문장 → 힌트 목록 (LRU)
+        self.hints: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        # 힌트를 검색한 RAG 버전 (CSV digest, 다르면 캐시 전체 무효)
+        self.hints_version: Optional[str] = None
+        self.updated_at = time.time()
+
+    def to_row(self) -> Tuple[str, str, str, int, float]:
+        hints = {"version": self.hints_version, "entries": list(self.hints.items())}
+        return (
+            self.id,
+            json.dumps(list(self.turns), ensure_ascii=False),
+            json.dumps(hints, ensure_ascii=False),
+            self.tokens,
+            self.updated_at
+        )
+
+    def load_hints(self, raw: str):
+        hints = json.loads(raw)
+        if isinstance(hints, list):
+            # 버전 없이 기록된 이전 형식은 어느 RAG 버전인지 알 수 없으므로 버림
+            return
+        self.hints_version = hints["version"]
+        self.hints.update(hints["entries"])
+
+class SessionStore:
+    """세션 ID별 대화 메모리 (인메모리 LRU + SQLite WAL 영속화)
+
+    - 세션당 최근 max_turns 턴만, 합계 max_tokens 토큰 이하로 유지 (초과 시 오래된 턴부터 제거)
+    - 메모리에는 최근 사용한 max_sessions개 세션만 두고, 나머지는 SQLite에서 다시 읽음
+    - 쓰기는 변경된 세션을 모아 flush_interval마다 한 트랜잭션으로 기록
+    메모리 상한은 대략 max_sessions × (max_tokens 분량 텍스트 + 힌트 캐시)입니다.
+    """
+
+    def __init__(self, db_path: Path, max_sessions: int = 10000, max_turns: int = 8, max_tokens: int = 1024,
+                 max_hint_entries: int = 64, flush_interval: float = 1.0, ttl_days: float = 7,
+                 count_tokens: Callable[[str], int] = approx_tokens):
+        self.db_path = Path(db_path)
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.max_hint_entries = max_hint_entries
+        self.flush_interval = flush_interval
+        self.ttl_days = ttl_days
+        self.count_tokens = count_tokens
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # flush 대기 중인 세션 (LRU에서 밀려나도 기록될 때까지 유지)
+        self._dirty: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {
+            "hits": 0, "loads": 0, "created": 0, "evictions": 0, "trimmed_turns": 0,
+            "hint_hits": 0, "hint_misses": 0, "hint_invalidations": 0, "flushes": 0, "rows_written": 0
+        }
+
+    def open(self):
+        """SQLite 연결 (WAL) + 만료 세션 정리 + flush 스레드 시작"""
+        if self._conn is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, turns TEXT NOT NULL, hints TEXT NOT NULL, "
+            "tokens INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions(updated_at)")
+        if self.ttl_days:
+            expired = conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_days * 86400,)
+            ).rowcount
+            if expired:
+                print(f"🧹 Removed {expired} expired sessions")
+        self._conn = conn
+        self._thread = threading.Thread(target=self._flush_loop, name="session-flush", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """남은 변경 사항 기록 후 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️  Session flush failed: {e}")
+
+    def flush(self) -> int:
+        """변경된 세션을 한 트랜잭션으로 기록 (기록한 세션 수 반환)"""
+        if self._conn is None:
+            return 0
+        # 기록이 끝날 때까지 _load가 이전 행을 읽지 않도록 DB 락을 먼저 잡음
+        with self._db_lock:
+            with self._lock:
+                pending, self._dirty = self._dirty, {}
+                rows = [s.to_row() for s in pending.values()]
+            if not rows:
+                return 0
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT INTO sessions (id, turns, hints, tokens, updated_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET turns=excluded.turns, hints=excluded.hints, "
+                        "tokens=excluded.tokens, updated_at=excluded.updated_at",
+                        rows
+                    )
+            except sqlite3.Error:
+                with self._lock:
+                    for sid, session in pending.items():
+                        self._dirty.setdefault(sid, session)
+                raise
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(rows)
+        return len(rows)
+
+    def _load(self, session_id: str) -> Optional[Session]:
+        if self._conn is None:
+            return None
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT turns, hints, tokens, updated_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        session = Session(session_id, self.max_turns)
+        session.turns.extend(tuple(t) for t in json.loads(row[0]))
+        session.load_hints(row[1])
+        session.tokens = sum(t[2] for t in session.turns)
+        session.updated_at = row[3]
+        return session
+
+    def find(self, session_id: str) -> Optional[Session]:
+        """세션 조회 (메모리 → SQLite, 없으면 None)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._stats["hits"] += 1
+                return session
+            # 아직 기록되지 않은 채 LRU에서 밀려난 세션
+            session = self._dirty.get(session_id)
+
+        if session is None:
+            session = self._load(session_id)
+            if session is None:
+                return None
+        with self._lock:
+            if session_id in self._sessions:
+                # 다른 요청이 먼저 읽어 둔 객체를 공유
+                return self._sessions[session_id]
+            self._stats["loads"] += 1
+            self._insert(session)
+            return session
+
+    def get(self, session_id: str) -> Session:
+        """세션 조회 (없으면 새로 생성)"""
+        session = self.find(session_id)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, self.max_turns)
+                self._stats["created"] += 1
+                self._insert(session)
+            return session
+
+    def _insert(self, session: Session):
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """프롬프트용 최근 대화 (오래된 순, role/content)"""
+        session = self.get(session_id)
+        with self._lock:
+            turns = list(session.turns)
+        history = []
+        for user, assistant, _ in turns:
+            history.append({"role": "user", "content": user})
+            history.append({"role": "assistant", "content": assistant})
+        return history
+
+    def append(self, session_id: str, user: str, assistant: str):
+        """턴 추가 후 토큰 상한을 넘으면 오래된 턴부터 제거"""
+        session = self.get(session_id)
+        tokens = self.count_tokens(user) + self.count_tokens(assistant)
+        with self._lock:
+            if len(session.turns) == session.turns.maxlen:
+                session.tokens -= session.turns[0][2]
+            session.turns.append((user, assistant, tokens))
+            session.tokens += tokens
+            # 마지막 턴 하나는 상한을 넘어도 유지
+            while session.tokens > self.max_tokens and len(session.turns) > 1:
+                session.tokens -= session.turns.popleft()[2]
+                self._stats["trimmed_turns"] += 1
+            session.updated_at = time.time()
+            self._dirty[session_id] = session
+
+    def hints(self, session_id: str, message: str,
+              retrieve_many: Callable[[List[str]], List[List[Dict[str, Any]]]], top_k: int,
+              version: Optional[str] = None) -> List[Dict[str, Any]]:
+        """문장별 힌트 캐시를 거쳐 검색 (같은 대화에서 이미 본 문장은 검색 생략)
+
+        version은 retrieve_many가 검색하는 RAG 버전(CSV digest)으로, 캐시된 힌트의 버전과 다르면
+        (핫 리로드, 재시작 후 DB 변경) 캐시를 비우고 다시 검색합니다.
+        """
+        session = self.get(session_id)
+        sentences = [normalize_text(s).lower() for s in split_sentences(message)] or [normalize_text(message).lower()]
+        with self._lock:
+            if session.hints_version != version:
+                if session.hints:
+                    self._stats["hint_invalidations"] += 1
+                session.hints.clear()
+                session.hints_version = version
+            cached = {s: session.hints[s] for s in sentences if s in session.hints}
+            for s in cached:
+                session.hints.move_to_end(s)
+            self._stats["hint_hits"] += len(cached)
+            self._stats["hint_misses"] += len(set(sentences) - set(cached))
+        missing = [s for s in dict.fromkeys(sentences) if s not in cached]
+        if missing:
+            found = dict(zip(missing, retrieve_many(missing)))
+            with self._lock:
+                # 검색 도중 다른 요청이 새 버전으로 바꿨으면 이전 버전 결과는 캐시하지 않음
+                if session.hints_version == version:
+                    for s, hs in found.items():
+                        session.hints[s] = hs
+                    while len(session.hints) > self.max_hint_entries:
+                        session.hints.popitem(last=False)
+                    self._dirty[session_id] = session
+            cached.update(found)
+        return merge_hints((cached[s] for s in sentences), top_k)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            existed = self._sessions.pop(session_id, None) is not None
+            self._dirty.pop(session_id, None)
+        if self._conn is not None:
+            with self._db_lock:
+                existed = self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0 or existed
+        return existed
+
+    def snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self.find(session_id)
+        if session is None:
+            return None
+        with self._lock:
+            return {
+                "session_id": session.id,
+                "turns": [{"user": u, "assistant": a, "tokens": t} for u, a, t in session.turns],
+                "tokens": session.tokens,
+                "cached_sentences": len(session.hints),
+                "updated_at": session.updated_at
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "pending_writes": len(self._dirty),
+                "max_sessions": self.max_sessions,
+                "max_turns": self.max_turns,
+                "max_tokens": self.max_tokens,
+                **self._stats
+            }
+
+def merge_hints(groups: Iterable[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    """문장별 힌트를 콩글리시 표현 기준으로 중복 제거해 합침 (문장 순서 유지)
+
+    span은 문장 기준 오프셋이라 메시지 기준과 맞지 않으므로 제외합니다.
+    """
+    merged, seen = [], set()
+    for hints in groups:
+        for hint in hints:
+            if hint["konglish"] in seen:
+                continue
+            seen.add(hint["konglish"])
+            merged.append({k: v for k, v in hint.items() if k != "span"})
+            if len(merged) >= top_k:
+                return merged
+    return merged
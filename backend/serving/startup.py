@@ -0,0 +1,64 @@
+# backend/serving/startup.py
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class StagedStartup:
+    """순서가 있는 초기화 단계를 백그라운드 스레드에서 실행하고 단계별 상태를 추적
+
+    앞 단계가 실패해도 다음 단계는 계속 진행합니다 (예: RAG 없이도 모델은 로드).
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[], None]]]):
+        self.stages = list(stages)
+        self._state: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name, _ in self.stages}
+        self._events = {name: threading.Event() for name, _ in self.stages}
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+
+    def start(self):
+        """단계 실행 시작 (즉시 반환)"""
+        if self._thread is not None:
+            return
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="staged-startup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """모든 단계를 호출 스레드에서 실행 (스크립트/테스트용)"""
+        self.started_at = self.started_at or time.perf_counter()
+        self._run()
+
+    def _run(self):
+        for name, fn in self.stages:
+            state = self._state[name]
+            state["status"] = "loading"
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                state.update(status="failed", error=f"{type(e).__name__}: {e}")
+                print(f"❌ Startup stage '{name}' failed: {e}")
+            else:
+                state["status"] = "ready"
+                print(f"✅ Startup stage '{name}' ready ({time.perf_counter() - start:.2f}s)")
+            state["seconds"] = round(time.perf_counter() - start, 3)
+            # 시작 시점 기준 누적 시간 (콜드 스타트 측정용)
+            state["ready_after"] = round(time.perf_counter() - self.started_at, 3)
+            self._events[name].set()
+
+    def ready(self, name: Optional[str] = None) -> bool:
+        """단계(없으면 전체)가 성공적으로 끝났는지"""
+        names = [name] if name else list(self._state)
+        return all(self._state[n]["status"] == "ready" for n in names)
+
+    def failed(self) -> bool:
+        return any(s["status"] == "failed" for s in self._state.values())
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """단계가 끝날 때까지 대기 (성공 여부 반환)"""
+        self._events[name].wait(timeout)
+        return self.ready(name)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(state) for name, state in self._state.items()}
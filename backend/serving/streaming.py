@@ -0,0 +1,111 @@
+# backend/serving/streaming.py
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .prefix_cache import PrefixKVCache
+
+def sse_event(event: str, data: Any) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# 다음 토큰을 기다리는 최대 시간 (초과 시 queue.Empty로 스트림 종료)
+STREAM_TIMEOUT = 60.0
+
+class CancelStop:
+    """cancel 이벤트가 설정되면 모든 시퀀스를 종료하는 StoppingCriteria"""
+
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        return torch.full((input_ids.shape[0],), self.cancel.is_set(), dtype=torch.bool, device=input_ids.device)
+
+def stream_generate(model, tokenizer, prompt: str, prefix: Optional[str] = None,
+                    prefix_cache: Optional["PrefixKVCache"] = None, timeout: Optional[float] = STREAM_TIMEOUT,
+                    **gen_kwargs) -> Iterator[str]:
+    """generate를 별도 스레드에서 돌리며 디코딩된 텍스트 조각을 순서대로 반환
+    
+    prefix와 prefix_cache를 주면 prefix KV를 재사용하고 prompt(suffix)만 prefill합니다.
+    generate의 예외는 반복이 끝난 뒤 호출자에게 다시 발생하며, 호출자가 도중에 닫으면
+    (클라이언트 연결 종료 등) 다음 디코딩 단계에서 generate를 멈춥니다.
+    """
+    from transformers import TextIteratorStreamer
+    
+    if prefix is not None and prefix_cache is not None:
+        enc = prefix_cache.prepare_inputs(prefix, prompt)
+    else:
+        enc = tokenizer((prefix or "") + prompt, return_tensors="pt").to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+    cancel = threading.Event()
+    gen_kwargs["stopping_criteria"] = list(gen_kwargs.get("stopping_criteria") or []) + [CancelStop(cancel)]
+    errors = []
+    
+    def run():
+        try:
+            model.generate(**enc, streamer=streamer, **gen_kwargs)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            if errors:
+                # 예외로 끝난 generate는 종료 신호를 보내지 않으므로 직접 보냄 (반복이 멈추지 않는 문제 방지)
+                streamer.end()
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        for chunk in streamer:
+            if chunk:
+                yield chunk
+    finally:
+        cancel.set()
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def iterate_in_worker(submit: Callable[..., "asyncio.Future"], gen_fn: Callable[..., Iterator[Any]],
+                      *args, **kwargs) -> AsyncIterator[Any]:
+    """동기 제너레이터를 워커 스레드에서 실행하고 결과를 비동기로 전달
+    
+    submit은 InferencePool.submit처럼 동작해야 하며, 대기열 초과 예외는
+    스트림 시작 전(이 함수 호출 시점)에 바로 발생합니다. 반환된 비동기 이터레이터를
+    닫으면(aclose) 워커는 다음 항목에서 gen_fn을 닫고 끝납니다.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+    
+    def produce():
+        items = gen_fn(*args, **kwargs)
+        try:
+            for item in items:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            # 소비자가 먼저 닫혔으면 제너레이터를 닫아 생성을 멈추고 워커 슬롯을 반환
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+    
+    future = submit(produce)
+    
+    async def consume():
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            # 생산 중 발생한 예외 전달
+            await future
+        finally:
+            cancelled.set()
+    
+    return consume()
@@ -0,0 +1,19 @@
+# backend/tests/conftest.py
+import shutil
+import sys
+from pathlib import Path
+import pytest
+
+# 백엔드 모듈은 backend/ 기준으로 import (from config import config)
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+RAG_CSV = BACKEND_DIR.parent / "data" / "RAGdb_final.csv"
+
+@pytest.fixture
+def rag_csv(tmp_path):
+    """저장소 RAG CSV 사본 (인덱스 아티팩트는 tmp_path 아래에 생성)"""
+    path = tmp_path / "rag.csv"
+    shutil.copy(RAG_CSV, path)
+    return path
@@ -0,0 +1,29 @@
+# backend/tests/test_admin.py
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+import app as backend
+
+@pytest.fixture
+def client(monkeypatch):
+    reloads = []
+    monkeypatch.setattr(backend.rag_registry, "reload_async", lambda force=False: reloads.append(force) or True)
+    monkeypatch.setattr(backend.rag_registry, "stats", lambda: {"current": None})
+    # startup 이벤트(모델/RAG 로드)는 실행하지 않음
+    client = TestClient(backend.app)
+    client.reloads = reloads
+    return client
+
+def test_reload_is_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(backend.config, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/admin/rag/reload?force=true").status_code == 404
+    assert client.reloads == []
+
+def test_reload_requires_the_admin_token(client, monkeypatch):
+    monkeypatch.setattr(backend.config, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/v1/admin/rag/reload").status_code == 403
+    assert client.post("/api/v1/admin/rag/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    r = client.post("/api/v1/admin/rag/reload?force=true", headers={"X-Admin-Token": "secret"})
+    assert r.status_code == 202 and r.json()["started"] is True
+    assert client.reloads == [True]
@@ -0,0 +1,93 @@
+# backend/tests/test_batching.py
+import asyncio
+import threading
+import pytest
+from serving import InferencePool, MicroBatcher, QueueFullError, generate_batched
+
+WORDS = ["i", "want", "to", "buy", "a", "hand", "phone", "let's", "play", "pocket", "ball", "tonight",
+         "went", "eye", "shopping", "yesterday", "cell", "pool", "anyway", "what", "kind", "."]
+
+PROMPTS = [
+    "i want to buy a hand phone",
+    "let's play pocket ball",
+    "i went eye shopping yesterday tonight anyway",
+]
+
+@pytest.fixture(scope="module")
+def tiny_model():
+    """CPU용 임의 가중치 GPT-2 + 단어 단위 토크나이저 (다운로드 없음)"""
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {"<unk>": 0, "<eos>": 1, **{w: i + 2 for i, w in enumerate(WORDS)}}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>", eos_token="<eos>")
+
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(
+        vocab_size=len(vocab), n_positions=64, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=1, eos_token_id=1
+    )
+    model = transformers.GPT2LMHeadModel(config).eval()
+    return model, tokenizer
+
+def test_generate_batched_matches_unbatched(tiny_model):
+    model, tokenizer = tiny_model
+    # 빔 탐색은 결정적이면서 요청당 여러 후보를 돌려주므로 후보 분리까지 비교 가능
+    kwargs = dict(max_new_tokens=8, do_sample=False, num_beams=2)
+
+    batched = generate_batched(model, tokenizer, PROMPTS, num_return_sequences=2, **kwargs)
+    unbatched = [generate_batched(model, tokenizer, [p], num_return_sequences=2, **kwargs)[0] for p in PROMPTS]
+
+    assert len(batched) == len(PROMPTS)
+    assert all(len(c) == 2 for c in batched)
+    assert batched == unbatched
+
+def test_generate_batched_restores_padding_side(tiny_model):
+    model, tokenizer = tiny_model
+    tokenizer.padding_side = "right"
+    generate_batched(model, tokenizer, PROMPTS, max_new_tokens=2, do_sample=False)
+    assert tokenizer.padding_side == "right"
+
+def test_micro_batcher_routes_results_per_request():
+    pool = InferencePool(max_concurrency=1, max_queue=4)
+    batches = []
+
+    def batch_fn(items):
+        batches.append(len(items))
+        return [item["message"].upper() for item in items]
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, pool, window_ms=20, max_batch_size=4)
+        return await asyncio.gather(*(batcher.submit(message=p, show_hints=False) for p in PROMPTS))
+
+    try:
+        assert asyncio.run(run()) == [p.upper() for p in PROMPTS]
+    finally:
+        pool.shutdown()
+    assert batches == [len(PROMPTS)]
+
+def test_micro_batcher_rejects_through_pool():
+    pool = InferencePool(max_concurrency=1, max_queue=0)
+    release = threading.Event()
+
+    def batch_fn(items):
+        release.wait(5)
+        return [None] * len(items)
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, pool, window_ms=1, max_batch_size=1)
+        first = asyncio.ensure_future(batcher.submit(message="a", show_hints=False))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await batcher.submit(message="b", show_hints=False)
+        release.set()
+        await first
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert pool.stats()["rejected"] == 1
@@ -0,0 +1,81 @@
+# backend/tests/test_cache.py
+import time
+import pytest
+from serving import ResponseCache
+
+def result(text: str):
+    return {"response": text, "hints": None, "processing_time": 0.1, "model_used": "test"}
+
+def test_deterministic_mode_keeps_the_first_response():
+    cache = ResponseCache(mode="deterministic")
+    key = cache.make_key("I want a hand phone", False)
+    assert cache.get(key) is None
+    cache.put(key, result("a"))
+    cache.put(key, result("b"))
+    assert cache.get(key)["response"] == "a"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_make_key_normalizes_the_message():
+    cache = ResponseCache()
+    assert cache.make_key("  I want a HAND phone ", True) == cache.make_key("I want a hand phone", True)
+    assert cache.make_key("I want a hand phone", True) != cache.make_key("I want a hand phone", False)
+
+def test_sample_mode_collects_distinct_responses():
+    cache = ResponseCache(mode="sample", variants=3)
+    key = cache.make_key("hand phone", False)
+    for text in ("a", "a", "b"):
+        cache.put(key, result(text))
+        # 서로 다른 응답이 3개 모이기 전에는 miss
+        assert cache.get(key) is None
+    cache.put(key, result("c"))
+    seen = {cache.get(key)["response"] for _ in range(200)}
+    assert seen == {"a", "b", "c"}
+    cache.put(key, result("d"))
+    assert "d" not in {cache.get(key)["response"] for _ in range(50)}
+
+def test_sample_mode_serves_repeated_identical_responses_after_enough_puts():
+    cache = ResponseCache(mode="sample", variants=3)
+    key = cache.make_key("hand phone", False)
+    for _ in range(5):
+        cache.put(key, result("same"))
+        assert cache.get(key) is None
+    cache.put(key, result("same"))
+    assert cache.get(key)["response"] == "same"
+    assert cache.stats()["entries"] == 1
+
+def test_get_returns_a_copy():
+    cache = ResponseCache()
+    key = cache.make_key("hand phone", False)
+    cache.put(key, result("a"))
+    cache.get(key)["response"] = "changed"
+    assert cache.get(key)["response"] == "a"
+
+def test_lru_eviction_drops_the_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2)
+    keys = [cache.make_key(m, False) for m in ("one", "two", "three")]
+    cache.put(keys[0], result("1"))
+    cache.put(keys[1], result("2"))
+    cache.get(keys[0])
+    cache.put(keys[2], result("3"))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0])["response"] == "1"
+    assert cache.get(keys[2])["response"] == "3"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+def test_ttl_expiry_and_clear_release_memory():
+    cache = ResponseCache(ttl=0.05)
+    key = cache.make_key("hand phone", False)
+    cache.put(key, result("a"))
+    assert cache.stats()["approx_bytes"] > 0
+    time.sleep(0.06)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["approx_bytes"] == 0
+
+    cache.put(key, result("a"))
+    cache.clear()
+    assert cache.get(key) is None and cache.stats()["approx_bytes"] == 0
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ResponseCache(mode="random")
@@ -0,0 +1,27 @@
+# backend/tests/test_candidates.py
+from serving import CandidateGenerator
+
+HINT = {"konglish": "hand phone", "natural": "cell phone", "sim": 1.0}
+
+def make_generator(replies):
+    """prefill/디코딩을 고정 응답으로 대체한 후보 생성기"""
+    gen = CandidateGenerator(model=None, tokenizer=None, n=3, adaptive=True, sim_threshold=0.28)
+    gen._prefill = lambda prompt, prefix: (None, None)
+    gen._decode = lambda ids, cache, k, hints_present, kwargs: [replies.pop(0) for _ in range(k)]
+    return gen
+
+def test_adaptive_accepts_natural_phrase():
+    gen = make_generator(["'hand phone' is Konglish—people just say 'cell phone'.", "b", "c"])
+    assert len(gen.generate("prompt", [HINT])) == 1
+    assert gen.stats()["adaptive_accepts"] == 1
+
+def test_adaptive_rejects_repeated_konglish():
+    # "phone"만 겹치는 응답은 natural 표현을 말한 것이 아님
+    gen = make_generator(["Oh, you want a new hand phone?", "People just say cell phone.", "c"])
+    candidates = gen.generate("prompt", [HINT])
+    assert len(candidates) == 3
+    assert candidates[0] == "People just say cell phone."
+
+def test_adaptive_ignores_weak_hints():
+    gen = make_generator(["People just say cell phone.", "b", "c"])
+    assert len(gen.generate("prompt", [{**HINT, "sim": 0.1}])) == 3
@@ -0,0 +1,18 @@
+# backend/tests/test_encoding.py
+import pytest
+from serving import etag_matches
+
+ETAG = '"44e959c167e7263e"'
+
+@pytest.mark.parametrize("header", [
+    ETAG,
+    f"W/{ETAG}",
+    f'"0000", W/{ETAG}',
+    "*",
+])
+def test_etag_matches(header):
+    assert etag_matches(header, ETAG)
+
+@pytest.mark.parametrize("header", [None, "", '"0000"', "44e959c167e7263e", 'W/"44e959c167e7263e-gzip"'])
+def test_etag_does_not_match(header):
+    assert not etag_matches(header, ETAG)
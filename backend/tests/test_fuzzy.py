@@ -0,0 +1,67 @@
+# backend/tests/test_fuzzy.py
+import pytest
+from config import config
+from rag import RAGDatabase, create_retriever
+from rag.fuzzy import CharNgramIndex, edit_similarity
+
+PHRASES = ["apart", "event", "event hall", "sense", "consent", "health", "master", "hand phone", "eye shopping", "pocket ball"]
+
+# 맞는 영어 문장 속에 짧은 패턴이 부분 문자열로 들어 있는 경우 (퍼지 검색이 잡으면 안 됨)
+NEGATIVES = [
+    ("I live in an apartment", "apart"),
+    ("I eventually went home", "event"),
+    ("I eventually went home", "event hall"),
+    ("That is nonsense", "sense"),
+    ("That is nonsense", "consent"),
+    ("She is very healthy", "health"),
+    ("This painting is a masterpiece", "master"),
+]
+
+POSITIVES = [
+    ("I bought a handphone", "hand phone"),
+    ("I bought a hand-phone", "hand phone"),
+    ("I bought two handphones", "hand phone"),
+    ("I went eye shoping", "eye shopping"),
+    ("Let's play pocketball", "pocket ball"),
+]
+
+@pytest.fixture(scope="module")
+def index():
+    return CharNgramIndex(PHRASES)
+
+@pytest.fixture(scope="module")
+def retriever():
+    db = RAGDatabase(config.RAG_DB_PATH, use_index=False)
+    db.load()
+    return create_retriever(db, fuzzy_weight=config.RAG_FUZZY_WEIGHT, fuzzy_min=config.RAG_FUZZY_MIN)
+
+def found(index, query):
+    rows, _ = index.search(query, 10, config.RAG_FUZZY_MIN)
+    return {PHRASES[r] for r in rows}
+
+@pytest.mark.parametrize("query,phrase", NEGATIVES)
+def test_fuzzy_ignores_correct_words(index, query, phrase):
+    assert phrase not in found(index, query)
+
+@pytest.mark.parametrize("query,phrase", POSITIVES)
+def test_fuzzy_finds_typos_and_joined_forms(index, query, phrase):
+    assert phrase in found(index, query)
+
+def test_fuzzy_skips_exact_tokens(index):
+    # 패턴이 그대로 있으면 정확 일치/TF-IDF 몫
+    assert "health" not in found(index, "I care about my health")
+
+@pytest.mark.parametrize("query,phrase", NEGATIVES)
+def test_retriever_has_no_hint_for_correct_words(retriever, query, phrase):
+    hints = retriever.retrieve(query)
+    assert phrase not in {h["konglish"] for h in hints}
+
+@pytest.mark.parametrize("query,phrase", POSITIVES)
+def test_retriever_keeps_typo_hints(retriever, query, phrase):
+    hints = retriever.retrieve(query)
+    assert phrase in {h["konglish"] for h in hints}
+
+def test_edit_similarity():
+    assert edit_similarity("handphone", "handphone") == 1.0
+    assert edit_similarity("hnadphone", "handphone") == pytest.approx(1 - 1 / 9)
+    assert edit_similarity("consent", "nonsense") < 0.75
@@ -0,0 +1,73 @@
+# backend/tests/test_rag_index.py
+import json
+import numpy as np
+import pytest
+from rag import RAGDatabase, RAGRetriever
+from rag.database import INDEX_FORMAT_VERSION
+from rag.vectorizer import IndexVectorizer
+from utils.text_processing import normalize_many
+
+QUERIES = ["I want to buy a hand phone", "Let's play pocket ball tonight", "I went eye shoping yesterday",
+           "my handphone broke", "There were many black consumers", "I bought a new color lens",
+           "He is a skinship person", "nothing to correct here", ""]
+
+def load(csv_path, **kwargs):
+    db = RAGDatabase(csv_path, **kwargs)
+    db.load()
+    return db
+
+def memory_mapped(array) -> bool:
+    while array is not None and not isinstance(array, np.memmap):
+        array = getattr(array, "base", None)
+    return array is not None
+
+@pytest.fixture
+def indexed(rag_csv):
+    """(memory-map 인덱스, sklearn 인메모리 인덱스)"""
+    return load(rag_csv), load(rag_csv, use_index=False)
+
+def test_index_is_read_back_through_mmap(indexed):
+    mm, mem = indexed
+    assert isinstance(mm.vectorizer, IndexVectorizer)
+    assert mm.index_path is not None and (mm.index_path / "meta.json").exists()
+    assert memory_mapped(mm.tfidf_mat.data) and memory_mapped(mm.tfidf_mat.indices)
+    assert mm.patterns.bad == mem.patterns.bad
+    assert mm.patterns.good == mem.patterns.good
+    assert mm.patterns.ctx == mem.patterns.ctx
+    assert mm.pruned_terms == mem.pruned_terms
+    assert mm.tfidf_mat.shape == mem.tfidf_mat.shape
+    assert abs(mm.tfidf_mat - mem.tfidf_mat).max() == 0
+
+def test_index_vectorizer_matches_sklearn_transform(indexed):
+    mm, mem = indexed
+    queries = normalize_many(QUERIES)
+    assert mm.vectorizer.vocabulary_ == mem.vectorizer.vocabulary_
+    got = mm.vectorizer.transform(queries)
+    want = mem.vectorizer.transform(queries)
+    assert got.shape == want.shape
+    assert abs(got - want).max() < 1e-12
+
+def test_retrieval_is_identical_on_both_indexes(indexed):
+    mm, mem = indexed
+    got = RAGRetriever(mm, fuzzy_weight=0.8).retrieve_many(QUERIES)
+    assert got == RAGRetriever(mem, fuzzy_weight=0.8).retrieve_many(QUERIES)
+    assert any(got)
+
+def test_second_load_reuses_the_index(rag_csv, monkeypatch):
+    first = load(rag_csv)
+    monkeypatch.setattr(RAGDatabase, "_fit", lambda *a: pytest.fail("index should be reused"))
+    second = load(rag_csv)
+    assert second.index_path == first.index_path
+    assert abs(second.tfidf_mat - first.tfidf_mat).max() == 0
+
+def test_stale_format_index_is_rebuilt(rag_csv):
+    index_dir = load(rag_csv).index_path
+    meta_path = index_dir / "meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["version"] = INDEX_FORMAT_VERSION - 1
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    rebuilt = load(rag_csv)
+    assert rebuilt.index_path == index_dir
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["version"] == INDEX_FORMAT_VERSION
+    assert isinstance(rebuilt.vectorizer, IndexVectorizer)
@@ -0,0 +1,91 @@
+# backend/tests/test_rag_reload.py
+import pandas as pd
+import pytest
+from rag import RAGDatabase, RAGRegistry, RAGRetriever
+from rag.database import index_texts, read_csv_safely
+
+QUERIES = ["I want to buy a hand phone", "Let's play pocket ball tonight", "I went eye shoping yesterday",
+           "There were many black consumers", "I bought a new color lens", "nothing to correct here"]
+
+def write_rows(path, frame):
+    frame.to_csv(path, index=False, encoding="utf-8")
+
+def with_alternatives(frame, n):
+    """앞의 n개 행을 output만 바꿔 뒤에 덧붙인 사본 (어휘는 그대로)"""
+    extra = frame.iloc[:n].copy()
+    extra["output"] = extra["output"] + " (alt)"
+    return pd.concat([frame, extra], ignore_index=True)
+
+@pytest.fixture
+def base(rag_csv):
+    """UTF-8로 다시 쓴 CSV에서 로드한 기준 버전"""
+    frame = read_csv_safely(str(rag_csv))
+    write_rows(rag_csv, frame)
+    db = RAGDatabase(rag_csv)
+    db.load()
+    return db, frame
+
+def full_refit(csv_path):
+    db = RAGDatabase(csv_path, use_index=False)
+    db.load()
+    return db
+
+def test_incremental_load_matches_a_full_refit(base):
+    db, frame = base
+    write_rows(db.csv_path, with_alternatives(frame, 5))
+
+    updated = RAGDatabase(db.csv_path)
+    assert updated.load_incremental(db) == "incremental"
+    assert len(updated) == len(db) + 5
+    assert updated.vectorizer is db.vectorizer
+
+    full = full_refit(db.csv_path)
+    assert updated.patterns.bad == full.patterns.bad
+    assert updated.patterns.good == full.patterns.good
+    # 새 행은 기존 IDF로 변환해 덧붙임
+    expected = db.vectorizer.transform(index_texts(updated.patterns.bad, updated.patterns.ctx))
+    assert abs(updated.tfidf_mat - expected).max() < 1e-12
+
+    # IDF를 다시 학습하지 않으므로 점수는 근사, 순위와 힌트는 전체 재학습과 같아야 함
+    inc = RAGRetriever(updated, fuzzy_weight=0.8).retrieve_many(QUERIES)
+    ref = RAGRetriever(full, fuzzy_weight=0.8).retrieve_many(QUERIES)
+    for got, want in zip(inc, ref):
+        assert [h["natural"] for h in got] == [h["natural"] for h in want]
+        assert [h["sim"] for h in got] == pytest.approx([h["sim"] for h in want], abs=0.01)
+
+def test_unknown_words_fall_back_to_a_full_refit(base):
+    db, frame = base
+    extra = pd.DataFrame([{col: "zyzzyva quokka" for col in frame.columns}])
+    write_rows(db.csv_path, pd.concat([frame, extra], ignore_index=True))
+
+    updated = RAGDatabase(db.csv_path)
+    assert updated.load_incremental(db) == "full"
+    assert "zyzzyva" in updated.vectorizer.vocabulary_
+    assert updated.patterns.bad == full_refit(db.csv_path).patterns.bad
+
+def test_changed_existing_rows_fall_back_to_a_full_refit(base):
+    db, frame = base
+    write_rows(db.csv_path, frame.iloc[::-1])
+    assert RAGDatabase(db.csv_path).load_incremental(db) == "full"
+
+def test_large_appends_fall_back_to_a_full_refit(base):
+    db, frame = base
+    write_rows(db.csv_path, with_alternatives(frame, len(frame) // 5))
+    assert RAGDatabase(db.csv_path).load_incremental(db) == "full"
+
+def test_registry_swaps_in_the_incremental_version(base):
+    db, frame = base
+    swapped = []
+    registry = RAGRegistry(db.csv_path, RAGRetriever, on_swap=swapped.append)
+    registry.adopt(db)
+    assert registry.reload()["status"] == "unchanged"
+
+    old = registry.current
+    write_rows(db.csv_path, with_alternatives(frame, 5))
+    info = registry.reload()
+    assert info["status"] == "swapped" and info["mode"] == "incremental"
+    assert registry.current.version == 2 and len(registry.current.db) == len(db) + 5
+    assert swapped == [registry.current]
+    # 이전 스냅샷은 교체 후에도 그대로 사용 가능
+    assert len(old.db) == len(db)
+    assert old.retriever.retrieve("I want to buy a hand phone")
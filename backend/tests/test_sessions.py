@@ -0,0 +1,166 @@
+# backend/tests/test_sessions.py
+import json
+import sqlite3
+from serving import SessionStore
+
+class Retriever:
+    """호출 횟수를 세는 가짜 검색기 (문장마다 힌트 하나)"""
+
+    def __init__(self, natural: str = "cell phone"):
+        self.natural = natural
+        self.calls = 0
+
+    def retrieve_many(self, queries):
+        self.calls += 1
+        return [[{"id": self.natural, "konglish": "hand phone", "natural": self.natural, "why": "", "sim": 1.0}]
+                for _ in queries]
+
+def make_store(tmp_path, **kwargs):
+    store = SessionStore(tmp_path / "sessions.db", flush_interval=3600, **kwargs)
+    store.open()
+    return store
+
+def test_hint_cache_is_reused_for_the_same_rag_version(tmp_path):
+    store = make_store(tmp_path)
+    retriever = Retriever()
+    for _ in range(2):
+        hints = store.hints("s", "I bought a hand phone.", retriever.retrieve_many, 4, version="v1")
+    assert retriever.calls == 1
+    assert hints[0]["natural"] == "cell phone"
+    store.close()
+
+def test_hint_cache_is_dropped_when_the_rag_version_changes(tmp_path):
+    store = make_store(tmp_path)
+    store.hints("s", "I bought a hand phone.", Retriever().retrieve_many, 4, version="v1")
+    reloaded = Retriever("mobile phone")
+    hints = store.hints("s", "I bought a hand phone.", reloaded.retrieve_many, 4, version="v2")
+    assert reloaded.calls == 1
+    assert hints[0]["natural"] == "mobile phone"
+    assert store.stats()["hint_invalidations"] == 1
+    store.close()
+
+def test_persisted_hints_keep_their_rag_version(tmp_path):
+    store = make_store(tmp_path)
+    store.hints("s", "I bought a hand phone.", Retriever().retrieve_many, 4, version="v1")
+    store.close()
+
+    # 재시작 후 같은 버전이면 캐시 사용, DB가 바뀌었으면 다시 검색
+    store = make_store(tmp_path)
+    same = Retriever()
+    store.hints("s", "I bought a hand phone.", same.retrieve_many, 4, version="v1")
+    assert same.calls == 0
+    changed = Retriever("mobile phone")
+    assert store.hints("s", "I bought a hand phone.", changed.retrieve_many, 4, version="v2")[0]["natural"] == "mobile phone"
+    store.close()
+
+def test_unversioned_rows_are_treated_as_a_miss(tmp_path):
+    store = make_store(tmp_path)
+    store.append("s", "hi", "hello")
+    store.close()
+    # 버전 없이 기록된 이전 형식의 힌트 캐시
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    old_hints = [["i bought a hand phone.", [{"konglish": "hand phone", "natural": "stale", "sim": 1.0}]]]
+    conn.execute("UPDATE sessions SET hints = ?", (json.dumps(old_hints),))
+    conn.commit()
+    conn.close()
+
+    store = make_store(tmp_path)
+    retriever = Retriever()
+    hints = store.hints("s", "I bought a hand phone.", retriever.retrieve_many, 4, version="v1")
+    assert retriever.calls == 1 and hints[0]["natural"] == "cell phone"
+    assert store.history("s") == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    store.close()
+
+def test_turns_are_trimmed_to_max_turns(tmp_path):
+    store = make_store(tmp_path, max_turns=2, count_tokens=len)
+    for i in range(4):
+        store.append("s", f"u{i}", f"a{i}")
+    snapshot = store.snapshot("s")
+    assert [t["user"] for t in snapshot["turns"]] == ["u2", "u3"]
+    assert snapshot["tokens"] == sum(t["tokens"] for t in snapshot["turns"]) == 8
+    store.close()
+
+def test_oldest_turns_are_dropped_over_max_tokens(tmp_path):
+    store = make_store(tmp_path, max_tokens=10, count_tokens=len)
+    store.append("s", "aaa", "bbb")
+    store.append("s", "ccc", "ddd")
+    store.append("s", "ee", "ff")
+    snapshot = store.snapshot("s")
+    assert [t["user"] for t in snapshot["turns"]] == ["ccc", "ee"]
+    assert snapshot["tokens"] == 10
+    assert store.stats()["trimmed_turns"] == 1
+    # 마지막 턴 하나는 상한을 넘어도 유지
+    store.append("s", "x" * 20, "y")
+    assert [t["user"] for t in store.snapshot("s")["turns"]] == ["x" * 20]
+    assert store.stats()["trimmed_turns"] == 3
+    store.close()
+
+def test_least_recently_used_session_is_evicted(tmp_path):
+    store = make_store(tmp_path, max_sessions=2)
+    store.append("a", "hi", "hello")
+    store.append("b", "hi", "hello")
+    store.history("a")  # a를 최근 사용으로
+    store.append("c", "hi", "hello")
+    stats = store.stats()
+    assert stats["active"] == 2 and stats["evictions"] == 1
+    # 밀려난 b는 아직 기록 전이지만 flush 대기 목록에서 찾음
+    assert store.history("b") == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    assert store.stats()["loads"] == 1
+    store.close()
+
+def test_evicted_sessions_are_reloaded_from_sqlite(tmp_path):
+    store = make_store(tmp_path, max_sessions=1)
+    store.append("a", "hi", "hello")
+    store.append("b", "bye", "goodbye")
+    assert store.flush() == 2
+    assert store.flush() == 0
+    assert store.stats()["pending_writes"] == 0
+    assert store.snapshot("a")["turns"][0]["assistant"] == "hello"
+    assert store.stats()["loads"] == 1
+    assert store.snapshot("missing") is None
+    store.close()
+
+def test_close_flushes_pending_sessions(tmp_path):
+    store = make_store(tmp_path)
+    store.append("s", "hi", "hello")
+    store.hints("s", "I bought a hand phone.", Retriever().retrieve_many, 4, version="v1")
+    store.close()
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    turns, hints = conn.execute("SELECT turns, hints FROM sessions WHERE id = 's'").fetchone()
+    conn.close()
+    assert json.loads(turns)[0][:2] == ["hi", "hello"]
+    assert json.loads(hints)["version"] == "v1"
+
+def test_delete_removes_memory_and_sqlite_rows(tmp_path):
+    store = make_store(tmp_path)
+    store.append("s", "hi", "hello")
+    store.flush()
+    assert store.delete("s") is True
+    assert store.snapshot("s") is None
+    assert store.delete("s") is False
+    store.close()
+
+def test_expired_sessions_are_removed_on_open(tmp_path):
+    store = make_store(tmp_path)
+    store.append("old", "hi", "hello")
+    store.append("new", "hi", "hello")
+    store.close()
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    conn.execute("UPDATE sessions SET updated_at = 0 WHERE id = 'old'")
+    conn.commit()
+    conn.close()
+
+    store = make_store(tmp_path, ttl_days=1)
+    assert store.snapshot("old") is None
+    assert store.snapshot("new") is not None
+    store.close()
+
+def test_hint_cache_is_bounded_per_session(tmp_path):
+    store = make_store(tmp_path, max_hint_entries=2)
+    retriever = Retriever()
+    store.hints("s", "One. Two. Three.", retriever.retrieve_many, 4, version="v1")
+    assert store.snapshot("s")["cached_sentences"] == 2
+    # 가장 오래된 문장이 밀려나 다시 검색
+    store.hints("s", "One.", retriever.retrieve_many, 4, version="v1")
+    assert retriever.calls == 2
+    store.close()
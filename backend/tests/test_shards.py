@@ -0,0 +1,51 @@
+# backend/tests/test_shards.py
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+from rag import RAGDatabase, RAGRetriever, ShardedRetriever, ShardedSearcher, shutdown_shard_pool
+
+QUERIES = ["I want to buy a hand phone", "Let's play pocket ball tonight", "I went eye shoping yesterday",
+           "my handphone broke", "There were many black consumers", "I bought a new color lens",
+           "He is a skinship person", "nothing to correct here"]
+
+@pytest.fixture
+def databases(rag_csv):
+    """(memory-map 인덱스, 디스크 인덱스 없는 인메모리 인덱스)"""
+    mm = RAGDatabase(rag_csv)
+    mm.load()
+    mem = RAGDatabase(rag_csv, use_index=False)
+    mem.load()
+    return mm, mem
+
+@pytest.fixture
+def shard_pool():
+    yield
+    shutdown_shard_pool()
+
+@pytest.mark.parametrize("n_shards", [1, 3, 7])
+def test_in_process_shards_match_the_single_matrix(databases, n_shards):
+    db, _ = databases
+    expected = RAGRetriever(db, fuzzy_weight=0.8).retrieve_many(QUERIES)
+    sharded = ShardedRetriever(db, n_shards, workers=0, fuzzy_weight=0.8)
+    assert sharded.retrieve_many(QUERIES) == expected
+    assert sharded.stats()["shards"] == n_shards
+
+def test_pool_shards_match_the_single_matrix(databases, shard_pool):
+    for db in databases:
+        expected = RAGRetriever(db, fuzzy_weight=0.8).retrieve_many(QUERIES)
+        sharded = ShardedRetriever(db, 3, workers=2, fuzzy_weight=0.8)
+        assert sharded.retrieve_many(QUERIES) == expected
+        assert sharded.retrieve_many(QUERIES[:1]) == expected[:1]
+        sharded.searcher.close()
+
+def test_merged_topk_matches_an_unsharded_search():
+    mat = sparse_random(200, 50, density=0.1, format="csr", random_state=0)
+    q_mat = sparse_random(4, 50, density=0.3, format="csr", random_state=1)
+    expected = ShardedSearcher(mat, 1).search(q_mat, 10)
+    for n_shards in (2, 5, 13):
+        got = ShardedSearcher(mat, n_shards).search(q_mat, 10)
+        assert len(got) == len(expected)
+        for (got_rows, got_scores), (rows, scores) in zip(got, expected):
+            np.testing.assert_allclose(got_scores, scores)
+            # 동점이 없으면 행 순서도 같음
+            assert list(got_rows) == list(rows)
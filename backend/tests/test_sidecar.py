@@ -0,0 +1,131 @@
+# backend/tests/test_sidecar.py
+import os
+import stat
+import threading
+import time
+import pytest
+from rag import RAGDatabase, RAGRegistry, RAGRetriever, SidecarClient, SidecarError, SidecarRegistry, SidecarServer
+
+KEY = b"test-key"
+
+class DownClient:
+    """응답하지 않는 사이드카 (호출마다 delay 후 SidecarError)"""
+    address = "down.sock"
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+
+    def call(self, method, *args):
+        self.calls += 1
+        time.sleep(self.delay)
+        raise SidecarError("RAG sidecar timed out")
+
+def test_registry_checks_a_down_sidecar_once_per_interval():
+    client = DownClient()
+    registry = SidecarRegistry(client, refresh_interval=60.0)
+    threads = [threading.Thread(target=lambda: registry.current) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    start = time.perf_counter()
+    for _ in range(20):
+        assert registry.current is None
+    assert client.calls == 1
+    # 예약된 재확인 시각 전에는 RPC 없이 바로 반환
+    assert time.perf_counter() - start < client.delay
+    assert "timed out" in registry.last_error
+
+def test_registry_backs_off_after_failures():
+    client = DownClient(delay=0.0)
+    registry = SidecarRegistry(client, refresh_interval=0.01, max_backoff=0.05)
+    registry.current
+    registry.current
+    assert client.calls == 1
+    time.sleep(0.06)
+    registry.current
+    assert client.calls == 2
+
+def wait_for(call, timeout: float = 5.0):
+    """서버 스레드가 listen을 시작할 때까지 재시도"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return call()
+        except SidecarError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+def test_sidecar_requires_an_authkey(tmp_path):
+    with pytest.raises(SidecarError):
+        SidecarServer(None, str(tmp_path / "rag.sock"), b"")
+    with pytest.raises(SidecarError):
+        SidecarClient(str(tmp_path / "rag.sock"), b"")
+
+def test_sidecar_socket_is_owner_only(tmp_path):
+    address = str(tmp_path / "rag.sock")
+    server = SidecarServer(None, address, KEY)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = SidecarClient(address, KEY)
+        assert wait_for(lambda: client.call("ping")) == "pong"
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+        with pytest.raises(SidecarError):
+            SidecarClient(address, b"wrong-key").call("ping")
+    finally:
+        server.close()
+
+QUERIES = ["I want to buy a hand phone", "Let's play pocket ball tonight", "I went eye shoping yesterday",
+           "nothing to correct here"]
+
+@pytest.fixture
+def sidecar(rag_csv, tmp_path):
+    """CSV 사본을 서빙하는 사이드카 (서버 registry, 클라이언트)"""
+    db = RAGDatabase(rag_csv)
+    db.load()
+    registry = RAGRegistry(rag_csv, RAGRetriever)
+    registry.adopt(db)
+    address = str(tmp_path / "rag.sock")
+    server = SidecarServer(registry, address, KEY)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SidecarClient(address, KEY)
+    wait_for(lambda: client.call("ping"))
+    yield registry, client
+    server.close()
+
+def test_sidecar_round_trip_matches_the_local_retriever(sidecar):
+    registry, client = sidecar
+    local = registry.current
+    remote = SidecarRegistry(client).connect(timeout=5)
+    assert remote.version == local.version and remote.digest == local.digest
+    assert len(remote.db) == len(local.db)
+
+    expected = local.retriever.retrieve_many(QUERIES)
+    assert remote.retriever.retrieve_many(QUERIES) == expected
+    assert remote.retriever.retrieve(QUERIES[0]) == expected[0]
+    # pre 단계 컨텍스트를 주고받아 post 단계 검증도 같은 결과
+    contexts = remote.retriever.retrieve_contexts(QUERIES)
+    assert [c.hints for c in contexts] == expected
+    responses = ["I want to buy a cell phone", "I want to buy a hand phone"]
+    assert remote.retriever.validate(contexts[0], responses) == local.retriever.validate(
+        local.retriever.retrieve_context(QUERIES[0]), responses)
+
+    patterns = remote.db.patterns
+    assert patterns.bad == local.db.patterns.bad and patterns.good == local.db.patterns.good
+
+def test_sidecar_reload_swaps_the_client_version(sidecar):
+    registry, client = sidecar
+    swapped = []
+    remote = SidecarRegistry(client, on_swap=swapped.append, refresh_interval=0)
+    old = remote.connect(timeout=5)
+    assert remote.current is old and not swapped
+
+    registry.reload(force=True)
+    current = remote.current
+    assert current.version == old.version + 1 and current.mode == "full"
+    assert swapped == [current]
+    # 교체 전 스냅샷으로 시작한 요청은 이전 버전으로 계속 검색
+    assert old.retriever.retrieve_many(QUERIES) == current.retriever.retrieve_many(QUERIES)
@@ -0,0 +1,120 @@
+# backend/tests/test_streaming.py
+import asyncio
+import threading
+import time
+import pytest
+from serving import InferencePool, iterate_in_worker, stream_generate
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+class StubTokenizer:
+    """단어 ID → "w{id} " 디코딩만 하는 토크나이저"""
+
+    def __call__(self, text, return_tensors=None):
+        ids = torch.tensor([[1] * len(text.split())])
+
+        class Encoding(dict):
+            def to(self, device):
+                return self
+        return Encoding(input_ids=ids)
+
+    def decode(self, ids, **kwargs):
+        return "".join(f"w{i} " for i in ids)
+
+class FailingModel:
+    device = "cpu"
+
+    def generate(self, **kwargs):
+        raise RuntimeError("CUDA out of memory")
+
+class EndlessModel:
+    """stopping_criteria가 멈출 때까지 토큰을 계속 내보내는 모델"""
+    device = "cpu"
+
+    def __init__(self):
+        self.steps = 0
+        self.finished = threading.Event()
+
+    def generate(self, input_ids, streamer, stopping_criteria, **kwargs):
+        streamer.put(input_ids)
+        try:
+            while self.steps < 100_000:
+                self.steps += 1
+                ids = torch.tensor([[self.steps % 7]])
+                if any(bool(c(ids, None).all()) for c in stopping_criteria):
+                    break
+                streamer.put(ids[0])
+                time.sleep(0.001)
+            streamer.end()
+        finally:
+            self.finished.set()
+
+def run_with_deadline(fn, seconds=5.0):
+    """fn을 별도 스레드에서 실행하고 (완료 여부, 결과/예외) 반환"""
+    box = {}
+
+    def target():
+        try:
+            box["result"] = fn()
+        except BaseException as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return not thread.is_alive(), box
+
+def test_stream_generate_reraises_generate_error():
+    finished, box = run_with_deadline(lambda: list(stream_generate(FailingModel(), StubTokenizer(), "hand phone")))
+    assert finished, "stream_generate blocked after generate raised"
+    assert isinstance(box.get("error"), RuntimeError)
+
+def test_stream_generate_stops_generate_when_closed():
+    model = EndlessModel()
+    chunks = stream_generate(model, StubTokenizer(), "hand phone")
+    assert next(chunks)
+    chunks.close()
+    assert model.finished.wait(5)
+    assert model.steps < 100_000
+
+def test_iterate_in_worker_releases_slot_on_early_close():
+    pool = InferencePool(max_concurrency=1, max_queue=0)
+    closed = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                time.sleep(0.001)
+                yield "token"
+        finally:
+            closed.set()
+
+    async def run():
+        chunks = iterate_in_worker(pool.submit, endless)
+        async for _ in chunks:
+            break
+        await chunks.aclose()
+        assert await asyncio.to_thread(closed.wait, 5)
+        deadline = time.monotonic() + 5
+        while pool.completed < 1 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        # 슬롯이 반환되어 다음 요청을 받을 수 있어야 함
+        return await pool.run(lambda: "next")
+
+    assert asyncio.run(run()) == "next"
+    pool.shutdown()
+
+def test_iterate_in_worker_propagates_errors():
+    pool = InferencePool(max_concurrency=1, max_queue=0)
+
+    def failing():
+        yield "token"
+        raise RuntimeError("boom")
+
+    async def run():
+        return [item async for item in iterate_in_worker(pool.submit, failing)]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run())
+    pool.shutdown()
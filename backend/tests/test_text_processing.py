@@ -0,0 +1,38 @@
+# backend/tests/test_text_processing.py
+import pytest
+from utils import text_processing
+from utils.text_processing import UNK_ID, TokenVocab, phrase_coverage
+
+def test_phrase_coverage_counts_content_words():
+    assert phrase_coverage("People just say cell phone.", ["cell phone"])[0] == 1.0
+    assert phrase_coverage("Do you play pool?", ["cell phone"])[0] == 0.0
+
+def test_phrase_coverage_excludes_konglish_words():
+    naturals, konglish = ["cell phone"], ["hand phone"]
+    # "phone"만 겹치는 응답은 콩글리시를 되풀이한 것
+    assert phrase_coverage("Oh, you want a new hand phone?", naturals)[0] == pytest.approx(0.5)
+    assert phrase_coverage("Oh, you want a new hand phone?", naturals, exclude=konglish)[0] == 0.0
+    assert phrase_coverage("People just say cell phone.", naturals, exclude=konglish)[0] == 1.0
+
+def test_phrase_coverage_nothing_left_after_exclude():
+    assert phrase_coverage("apart", ["apart"], exclude=["apart"])[0] == 0.0
+
+def test_encode_is_lookup_only_by_default():
+    vocab = TokenVocab({})
+    assert vocab.encode(["mobile"]).tolist() == [UNK_ID]
+    assert len(vocab) == 1
+    i = vocab.encode(["mobile"], add=True)[0]
+    assert i != UNK_ID and vocab.encode(["mobile"]).tolist() == [i]
+
+def test_phrase_coverage_does_not_intern_text():
+    before = len(text_processing.VOCAB)
+    phrase_coverage("zxqv wplk", ["cell phone"])
+    phrase_coverage("zxqv wplk", ["cell phone"])
+    assert len(text_processing.VOCAB) - before <= 2
+
+def test_phrase_coverage_unknown_words_do_not_match(monkeypatch):
+    # 사전이 가득 차 natural 구문 단어도 UNK가 된 상태에서 UNK끼리 일치하면 안 됨
+    vocab = TokenVocab({}, max_size=3)
+    vocab.encode(["i", "a"], add=True)
+    monkeypatch.setattr(text_processing, "VOCAB", vocab)
+    assert phrase_coverage("I bought a mobile", ["cell phone"])[0] == 0.0
@@ -1,4 +1,12 @@
 # backend/utils/__init__.py
-from .text_processing import normalize_text, tok_list, content_tokens
+from .text_processing import (
+    normalize_text, tok_list, tok_spans, split_sentences, content_tokens,
+    normalize_many, tokenize_many, TokenVocab, VOCAB, content_mask, word_class_mask, phrase_coverage
+)
+from .metrics import metrics
 
-__all__ = ["normalize_text", "tok_list", "content_tokens"]
\ No newline at end of file
+__all__ = [
+    "normalize_text", "tok_list", "tok_spans", "split_sentences", "content_tokens",
+    "normalize_many", "tokenize_many", "TokenVocab", "VOCAB", "content_mask", "word_class_mask",
+    "phrase_coverage", "metrics"
+]
\ No newline at end of file
@@ -0,0 +1,155 @@
+# backend/utils/metrics.py
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# 초 단위 히스토그램 버킷
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+
+# 요청별 단계 시간 (debug 요청에서만 설정)
+_trace: ContextVar[Optional[Dict[str, float]]] = ContextVar("killkong_trace", default=None)
+
+class Histogram:
+    """누적 버킷 히스토그램"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """파이프라인 단계별 지연 시간/카운터 수집기 (Prometheus 텍스트 포맷 출력)"""
+
+    def __init__(self, enabled: bool = True, prefix: str = "killkong"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._rates: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+
+    def active(self) -> bool:
+        """지표 수집 중이거나 현재 요청이 trace 중인지"""
+        return self.enabled or _trace.get() is not None
+
+    def stage(self, name: str):
+        """단계 시간 측정 컨텍스트 (비활성화 + trace 없음이면 no-op)"""
+        if not self.active():
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def observe(self, name: str, seconds: float):
+        """단계 소요 시간 기록"""
+        trace = _trace.get()
+        if trace is not None:
+            trace[name] = round(trace.get(name, 0.0) + seconds, 6)
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._stages.get(name)
+            if hist is None:
+                hist = self._stages[name] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name: str, value: float = 1):
+        """카운터 증가"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_generation(self, tokens: int, seconds: float, candidates: int = 0):
+        """생성 토큰 수, 속도(tokens/sec), 후보 수 기록"""
+        self.observe("generate", seconds)
+        if not self.enabled:
+            return
+        self.inc("generated_tokens_total", tokens)
+        if candidates:
+            self.inc("candidates_total", candidates)
+        if seconds > 0:
+            with self._lock:
+                hist = self._rates.get("tokens_per_second")
+                if hist is None:
+                    hist = self._rates["tokens_per_second"] = Histogram(RATE_BUCKETS)
+                hist.observe(tokens / seconds)
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus 텍스트 노출 포맷"""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            if self._stages:
+                lines.append(f"# TYPE {p}_stage_seconds histogram")
+                for name, hist in sorted(self._stages.items()):
+                    lines.extend(self._render_hist(f"{p}_stage_seconds", hist, f'stage="{name}"'))
+            for name, hist in sorted(self._rates.items()):
+                lines.append(f"# TYPE {p}_{name} histogram")
+                lines.extend(self._render_hist(f"{p}_{name}", hist, ""))
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {p}_{name} counter")
+                lines.append(f"{p}_{name} {value}")
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_hist(metric: str, hist: Histogram, labels: str):
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, n in zip(hist.buckets, hist.counts):
+            cumulative += n
+            yield f'{metric}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}'
+        yield f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}'
+        label_block = f"{{{labels}}}" if labels else ""
+        yield f"{metric}_sum{label_block} {hist.sum}"
+        yield f"{metric}_count{label_block} {hist.count}"
+
+def start_trace():
+    """현재 요청의 단계별 시간 수집 시작 (reset 토큰 반환)"""
+    return _trace.set({})
+
+def end_trace(token) -> Dict[str, float]:
+    """수집한 단계별 시간을 반환하고 trace 종료"""
+    trace = _trace.get() or {}
+    _trace.reset(token)
+    return trace
+
+metrics = Metrics()
@@ -1,22 +1,68 @@
 # backend/utils/text_processing.py
 import re
+import sys
+import threading
 import unicodedata
-from typing import List
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w[\w'-]*")
+WHITESPACE = re.compile(r"\s+")
+# 문장 끝 구두점(.!?…) 뒤 공백 또는 줄바꿈에서 분리
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"')\]])\s+|\s*\n\s*")
+
+# 단어 부류 비트 플래그 (TokenVocab.flags)
+STOP = 1
+TIME = 2
+COLOR = 4
+VERB = 8
+
+# 인턴할 최대 토큰 수 (초과분은 UNK_ID, 사용자 입력은 인턴하지 않음)
+MAX_VOCAB = 200_000
+UNK_ID = 0
+
+def _nfkc(text: str) -> str:
+    # ASCII는 NFKC 결과가 같으므로 건너뜀
+    return text if text.isascii() else unicodedata.normalize("NFKC", text)
 
 def normalize_text(text: str) -> str:
     """텍스트 정규화"""
-    text = unicodedata.normalize("NFKC", str(text))
-    return re.sub(r"\s+", " ", text).strip()
+    return WHITESPACE.sub(" ", _nfkc(str(text))).strip()
 
 def tok_list(text: str) -> List[str]:
     """단어 토큰화"""
-    pattern = re.compile(r"\w[\w'-]*")
-    return [t.lower() for t in pattern.findall(normalize_text(text))]
+    return [t.lower() for t in TOKEN_PATTERN.findall(_nfkc(str(text)))]
+
+def tok_spans(text: str) -> List[Tuple[str, int, int]]:
+    """단어 토큰화 (원문 기준 시작/끝 오프셋 포함)"""
+    return [
+        (_nfkc(m.group()).lower(), m.start(), m.end())
+        for m in TOKEN_PATTERN.finditer(str(text))
+    ]
+
+def split_sentences(text: str) -> List[str]:
+    """문장 분리 (빈 문장 제외, 각 문장은 normalize_text 적용)"""
+    text = _nfkc(str(text))
+    return [s for s in (normalize_text(p) for p in SENTENCE_BOUNDARY.split(text)) if s]
 
 def content_tokens(tokens: List[str], stop_words: set) -> List[str]:
     """불용어 제거"""
     return [t for t in tokens if t not in stop_words]
 
+def normalize_many(texts: Iterable) -> List[str]:
+    """normalize_text 일괄 버전 (list, pandas Series, NumPy 문자열 배열)"""
+    sub, nfkc = WHITESPACE.sub, _nfkc
+    return [sub(" ", nfkc(str(t))).strip() for t in _as_iterable(texts)]
+
+def tokenize_many(texts: Iterable) -> List[List[str]]:
+    """tok_list 일괄 버전"""
+    findall, nfkc = TOKEN_PATTERN.findall, _nfkc
+    return [[t.lower() for t in findall(nfkc(str(text)))] for text in _as_iterable(texts)]
+
+def _as_iterable(texts: Iterable) -> Iterable:
+    # Series/ndarray는 tolist()가 원소별 인덱싱보다 빠름
+    return texts.tolist() if hasattr(texts, "tolist") else texts
+
 # 상수
 STOP_WORDS = {
     "a", "an", "the", "to", "for", "of", "in", "on", "at", "by", "and", "or", "but", "so",
@@ -43,4 +89,103 @@ VERB_BASE = {
     "call", "ask", "need", "want", "like", "love", "use", "try",
     "pay", "drive", "walk", "run", "eat", "drink", "work", "study", 
     "have", "get", "give", "feel", "think", "say", "tell"
-}
\ No newline at end of file
+}
+
+class TokenVocab:
+    """토큰 → 정수 ID 인턴 사전 + ID별 단어 부류 비트 플래그 표
+
+    불용어/시간어 판별은 flags[ids] & STOP 같은 배열 연산이 됩니다.
+    encode()는 기본적으로 조회만 하므로 사용자 트래픽으로 사전이 커지지 않습니다.
+    조회는 락 없이, 새 토큰 추가만 락을 잡습니다 (ID가 보이기 전에 플래그 배열을 먼저 늘림).
+    """
+
+    def __init__(self, classes: Dict[int, Iterable[str]], max_size: int = MAX_VOCAB):
+        self.max_size = max_size
+        self._ids: Dict[str, int] = {"": UNK_ID}
+        self._tokens: List[str] = [""]
+        self._flags = np.zeros(1024, dtype=np.uint8)
+        self._lock = threading.Lock()
+        for flag, words in classes.items():
+            for w in words:
+                self._flags[self.intern(w)] |= flag
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def intern(self, tok: str) -> int:
+        i = self._ids.get(tok)
+        if i is not None:
+            return i
+        with self._lock:
+            i = self._ids.get(tok)
+            if i is not None:
+                return i
+            i = len(self._tokens)
+            if i >= self.max_size:
+                return UNK_ID
+            if i >= len(self._flags):
+                self._flags = np.concatenate([self._flags, np.zeros_like(self._flags)])
+            self._tokens.append(sys.intern(tok))
+            self._ids[self._tokens[i]] = i
+            return i
+
+    def encode(self, tokens: Sequence[str], add: bool = False) -> np.ndarray:
+        """토큰 → ID (사전에 없는 토큰은 UNK_ID, add=True면 새로 인턴)
+
+        사용자 입력/생성 응답은 조회만 하고, 패턴 DB처럼 크기가 정해진 텍스트만 add=True로 추가합니다.
+        """
+        get = self._ids.get
+        if not add:
+            return np.array([get(t, UNK_ID) for t in tokens], dtype=np.int32)
+        ids = [get(t) for t in tokens]
+        if None in ids:
+            ids = [i if i is not None else self.intern(t) for i, t in zip(ids, tokens)]
+        return np.array(ids, dtype=np.int32)
+
+    def encode_many(self, texts: Iterable, add: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 텍스트를 한 번에 토큰화 → (평탄화된 ID 배열, 텍스트별 시작 offsets)"""
+        token_lists = tokenize_many(texts)
+        offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in token_lists], out=offsets[1:])
+        ids = self.encode([t for toks in token_lists for t in toks], add=add)
+        return ids, offsets
+
+    def flags(self, ids: np.ndarray) -> np.ndarray:
+        return self._flags[ids]
+
+    def tokens(self, ids: Iterable[int]) -> List[str]:
+        return [self._tokens[i] for i in ids]
+
+VOCAB = TokenVocab({STOP: STOP_WORDS, TIME: TIME_WORDS, COLOR: COLORS, VERB: VERB_BASE})
+
+def content_mask(ids: np.ndarray) -> np.ndarray:
+    """불용어가 아닌 토큰 위치 (bool 배열)"""
+    return (VOCAB.flags(ids) & STOP) == 0
+
+def word_class_mask(ids: np.ndarray, flag: int) -> np.ndarray:
+    """flag(TIME, COLOR, VERB ...) 부류에 속하는 토큰 위치"""
+    return (VOCAB.flags(ids) & flag) != 0
+
+def phrase_coverage(text: str, phrases: Sequence[str], exclude: Optional[Sequence[str]] = None) -> np.ndarray:
+    """phrase별 내용어 중 text에 등장하는 비율 (0~1, 내용어가 없으면 전체 토큰 기준)
+
+    exclude[n]을 주면 그 구문의 토큰은 phrases[n]에서 빼고 셉니다 (남는 토큰이 없으면 0).
+    phrases/exclude(패턴 DB의 natural/konglish)는 사전에 추가하고 text는 조회만 하며,
+    사전에 없는 토큰(UNK_ID)끼리는 같은 단어로 보지 않도록 비교에서 뺍니다.
+    """
+    ids, offsets = VOCAB.encode_many(phrases, add=True)
+    if exclude is not None:
+        ex_ids, ex_offsets = VOCAB.encode_many(exclude, add=True)
+    have = VOCAB.encode(tok_list(text))
+    have = have[have != UNK_ID]
+    content = content_mask(ids)
+    out = np.zeros(len(phrases))
+    for n in range(len(phrases)):
+        s = slice(offsets[n], offsets[n + 1])
+        want = ids[s][content[s]] if content[s].any() else ids[s]
+        if exclude is not None:
+            want = want[~np.isin(want, ex_ids[ex_offsets[n]:ex_offsets[n + 1]])]
+        want = want[want != UNK_ID]
+        if want.size:
+            out[n] = np.isin(np.unique(want), have).mean()
+    return out
@@ -0,0 +1,145 @@
+"""
+/api/v1/chat 엔드투엔드 부하 테스트
+
+FriendsFixerAI 대신 결정적 스텁 모델(실제 RAG 검색 + 고정 생성 지연)을 넣고
+FastAPI 앱을 인프로세스(ASGI)로 호출하여 p50/p95/p99 지연, 처리량, 최대 RSS를 측정합니다.
+
+사용법:
+    python benchmarks/bench_chat.py --concurrency 1 8 32 --requests 200 --out chat.json
+    python benchmarks/bench_chat.py --baseline chat.json
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+import types
+from collections import Counter
+
+from common import add_common_args, environment, finish, peak_rss_mb, summarize
+
+from config import config
+from rag import RAGDatabase, RAGRetriever
+
+MESSAGES = [
+    "I want to buy a hand phone",
+    "Let's play pocket ball tonight",
+    "I went eye shopping yesterday",
+    "There were many black consumers at the store",
+    "His coloring is good to hear",
+    "Can you recommend a good place for dinner",
+]
+
+class StubFixerAI:
+    """결정적 스텁 모델 (FriendsFixerAI 대체)"""
+    
+    gen_delay = 0.05
+    
+    def __init__(self):
+        self.model = None
+        self.rag_db = None
+        self.retriever = None
+        self.is_initialized = False
+    
+    def initialize(self):
+        self.rag_db = RAGDatabase(config.RAG_DB_PATH)
+        self.rag_db.load()
+        self.retriever = RAGRetriever(self.rag_db, config.RAG_TOP_K, config.RAG_MIN_SIM, config.RAG_EXACT_MATCH)
+        self.model = "stub"
+        self.is_initialized = True
+    
+    def generate_response(self, message: str, show_hints: bool = False) -> dict:
+        start = time.perf_counter()
+        hints = self.retriever.retrieve(message)
+        # GPU 생성처럼 GIL을 놓고 대기
+        time.sleep(self.gen_delay)
+        if hints:
+            response = f"'{hints[0]['konglish']}' is Konglish—people just say '{hints[0]['natural']}'."
+        else:
+            response = "Sounds natural to me!"
+        return {
+            "response": response,
+            "hints": hints if show_hints else None,
+            "processing_time": round(time.perf_counter() - start, 4),
+            "model_used": "stub"
+        }
+
+def load_app():
+    """스텁 모델을 models 모듈로 등록한 뒤 FastAPI 앱 import"""
+    stub = types.ModuleType("models")
+    stub.FriendsFixerAI = StubFixerAI
+    sys.modules["models"] = stub
+    import app
+    return app
+
+async def run_load(app_module, concurrency: int, n_requests: int, show_hints: bool) -> dict:
+    import httpx
+    
+    messages = itertools.cycle(MESSAGES)
+    latencies, statuses = [], Counter()
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app_module.app)
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def one(msg):
+            async with sem:
+                t = time.perf_counter()
+                r = await client.post("/api/v1/chat", json={"message": msg, "show_hints": show_hints})
+                # 503/500 응답은 빨리 끝나므로 지연 통계에서 제외하고 오류율로 따로 집계
+                if 200 <= r.status_code < 300:
+                    latencies.append(time.perf_counter() - t)
+                statuses[r.status_code] += 1
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(one(next(messages)) for _ in range(n_requests)))
+        wall = time.perf_counter() - start
+    
+    result = summarize(latencies, wall)
+    result["errors"] = n_requests - len(latencies)
+    result["error_rate"] = round(result["errors"] / n_requests, 4) if n_requests else 0.0
+    result["status_codes"] = {str(k): v for k, v in sorted(statuses.items())}
+    return result
+
+async def run_all(args) -> dict:
+    app_module = load_app()
+    app_module.config.RESPONSE_CACHE_ENABLED = args.cache
+    StubFixerAI.gen_delay = args.gen_ms / 1000.0
+    
+    results = {}
+    async with app_module.app.router.lifespan_context(app_module.app):
+        # 모델은 백그라운드 단계에서 로드되므로 준비될 때까지 대기
+        await asyncio.to_thread(app_module.startup.wait, "model")
+        results["startup"] = app_module.startup.status()
+        for c in args.concurrency:
+            print(f"🚀 concurrency={c}, requests={args.requests}")
+            results[f"c{c}"] = await run_load(app_module, c, args.requests, args.show_hints)
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="KillKong /api/v1/chat load test (stub model)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--gen-ms", type=float, default=50.0, help="스텁 모델 생성 지연 (ms)")
+    parser.add_argument("--show-hints", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="응답 캐시 사용")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="허용 비 2xx 응답 비율 (초과 시 실패)")
+    add_common_args(parser)
+    args = parser.parse_args()
+    
+    report = {
+        "benchmark": "chat",
+        "environment": environment(),
+        "settings": {
+            "gen_ms": args.gen_ms,
+            "show_hints": args.show_hints,
+            "cache": args.cache,
+            "inference_max_concurrency": config.INFERENCE_MAX_CONCURRENCY,
+            "inference_max_queue": config.INFERENCE_MAX_QUEUE
+        },
+        "results": asyncio.run(run_all(args))
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return finish(report, args.out, args.baseline, args.tolerance, args.max_error_rate)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+모델 생성 벤치마크 (추론 백엔드별 tokens/sec, 지연 시간, RSS)
+
+각 모드는 별도 프로세스에서 측정하므로 RSS가 서로 섞이지 않습니다.
+
+    python benchmarks/bench_generation.py --modes cpu-int8 cpu-fp32
+    python benchmarks/bench_generation.py --modes gpu-4bit cpu-int8 --max-new-tokens 64 --out gen.json
+
+- gpu-4bit: BASE_MODEL + LoRA(MODEL_DIR), bitsandbytes 4-bit (CUDA 필요)
+- cpu-int8 / cpu-fp32: scripts/export_cpu_model.py로 만든 CPU_MODEL_DIR
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from common import add_common_args, environment, finish, peak_rss_mb, summarize
+from config import config
+
+PROMPTS = [
+    "I bought a new hand phone yesterday.",
+    "Let's play pocket ball after work!",
+    "My manager is such a black consumer lol",
+    "I went eye shopping at the mall with my friends.",
+]
+
+def current_rss_mb() -> float:
+    """현재 RSS (MB, /proc 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+def load_mode(mode: str, model_dir: Path, threads):
+    import torch
+
+    if mode == "gpu-4bit":
+        from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+        from peft import PeftModel
+
+        bnb = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16 if config.COMPUTE_DTYPE_BF16 else torch.float16
+        )
+        tokenizer = AutoTokenizer.from_pretrained(config.BASE_MODEL)
+        model = AutoModelForCausalLM.from_pretrained(config.BASE_MODEL, quantization_config=bnb, device_map="auto")
+        model = PeftModel.from_pretrained(model, str(config.MODEL_DIR)).eval()
+        return model, tokenizer
+
+    from serving.cpu_model import load_cpu_model
+    return load_cpu_model(model_dir, quant="int8" if mode == "cpu-int8" else "none", threads=threads)
+
+def encode(tokenizer, text: str):
+    """채팅 템플릿이 있으면 적용"""
+    if getattr(tokenizer, "chat_template", None):
+        text = tokenizer.apply_chat_template(
+            [{"role": "user", "content": text}], tokenize=False, add_generation_prompt=True
+        )
+    return tokenizer(text, return_tensors="pt")
+
+def run_worker(mode: str, model_dir: Path, threads, max_new_tokens: int, repeat: int) -> dict:
+    """한 모드 측정 (자식 프로세스에서 실행)"""
+    import torch
+    # 라이브러리 자체 메모리는 모델 RSS에서 제외
+    import transformers
+
+    rss_before = current_rss_mb()
+    t = time.perf_counter()
+    model, tokenizer = load_mode(mode, model_dir, threads)
+    load_s = time.perf_counter() - t
+    rss_loaded = current_rss_mb()
+
+    pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    inputs = [encode(tokenizer, p).to(model.device) for p in PROMPTS]
+    gen = dict(do_sample=False, pad_token_id=pad_id)
+
+    def generate(enc, n):
+        with torch.inference_mode():
+            return model.generate(**enc, max_new_tokens=n, min_new_tokens=n, **gen)
+
+    generate(inputs[0], 4)  # 워밍업
+
+    prefill, latencies, tokens = [], [], 0
+    for i in range(repeat):
+        enc = inputs[i % len(inputs)]
+        t = time.perf_counter()
+        generate(enc, 1)
+        prefill.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        out = generate(enc, max_new_tokens)
+        latencies.append(time.perf_counter() - t)
+        tokens += out.shape[1] - enc["input_ids"].shape[1]
+
+    return {
+        "load_s": round(load_s, 2),
+        "threads": torch.get_num_threads(),
+        "tokens_per_s": round(tokens / sum(latencies), 2),
+        "time_to_first_token": summarize(prefill),
+        "generate": summarize(latencies),
+        "rss_model_mb": round(rss_loaded - rss_before, 2),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="KillKong generation benchmark (tokens/sec, RSS per backend)")
+    parser.add_argument("--modes", nargs="+", default=["cpu-int8", "cpu-fp32"],
+                        choices=["gpu-4bit", "cpu-int8", "cpu-fp32"])
+    parser.add_argument("--model-dir", type=Path, default=config.CPU_MODEL_DIR, help="CPU export 디렉토리")
+    parser.add_argument("--threads", type=int, default=config.CPU_THREADS)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=8)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    add_common_args(parser)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.model_dir, args.threads, args.max_new_tokens, args.repeat)
+        print(json.dumps(result))
+        return 0
+
+    report = {
+        "benchmark": "generation",
+        "environment": environment(),
+        "settings": {"max_new_tokens": args.max_new_tokens, "repeat": args.repeat, "model_dir": str(args.model_dir)},
+        "results": {}
+    }
+    for mode in args.modes:
+        print(f"🚀 Measuring {mode}...")
+        cmd = [
+            sys.executable, __file__, "--worker", mode, "--model-dir", str(args.model_dir),
+            "--max-new-tokens", str(args.max_new_tokens), "--repeat", str(args.repeat)
+        ]
+        if args.threads:
+            cmd += ["--threads", str(args.threads)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"⚠️  {mode} failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            report["results"][mode] = {"error": proc.stderr.strip()[-500:]}
+            continue
+        report["results"][mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    return finish(report, args.out, args.baseline, args.tolerance)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+RAG 검색 벤치마크
+
+data/RAGdb_final.csv 및 이를 10×~1000× 늘린 합성 코퍼스에 대해
+RAGDatabase.load, RAGRetriever.retrieve/retrieve_many, tok_list/normalize_text(및 일괄 API) 지연 시간을 측정합니다.
+
+사용법:
+    python benchmarks/bench_retrieval.py --scales 1 10 100 --out retrieval.json
+    python benchmarks/bench_retrieval.py --baseline retrieval.json
+"""
+import argparse
+import csv
+import itertools
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import add_common_args, environment, finish, peak_rss_mb, time_calls
+
+from config import config
+from rag import RAGDatabase, RAGRetriever, ShardedRetriever, create_retriever, shutdown_shard_pool
+from rag.database import infer_cols, read_csv_safely
+from utils.text_processing import VOCAB, normalize_many, normalize_text, tok_list, tokenize_many
+
+# 정확 일치가 있는 문장 (gr.Examples 포함)
+EXACT_QUERIES = [
+    "I want to buy a hand phone",
+    "Let's play pocket ball tonight",
+    "I went eye shopping yesterday",
+    "I need a new color lens and a point card",
+]
+# 정확 일치가 없어 TF-IDF 경로를 타는 문장
+FUZZY_QUERIES = [
+    "There were many black consumers at the store",
+    "His coloring is good to hear",
+    "My handphone battery died during the meeting",
+    "Can you recommend a good place for eyeshopping downtown",
+]
+
+def make_synthetic_csv(src: Path, scale: int, dst: Path, seed: int = 0) -> int:
+    """원본 행을 scale배로 늘린 합성 CSV 생성 (행마다 임의 단어를 섞어 중복 방지)"""
+    rng = random.Random(seed)
+    df = read_csv_safely(str(src))
+    bad_col, _, ctx_col = infer_cols(df)
+    fields = list(df.columns)
+    rows = df.to_dict("records")
+    
+    n = 0
+    with open(dst, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for rep in range(scale):
+            for row in rows:
+                if rep:
+                    row = dict(row)
+                    noise = " ".join(f"w{rng.randint(0, 20000)}" for _ in range(2))
+                    row[bad_col] = f"{row[bad_col]} {noise}"
+                    if ctx_col:
+                        row[ctx_col] = f"{row[ctx_col]} {noise}"
+                writer.writerow(row)
+                n += 1
+    return n
+
+def labeled_queries(db: RAGDatabase, n: int = 100, seed: int = 0):
+    """(문장, 정답 BAD) 쌍: 문장 속 원형, 붙여쓰기, 글자 뒤바꿈 변형"""
+    rng = random.Random(seed)
+    rows = rng.sample(range(len(db)), min(n, len(db)))
+    out = []
+    for i in rows:
+        bad = db.patterns.bad[i]
+        out.append((f"I saw a {bad} yesterday", bad))
+        if " " in bad:
+            out.append((f"I saw a {bad.replace(' ', '')} yesterday", bad))
+        if len(bad) > 4:
+            k = rng.randrange(1, len(bad) - 2)
+            swapped = bad[:k] + bad[k + 1] + bad[k] + bad[k + 2:]
+            out.append((f"I saw a {swapped} yesterday", bad))
+    return out
+
+def recall_at_k(retriever, queries, k: int) -> float:
+    """정답 패턴이 상위 k개 힌트에 포함된 비율"""
+    results = retriever.retrieve_many([q for q, _ in queries], top_k=k, min_sim=1e-6)
+    hit = sum(any(h["konglish"] == bad for h in hints) for hints, (_, bad) in zip(results, queries))
+    return round(hit / len(queries), 4) if queries else 0.0
+
+def bench_backends(db: RAGDatabase, backends, repeat: int, k: int, fuzzy_weight: float) -> dict:
+    """검색 백엔드별 recall@k 및 지연 시간 비교 (정확 일치 선단계 제외)"""
+    queries = labeled_queries(db)
+    encoder = None
+    result = {}
+    for backend in backends:
+        if backend != "tfidf" and encoder is None:
+            try:
+                from rag.embedding import load_encoder
+                encoder = load_encoder(config.RAG_EMBED_MODEL)
+            except ImportError as e:
+                print(f"⚠️  Skipping {backend}: {e}")
+                continue
+        retriever = create_retriever(
+            db, backend, config.RAG_TOP_K, config.RAG_MIN_SIM, exact_match=False, encoder=encoder,
+            embed_dtype=config.RAG_EMBED_DTYPE, nprobe=config.RAG_ANN_NPROBE, dense_weight=config.RAG_HYBRID_WEIGHT,
+            fuzzy_weight=fuzzy_weight, fuzzy_min=config.RAG_FUZZY_MIN
+        )
+        it = itertools.cycle(q for q, _ in queries)
+        stats = time_calls(lambda: retriever.retrieve(next(it)), repeat)
+        stats[f"recall_at_{k}"] = recall_at_k(retriever, queries, k)
+        result[backend] = stats
+    return result
+
+def bench_corpus(csv_path: Path, repeat: int, backends=(), k: int = 4, fuzzy_weight: float = 0.0,
+                 shards: int = 0) -> dict:
+    """한 코퍼스에 대한 로드/검색 측정"""
+    result = {}
+    
+    t = time.perf_counter()
+    db = RAGDatabase(csv_path, use_index=False)
+    db.load()
+    result["load_csv_s"] = round(time.perf_counter() - t, 4)
+    
+    t = time.perf_counter()
+    RAGDatabase(csv_path).load()
+    result["load_build_index_s"] = round(time.perf_counter() - t, 4)
+    
+    t = time.perf_counter()
+    db = RAGDatabase(csv_path)
+    db.load()
+    result["load_mmap_s"] = round(time.perf_counter() - t, 4)
+    result["rows"] = len(db)
+    
+    retriever = RAGRetriever(db, config.RAG_TOP_K, config.RAG_MIN_SIM, config.RAG_EXACT_MATCH)
+    it_exact = itertools.cycle(EXACT_QUERIES)
+    it_fuzzy = itertools.cycle(FUZZY_QUERIES)
+    result["retrieve_exact"] = time_calls(lambda: retriever.retrieve(next(it_exact)), repeat)
+    result["retrieve_tfidf"] = time_calls(lambda: retriever.retrieve(next(it_fuzzy)), repeat)
+    
+    batch = (EXACT_QUERIES + FUZZY_QUERIES) * 8
+    stats = time_calls(lambda: retriever.retrieve_many(batch), max(1, repeat // 10))
+    stats["per_query_ms"] = round(stats["mean_ms"] / len(batch), 4)
+    result["retrieve_many_64"] = stats
+    
+    if shards > 1:
+        # 같은 배치를 샤드 프로세스 풀로 (결과는 동점 순서를 제외하면 동일)
+        sharded = ShardedRetriever(db, shards, None, config.RAG_TOP_K, config.RAG_MIN_SIM, config.RAG_EXACT_MATCH)
+        stats = time_calls(lambda: sharded.retrieve_many(batch), max(1, repeat // 10))
+        stats["per_query_ms"] = round(stats["mean_ms"] / len(batch), 4)
+        result[f"retrieve_many_64_shards{shards}"] = stats
+    
+    # post 단계: RERANK_N개 응답을 pre 단계 후보 행에만 채점 vs 전체 코퍼스 재검색
+    responses = FUZZY_QUERIES[:config.RERANK_N]
+    context = retriever.retrieve_context(FUZZY_QUERIES[0])
+    result["post_validate"] = time_calls(lambda: retriever.validate(context, responses, config.POST_MIN_SIM), repeat)
+    result["post_full_rescan"] = time_calls(
+        lambda: retriever.retrieve_many(responses, min_sim=config.POST_MIN_SIM), repeat
+    )
+    
+    # 문자 trigram 역색인 단독 (오타/붙여쓰기 쿼리)
+    it_typo = itertools.cycle(q for q, _ in labeled_queries(db, n=50))
+    result["fuzzy_index_search"] = time_calls(
+        lambda: db.fuzzy.search(next(it_typo), config.RAG_TOP_K * 3, config.RAG_FUZZY_MIN), repeat
+    )
+    
+    if backends:
+        result["backends"] = bench_backends(db, backends, repeat, k, fuzzy_weight)
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="KillKong RAG retrieval benchmark")
+    parser.add_argument("--csv", type=Path, default=config.RAG_DB_PATH)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--backends", nargs="*", default=["tfidf"], choices=["tfidf", "dense", "hybrid"],
+                        help="recall@k/지연 비교할 검색 백엔드")
+    parser.add_argument("--k", type=int, default=4, help="recall@k의 k")
+    parser.add_argument("--fuzzy-weight", type=float, default=config.RAG_FUZZY_WEIGHT,
+                        help="문자 trigram 점수 가중치 (0이면 비활성화)")
+    parser.add_argument("--shards", type=int, default=0, help="2 이상이면 샤드 병렬 retrieve_many도 측정")
+    add_common_args(parser)
+    args = parser.parse_args()
+    
+    report = {"benchmark": "retrieval", "environment": environment(), "results": {}}
+    
+    sentences = EXACT_QUERIES + FUZZY_QUERIES
+    it = itertools.cycle(sentences)
+    report["results"]["text_processing"] = {
+        "normalize_text": time_calls(lambda: normalize_text(next(it)), args.repeat * 10),
+        "tok_list": time_calls(lambda: tok_list(next(it)), args.repeat * 10),
+        # 일괄 API (호출당 문장 목록 전체)
+        "normalize_many": time_calls(lambda: normalize_many(sentences), args.repeat),
+        "tokenize_many": time_calls(lambda: tokenize_many(sentences), args.repeat),
+        "encode_many": time_calls(lambda: VOCAB.encode_many(sentences), args.repeat)
+    }
+    
+    tmp_dir = Path(tempfile.mkdtemp(prefix="killkong-bench-"))
+    try:
+        for scale in args.scales:
+            csv_path = tmp_dir / f"RAGdb_x{scale}.csv"
+            n = make_synthetic_csv(args.csv, scale, csv_path)
+            print(f"📊 Scale x{scale}: {n} rows")
+            report["results"][f"x{scale}"] = bench_corpus(
+                csv_path, args.repeat, args.backends, args.k, args.fuzzy_weight, args.shards
+            )
+    finally:
+        shutdown_shard_pool()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    report["peak_rss_mb"] = peak_rss_mb()
+    return finish(report, args.out, args.baseline, args.tolerance)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+벤치마크 공통 유틸 (지연 시간 통계, 메모리, 결과 저장/베이스라인 비교)
+"""
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+
+# backend 모듈은 backend 디렉토리 기준 import (from config import config)
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """정렬된 값의 q 분위수 (선형 보간)"""
+    if not sorted_vals:
+        return 0.0
+    pos = (len(sorted_vals) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (pos - lo)
+
+def summarize(latencies: List[float], wall_time: Optional[float] = None) -> Dict[str, float]:
+    """초 단위 지연 시간 목록 → ms 단위 p50/p95/p99 및 처리량"""
+    vals = sorted(latencies)
+    total = wall_time if wall_time is not None else sum(vals)
+    return {
+        "n": len(vals),
+        "mean_ms": round(1000 * sum(vals) / len(vals), 4) if vals else 0.0,
+        "p50_ms": round(1000 * percentile(vals, 0.50), 4),
+        "p95_ms": round(1000 * percentile(vals, 0.95), 4),
+        "p99_ms": round(1000 * percentile(vals, 0.99), 4),
+        "max_ms": round(1000 * vals[-1], 4) if vals else 0.0,
+        "throughput_per_s": round(len(vals) / total, 2) if total > 0 else 0.0
+    }
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 3) -> Dict[str, float]:
+    """fn을 repeat번 호출하여 지연 시간 통계 반환"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 RSS (MB, 측정 불가 시 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 2)
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine()
+    }
+
+def write_report(report: Dict, out: Optional[Path]):
+    """결과를 JSON으로 출력/저장"""
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if out:
+        Path(out).write_text(text, encoding="utf-8")
+        print(f"💾 Results written to {out}")
+    else:
+        print(text)
+
+def check_error_rates(report: Dict, max_error_rate: float) -> List[str]:
+    """결과 중 error_rate가 max_error_rate를 넘는 항목 목록 (해당 항목에 failed=True 표시)"""
+    failures = []
+    
+    def walk(cur, path):
+        if not isinstance(cur, dict):
+            return
+        rate = cur.get("error_rate")
+        if isinstance(rate, (int, float)) and rate > max_error_rate:
+            cur["failed"] = True
+            failures.append(f"{path or 'results'}.error_rate: {rate:.2%} > {max_error_rate:.2%}")
+        for k, v in cur.items():
+            walk(v, f"{path}.{k}" if path else k)
+    
+    walk(report.get("results", {}), "")
+    return failures
+
+def compare_to_baseline(report: Dict, baseline_path: Path, tolerance: float = 0.2,
+                        keys=("p50_ms", "p95_ms", "p99_ms"), max_error_rate: float = 0.0) -> List[str]:
+    """베이스라인 대비 tolerance 이상 느려졌거나 오류율이 늘어난 항목 목록"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    regressions = []
+    
+    def walk(cur, base, path):
+        if isinstance(cur, dict) and isinstance(base, dict):
+            for k, v in cur.items():
+                if k in keys and isinstance(v, (int, float)) and isinstance(base.get(k), (int, float)):
+                    if base[k] > 0 and v > base[k] * (1 + tolerance):
+                        regressions.append(f"{path}.{k}: {base[k]:.4f} → {v:.4f} (+{100 * (v / base[k] - 1):.1f}%)")
+                elif k == "error_rate" and isinstance(v, (int, float)):
+                    # 오류 응답이 늘면 지연 시간이 줄어도 회귀
+                    if v > max(base.get(k) or 0.0, max_error_rate):
+                        regressions.append(f"{path}.{k}: {base.get(k) or 0.0:.2%} → {v:.2%}")
+                elif k in base:
+                    walk(v, base[k], f"{path}.{k}" if path else k)
+    
+    walk(report.get("results", {}), baseline.get("results", {}), "")
+    return regressions
+
+def finish(report: Dict, out: Optional[Path], baseline: Optional[Path], tolerance: float,
+           max_error_rate: Optional[float] = None) -> int:
+    """결과 저장 후 오류율 확인 및 베이스라인 비교 (실패/회귀 시 종료 코드 1)"""
+    failures = []
+    if max_error_rate is not None:
+        failures = check_error_rates(report, max_error_rate)
+        report["failed"] = bool(failures)
+    write_report(report, out)
+    if failures:
+        print(f"❌ {len(failures)} result(s) above the error-rate limit:")
+        for f in failures:
+            print(f"   - {f}")
+    if not baseline:
+        return 1 if failures else 0
+    regressions = compare_to_baseline(report, baseline, tolerance, max_error_rate=max_error_rate or 0.0)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) vs {baseline} (tolerance {tolerance:.0%}):")
+        for r in regressions:
+            print(f"   - {r}")
+        return 1
+    print(f"✅ No regressions vs {baseline} (tolerance {tolerance:.0%})")
+    return 1 if failures else 0
+
+def add_common_args(parser):
+    parser.add_argument("--out", type=Path, default=None, help="결과 JSON 저장 경로 (없으면 stdout)")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 베이스라인 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 지연 증가율 (기본 0.2 = 20%%)")
@@ -34,6 +34,8 @@ export const API_CONFIG = {
   ENDPOINTS: {
     HEALTH: '/health',
     CHAT: '/api/v1/chat',
+    CHAT_STREAM: '/api/v1/chat/stream',
+    PATTERNS: '/api/v1/patterns',
   },
   TIMEOUT: 30000, // 30초
 };
@@ -81,6 +83,7 @@ export class FriendsFixerAPI {
         body: JSON.stringify({
           message: message.trim(),
           show_hints: showHints,
+          compact_hints: true, // why 텍스트는 getPatterns() 표에서 id로 조회
         }),
       });
 
@@ -100,6 +103,63 @@ export class FriendsFixerAPI {
       throw error;
     }
   }
+
+  // 패턴 표 (id → why). ETag로 재검증해 바뀌지 않았으면(304) 캐시된 표를 그대로 사용
+  async getPatterns() {
+    const headers = this.patternsEtag ? { 'If-None-Match': this.patternsEtag } : {};
+    const response = await fetch(`${this.baseURL}${API_CONFIG.ENDPOINTS.PATTERNS}`, { headers });
+    if (response.status === 304 && this.patterns) return this.patterns;
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+    const data = await response.json();
+    this.patterns = {};
+    data.id.forEach((id, i) => {
+      this.patterns[id] = { konglish: data.konglish[i], natural: data.natural[i], why: data.why[i] };
+    });
+    this.patternsEtag = response.headers.get('ETag');
+    return this.patterns;
+  }
+
+  // SSE 스트리밍 (hints → token* → done). RN fetch는 스트림 본문을 지원하지 않아 XHR onprogress 사용
+  streamMessage(message, showHints = false, { onHints, onToken, onDone, onError } = {}) {
+    const xhr = new XMLHttpRequest();
+    let offset = 0;
+
+    const handleEvents = () => {
+      const chunk = xhr.responseText.slice(offset);
+      const lastBreak = chunk.lastIndexOf('\n\n');
+      if (lastBreak < 0) return;
+      offset += lastBreak + 2;
+
+      chunk.slice(0, lastBreak).split('\n\n').forEach((block) => {
+        const event = (block.match(/^event: (.*)$/m) || [])[1];
+        const data = (block.match(/^data: (.*)$/m) || [])[1];
+        if (!event || data === undefined) return;
+        const payload = JSON.parse(data);
+        if (event === 'hints') onHints && onHints(payload);
+        else if (event === 'token') onToken && onToken(payload.text);
+        else if (event === 'done') onDone && onDone(payload);
+        else if (event === 'error') onError && onError(new Error(payload.detail));
+      });
+    };
+
+    xhr.open('POST', `${this.baseURL}${API_CONFIG.ENDPOINTS.CHAT_STREAM}`);
+    xhr.setRequestHeader('Content-Type', 'application/json');
+    xhr.setRequestHeader('Accept', 'text/event-stream');
+    xhr.onprogress = handleEvents;
+    xhr.onload = () => {
+      if (xhr.status !== 200) {
+        onError && onError(new Error(`HTTP ${xhr.status}`));
+        return;
+      }
+      handleEvents();
+    };
+    xhr.onerror = () => onError && onError(new Error('네트워크 연결을 확인해주세요. 백엔드 서버가 실행 중인가요?'));
+    xhr.send(JSON.stringify({ message: message.trim(), show_hints: showHints, compact_hints: true }));
+
+    // 호출 측에서 취소할 수 있도록 반환
+    return () => xhr.abort();
+  }
 }
 
 // 싱글톤 인스턴스
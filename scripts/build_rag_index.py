@@ -0,0 +1,22 @@
+"""
+RAG 인덱스 아티팩트 빌드 스크립트
+
+CSV 내용 해시를 키로 data/RAGdb_final.index/<해시>/ 에 어휘, IDF, CSR 행렬(npy),
+정규화된 컬럼을 기록합니다. 서버 워커는 이를 memory-map 하여 재학습 없이 시작합니다.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from config import config
+from rag import RAGDatabase
+
+def main():
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else config.RAG_DB_PATH
+    db = RAGDatabase(csv_path)
+    index_dir = db.build_index()
+    print(f"✨ RAG index ready: {index_dir}")
+
+if __name__ == "__main__":
+    main()
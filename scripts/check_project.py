@@ -33,6 +33,7 @@ def check_project():
     print("\n🐍 Backend:")
     backend = [
         "backend/app.py",
+        "backend/batch.py",
         "backend/config.py",
         "backend/requirements.txt",
         "backend/models/__init__.py",
@@ -71,6 +72,12 @@ def check_project():
     check_file("app_gradio.py", required=False)
     check_file("requirements_gradio.txt", required=False)
     
+    # 벤치마크
+    print("\n⏱️ Benchmarks (Optional):")
+    check_file("benchmarks/bench_retrieval.py", required=False)
+    check_file("benchmarks/bench_chat.py", required=False)
+    check_file("benchmarks/bench_generation.py", required=False)
+    
     # CI/CD
     print("\n⚙️ CI/CD:")
     check_file(".github/workflows/backend-test.yml", required=False)
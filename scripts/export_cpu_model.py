@@ -0,0 +1,40 @@
+"""
+CPU 추론용 모델 export 스크립트 (1회성)
+
+LoRA 어댑터(MODEL_DIR)를 base 모델(BASE_MODEL)에 병합하고 nn.Linear를 int8로 동적 양자화하여
+CPU_MODEL_DIR에 저장합니다. 서버는 INFERENCE_BACKEND=cpu 일 때 이 아티팩트를 로드합니다.
+
+    python scripts/export_cpu_model.py
+    python scripts/export_cpu_model.py --quant none --out backend/models/friendsfixer-cpu-fp32
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from config import config
+from serving.cpu_model import export_cpu_model
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge LoRA adapter and export a CPU (int8) model")
+    parser.add_argument("--base", default=config.BASE_MODEL, help="base 모델 이름 또는 경로")
+    parser.add_argument("--adapter", type=Path, default=config.MODEL_DIR, help="LoRA 어댑터 디렉토리")
+    parser.add_argument("--no-adapter", action="store_true", help="병합 없이 base 모델만 export")
+    parser.add_argument("--out", type=Path, default=config.CPU_MODEL_DIR)
+    parser.add_argument("--quant", choices=["int8", "none"], default=config.CPU_QUANT)
+    args = parser.parse_args()
+
+    adapter = None if args.no_adapter else args.adapter
+    if adapter is not None and not adapter.exists():
+        print(f"❌ Adapter not found: {adapter}")
+        return 1
+
+    print(f"📦 Exporting {args.base} + {adapter or '(no adapter)'} → {args.out} ({args.quant})")
+    out_dir = export_cpu_model(args.base, adapter, args.out, quant=args.quant)
+    print(f"✨ CPU model ready: {out_dir}")
+    print("   Set KILLKONG_INFERENCE_BACKEND=cpu to serve it")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
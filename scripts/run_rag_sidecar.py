@@ -0,0 +1,74 @@
+"""
+노드 공유 RAG 사이드카 실행 스크립트
+
+인덱스(샤드 검색 프로세스 포함)를 노드당 한 번만 로드하고, 같은 노드의 API 워커는
+KILLKONG_RAG_SIDECAR=<주소> 로 이 프로세스에 검색을 요청합니다.
+
+    export KILLKONG_RAG_SIDECAR_KEY=$(openssl rand -hex 32)
+    python scripts/run_rag_sidecar.py /run/killkong/rag.sock --shards 4
+    KILLKONG_RAG_SIDECAR=/run/killkong/rag.sock uvicorn app:app --workers 4
+
+연결은 pickle 메시지를 주고받으므로 인증 키(KILLKONG_RAG_SIDECAR_KEY)가 없으면 시작하지 않으며,
+기본 주소는 소유자만 접근할 수 있는 Unix 소켓(config.RAG_SIDECAR_SOCKET)입니다.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from config import config
+from rag import RAGDatabase, RAGRegistry, SidecarServer, create_retriever, parse_address, shutdown_shard_pool
+
+def main():
+    parser = argparse.ArgumentParser(description="KillKong RAG sidecar")
+    parser.add_argument("address", nargs="?", default=config.RAG_SIDECAR or str(config.RAG_SIDECAR_SOCKET),
+                        help='Unix 소켓 경로 (기본) 또는 "host:port"')
+    parser.add_argument("--csv", type=Path, default=config.RAG_DB_PATH)
+    parser.add_argument("--shards", type=int, default=config.RAG_SHARDS)
+    parser.add_argument("--workers", type=int, default=config.RAG_SHARD_WORKERS)
+    parser.add_argument("--watch", action="store_true", default=config.RAG_WATCH, help="CSV 변경 시 자동 리로드")
+    args = parser.parse_args()
+    if not config.RAG_SIDECAR_AUTHKEY:
+        parser.error("KILLKONG_RAG_SIDECAR_KEY is not set (the sidecar connection carries pickle, an authkey is required)")
+
+    def make_retriever(db: RAGDatabase):
+        return create_retriever(
+            db,
+            backend="tfidf",
+            top_k=config.RAG_TOP_K,
+            min_sim=config.RAG_MIN_SIM,
+            exact_match=config.RAG_EXACT_MATCH,
+            fuzzy_weight=config.RAG_FUZZY_WEIGHT,
+            fuzzy_min=config.RAG_FUZZY_MIN,
+            shards=args.shards,
+            shard_workers=args.workers
+        )
+
+    address = parse_address(args.address)
+    if isinstance(address, str):
+        # 이전 실행이 남긴 소켓 파일
+        Path(address).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        Path(address).unlink(missing_ok=True)
+    else:
+        print(f"⚠️  TCP address {args.address}: any local user with the key can connect, prefer a Unix socket")
+
+    registry = RAGRegistry(args.csv, make_retriever)
+    db = RAGDatabase(args.csv)
+    db.load()
+    registry.adopt(db)
+    if args.watch:
+        registry.watch(config.RAG_WATCH_INTERVAL)
+
+    server = SidecarServer(registry, address, config.RAG_SIDECAR_AUTHKEY.encode("utf-8"))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 RAG sidecar stopped")
+    finally:
+        server.close()
+        registry.stop()
+        shutdown_shard_pool()
+
+if __name__ == "__main__":
+    main()